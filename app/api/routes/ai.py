@@ -1,5 +1,9 @@
 from fastapi import APIRouter
-from ...services.openai_service import ai_test_sentence
+from ...services.openai_service import ai_single_flight, ai_test_sentence_async
+from ...services.embedding_cache import query_embedding_cache
+from ...services.response_cache import response_cache
+from ...services.extract_cache import extract_text_cache
+from ...services.export_cache import export_artifact_cache
 
 router = APIRouter(
     prefix="/ai",
@@ -8,9 +12,23 @@ router = APIRouter(
 
 
 @router.get("/test")
-def ai_test():
+async def ai_test():
     """
     Egyszerű AI teszt endpoint.
     """
-    answer = ai_test_sentence()
+    answer = await ai_test_sentence_async()
     return {"answer": answer}
+
+
+@router.get("/stats")
+def ai_stats():
+    """
+    Cache-statisztikák (hit/miss), hogy lássuk a megspórolt API hívásokat.
+    """
+    return {
+        "embedding_cache": query_embedding_cache.stats(),
+        "response_cache": response_cache.stats(),
+        "single_flight": ai_single_flight.stats(),
+        "extract_text_cache": extract_text_cache.stats(),
+        "export_artifact_cache": export_artifact_cache.stats(),
+    }
@@ -1,13 +1,18 @@
+import json
+import os
 from typing import List, Dict
 
 from fastapi import (
     APIRouter,
     Depends,
+    Request,
     UploadFile,
     File,
     HTTPException,
     Response,
 )
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 from pydantic import BaseModel
 
@@ -15,24 +20,57 @@ from ... import models, schemas
 from ..deps import get_db
 
 # 🔹 Régi OpenAI-alapú szolgáltatások (review, improve, stb.)
+# (async változatok: a megosztott AsyncOpenAI klienst várják, nem blokkolnak)
 from ...services.openai_service import (
-    analyze_contract,
-    apply_suggestions,
-    ai_improve_contract,
+    analyze_contract_async,
+    apply_suggestions_async,
+    ai_improve_contract_async,
+    ai_improve_contract_stream,
+    MODEL_IMPROVE,
 )
 
 # 🔹 ÚJ: template-alapú szerződés generátor
-from app.services.contract_generator import generate_contract as generate_contract_from_template
+from app.services.contract_generator import generate_contract_async as generate_contract_from_template
+from app.services.contract_generator import generate_contract_stream
+
+# 🔹 SSE streaming
+from app.utils.sse import sse_response
 
 # 🔹 File extract
 from ...services.file_extract_service import (
-    extract_text_from_pdf,
+    EXTRACT_MAX_UPLOAD_BYTES,
+    PdfTooManyPagesError,
+    check_pdf_pages,
+    extract_pdf_pages_parallel,
     extract_text_from_docx,
     extract_text_from_txt,
+    join_pages,
+    pdf_page_count,
+    stream_pdf_pages,
 )
+from app.services.extract_cache import extract_cache_key, extract_text_cache
+from app.utils.uploads import UploadTooLargeError, spool_upload
 
 # 🔹 Export
-from app.services.export_service import create_export_file
+from app.services.export_service import EXPORT_FORMATS, create_export_file
+from app.services.export_cache import (
+    EXPORT_CACHE_ENABLED,
+    etag_matches,
+    export_artifact_cache,
+    export_cache_key,
+    export_etag,
+)
+
+# 🔹 CPU-igényes dokumentummunka (process-pool)
+from app.services.document_pool import (
+    DOC_RETRY_AFTER_SEC,
+    JobTimeoutError,
+    PoolSaturatedError,
+    document_pool,
+)
+
+# 🔹 Sablonok
+from app.services.template_registry import template_registry
 
 
 router = APIRouter(
@@ -50,6 +88,17 @@ class ContractGenerateTemplateRequest(BaseModel):
     form_data: Dict[str, str]     # {{PLACEHOLDER}} → érték
 
 
+def _pool_http_error(e: Exception) -> HTTPException:
+    """Telített pool → 429 (Retry-After), lejárt job → 504."""
+    if isinstance(e, PoolSaturatedError):
+        return HTTPException(
+            status_code=429,
+            detail=str(e),
+            headers={"Retry-After": str(DOC_RETRY_AFTER_SEC)},
+        )
+    return HTTPException(status_code=504, detail=str(e))
+
+
 # ============================================================
 # MANUÁLIS CONTRACT CRUD
 # ============================================================
@@ -80,16 +129,29 @@ def list_contracts(db: Session = Depends(get_db)):
     return db.query(models.Contract).all()
 
 
+# ============================================================
+# 📚 SABLON-KATALÓGUS
+# ============================================================
+
+@router.get("/templates")
+def list_templates():
+    """
+    A betöltött szerződéssablonok: típusok, elérhető módok, placeholderek,
+    valamint az ellenőrzés hibái / figyelmeztetései.
+    """
+    return template_registry.catalogue()
+
+
 # ============================================================
 # 🧠 TEMPLATE-ALAPÚ SZERZŐDÉSGENERÁLÁS (FAST / DETAILED)
 # ============================================================
 
 @router.post("/generate", response_model=schemas.ContractGenerateResponse)
-def generate_contract_endpoint(
+async def generate_contract_endpoint(
     request: ContractGenerateTemplateRequest,
 ):
     try:
-        result = generate_contract_from_template(
+        result = await generate_contract_from_template(
             contract_type=request.contract_type,
             mode=request.generation_mode,
             form_data=request.form_data,
@@ -138,12 +200,33 @@ def generate_contract_endpoint(
 
 
 
+@router.post("/generate/stream")
+async def generate_contract_stream_endpoint(
+    request: ContractGenerateTemplateRequest,
+    http_request: Request,
+):
+    """
+    Mint a /generate, de a modell tokenjei Server-Sent Eventként érkeznek
+    ("token" események, a végén "done" a telemetriával: ttft_sec, total_sec).
+    """
+    try:
+        tokens, telemetry = generate_contract_stream(
+            contract_type=request.contract_type,
+            mode=request.generation_mode,
+            form_data=request.form_data,
+        )
+    except (FileNotFoundError, ValueError) as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    return sse_response(http_request, tokens, telemetry)
+
+
 # ============================================================
 # 🔍 AI-ALAPÚ REVIEW
 # ============================================================
 
 @router.post("/review", response_model=schemas.ContractReviewResponse)
-def review_contract_endpoint(
+async def review_contract_endpoint(
     request: schemas.ContractReviewRequest,
 ):
     """
@@ -152,7 +235,7 @@ def review_contract_endpoint(
     - max 5 kockázatos pont
     - általános kockázati szint
     """
-    return analyze_contract(request)
+    return await analyze_contract_async(request)
 
 
 # ============================================================
@@ -163,52 +246,141 @@ def review_contract_endpoint(
     "/apply-suggestions",
     response_model=schemas.ContractApplySuggestionsResponse,
 )
-def apply_suggestions_endpoint(
+async def apply_suggestions_endpoint(
     request: schemas.ContractApplySuggestionsRequest,
 ):
     """
     A kiválasztott AI-javaslatok beépítése a szerződésbe.
     """
-    return apply_suggestions(request)
+    return await apply_suggestions_async(request)
 
 
 # ============================================================
 # 📄 SZÖVEGKINYERÉS FELTÖLTÖTT FILE-BÓL
 # ============================================================
 
+_EXTRACT_SUFFIXES = (".pdf", ".docx", ".txt", ".doc")
+
+
+def _extract_suffix(filename: str) -> str:
+    suffix = os.path.splitext(filename.lower())[1]
+    if suffix not in _EXTRACT_SUFFIXES:
+        raise HTTPException(
+            status_code=400,
+            detail="Csak PDF, DOCX vagy TXT fájl tölthető fel.",
+        )
+    return suffix
+
+
+def _extract_http_error(e: Exception) -> HTTPException:
+    if isinstance(e, HTTPException):
+        return e
+    if isinstance(e, (PoolSaturatedError, JobTimeoutError)):
+        return _pool_http_error(e)
+    if isinstance(e, (UploadTooLargeError, PdfTooManyPagesError)):
+        return HTTPException(status_code=413, detail=str(e))
+    return HTTPException(
+        status_code=500,
+        detail=f"Nem sikerült a szöveg kinyerése: {e}",
+    )
+
+
 @router.post("/extract-text", response_model=schemas.ContractExtractResponse)
 async def extract_contract_text(file: UploadFile = File(...)):
     """
     PDF / DOCX / TXT szerződésből szöveget nyer ki.
+    Az azonos tartalmú ismételt feltöltés a cache-ből jön (cache_hit=true).
     """
-    filename = file.filename or ""
-    lower_name = filename.lower()
+    suffix = _extract_suffix(file.filename or "")
+    upload = None
+    cache_hit = False
 
+    # a feltöltés lemezre kerül (méretkorláttal, közben hash-elve), a CPU-igényes
+    # PDF / DOCX kinyerés a dokumentum-poolban fut, nem az eseményhurkon
     try:
-        if lower_name.endswith(".pdf"):
-            text = extract_text_from_pdf(file.file)
-        elif lower_name.endswith(".docx"):
-            text = extract_text_from_docx(file.file)
-        elif lower_name.endswith(".txt") or lower_name.endswith(".doc"):
-            text = extract_text_from_txt(file.file)
+        upload = await spool_upload(file, EXTRACT_MAX_UPLOAD_BYTES, suffix)
+        cache_key = extract_cache_key(upload.sha256, suffix)
+
+        pages = extract_text_cache.get(cache_key)
+        if pages is not None:
+            cache_hit = True
         else:
-            raise HTTPException(
-                status_code=400,
-                detail="Csak PDF, DOCX vagy TXT fájl tölthető fel.",
-            )
+            if suffix == ".pdf":
+                pages = await extract_pdf_pages_parallel(upload.path)
+            elif suffix == ".docx":
+                pages = [await document_pool.run(extract_text_from_docx, upload.path)]
+            else:
+                with open(upload.path, "rb") as f:
+                    pages = [extract_text_from_txt(f)]
+            extract_text_cache.set(cache_key, pages)
     except Exception as e:
-        raise HTTPException(
-            status_code=500,
-            detail=f"Nem sikerült a szöveg kinyerése: {e}",
-        )
+        raise _extract_http_error(e)
+    finally:
+        if upload is not None:
+            upload.remove()
 
+    text = join_pages(pages)
     if not text.strip():
         raise HTTPException(
             status_code=400,
             detail="Nem találtam olvasható szöveget a fájlban.",
         )
 
-    return schemas.ContractExtractResponse(text=text)
+    return schemas.ContractExtractResponse(text=text, cache_hit=cache_hit, content_sha256=upload.sha256)
+
+
+@router.post("/extract-text/stream")
+async def extract_contract_text_stream(file: UploadFile = File(...)):
+    """
+    PDF szöveg oldalanként, NDJSON streamként (application/x-ndjson):
+    soronként {"page": 1, "total_pages": N, "text": "..."}, a végén
+    {"done": true, "pages": N, "cache_hit": ...}.
+    A nagy PDF-ek első oldalai már akkor megjönnek, amikor a többi még készül
+    (az oldaltartományok párhuzamosan futnak a dokumentum-poolban).
+    """
+    if _extract_suffix(file.filename or "") != ".pdf":
+        raise HTTPException(status_code=400, detail="Oldalankénti kinyerés csak PDF fájlra kérhető.")
+
+    upload = None
+    try:
+        upload = await spool_upload(file, EXTRACT_MAX_UPLOAD_BYTES, ".pdf")
+        cache_key = extract_cache_key(upload.sha256, ".pdf")
+        cached = extract_text_cache.get(cache_key)
+        if cached is not None:
+            upload.remove()
+            page_count = len(cached)
+        else:
+            page_count = await document_pool.run(pdf_page_count, upload.path)
+            check_pdf_pages(page_count)
+    except Exception as e:
+        if upload is not None:
+            upload.remove()
+        raise _extract_http_error(e)
+
+    async def page_source():
+        if cached is not None:
+            for index, text in enumerate(cached):
+                yield index, text
+            return
+        async for index, text in stream_pdf_pages(upload.path, page_count):
+            yield index, text
+
+    async def pages():
+        collected = []
+        try:
+            async for index, text in page_source():
+                collected.append(text)
+                yield json.dumps({"page": index + 1, "total_pages": page_count, "text": text}, ensure_ascii=False) + "\n"
+            if cached is None:
+                extract_text_cache.set(cache_key, collected)
+            yield json.dumps({"done": True, "pages": len(collected), "cache_hit": cached is not None}) + "\n"
+        except Exception as e:
+            # a válasz már elindult: a hibát is a streamben jelezzük
+            yield json.dumps({"error": _extract_http_error(e).detail}, ensure_ascii=False) + "\n"
+        finally:
+            upload.remove()
+
+    return StreamingResponse(pages(), media_type="application/x-ndjson")
 
 
 # ============================================================
@@ -223,7 +395,7 @@ async def improve_contract_endpoint(
     Meglévő szerződés javított / kiegyensúlyozottabb változata AI segítségével.
     """
     try:
-        return ai_improve_contract(req)
+        return await ai_improve_contract_async(req)
     except Exception as e:
         raise HTTPException(
             status_code=500,
@@ -231,13 +403,31 @@ async def improve_contract_endpoint(
         )
 
 
+@router.post("/improve/stream")
+async def improve_contract_stream_endpoint(
+    req: schemas.ContractImproveRequest,
+    http_request: Request,
+):
+    """
+    A javított szerződés szövege Server-Sent Eventként, token-darabonként.
+    Ha a kliens lekapcsolódik, az OpenAI streamet is lezárjuk.
+    """
+    telemetry = {"mode": "improve", "model": MODEL_IMPROVE, "streamed": True}
+    return sse_response(http_request, ai_improve_contract_stream(req), telemetry)
+
+
 # ============================================================
 # 📦 EXPORT (PDF / DOCX)
 # ============================================================
 
+def _not_modified(etag: str) -> Response:
+    return Response(status_code=304, headers={"ETag": etag, "Cache-Control": "private, no-cache"})
+
+
 @router.post("/export")
 async def export_contract(
     req: schemas.ContractExportRequest,
+    http_request: Request,
 ):
     try:
         meta = {
@@ -251,20 +441,76 @@ async def export_contract(
                 or "A dokumentum automatikusan generált, és nem minősül jogi tanácsadásnak.",
         }
 
-        filename, content, mime_type = create_export_file(
-            template_name=req.template_name,
-            template_vars=req.template_vars or {},
-            format=req.format,
-            meta=meta,
-        )
-
+        # a kész fájl a szöveg + formátum + branding hash-éből azonosítható:
+        # a böngésző újraellenőrzése (If-None-Match) generálás nélkül 304
+        template_vars = req.template_vars or {}
+        cache_key = export_cache_key(str(template_vars.get("contract_text", "")), req.format, meta)
+        etag = export_etag(cache_key)
+        filename, mime_type = EXPORT_FORMATS[req.format]
         headers = {
-            "Content-Disposition": f'attachment; filename="{filename}"'
+            "Content-Disposition": f'attachment; filename="{filename}"',
+            "ETag": etag,
+            # a szerződés szövege személyes adat: csak a böngésző tárolja, és mindig újraellenőrzi
+            "Cache-Control": "private, no-cache",
         }
+        if EXPORT_CACHE_ENABLED:
+            # ugyanez a fájl GET-tel (böngésző-újraellenőrzés), amíg a cache-ben van
+            headers["Content-Location"] = f"/contracts/export/artifacts/{cache_key}.{req.format}"
+        if etag_matches(http_request.headers.get("if-none-match"), etag):
+            return _not_modified(etag)
+
+        content = None
+        if EXPORT_CACHE_ENABLED:
+            content = await run_in_threadpool(export_artifact_cache.get, cache_key, req.format)
+        headers["X-Export-Cache"] = "hit" if content is not None else "miss"
+
+        if content is None:
+            # ReportLab / python-docx: a dokumentum-poolban
+            _filename, content, _mime_type = await document_pool.run(
+                create_export_file,
+                template_name=req.template_name,
+                template_vars=template_vars,
+                format=req.format,
+                meta=meta,
+            )
+            if EXPORT_CACHE_ENABLED:
+                await run_in_threadpool(export_artifact_cache.set, cache_key, req.format, content)
+
         return Response(content=content, media_type=mime_type, headers=headers)
 
+    except (PoolSaturatedError, JobTimeoutError) as e:
+        raise _pool_http_error(e)
     except Exception as e:
         raise HTTPException(
             status_code=500,
             detail=f"Nem sikerült a szerződés exportálása: {e}",
         )
+
+
+@router.get("/export/artifacts/{artifact}")
+async def get_export_artifact(artifact: str, http_request: Request):
+    """
+    Korábban elkészült export a cache-ből (a POST /export Content-Location
+    fejléce mutat ide), ETag / If-None-Match támogatással. Ha a fájl már
+    kikerült a cache-ből: 404, a kliens a POST /export-tal újragenerálja.
+    """
+    cache_key, _, format = artifact.partition(".")
+    if format not in EXPORT_FORMATS or len(cache_key) != 64 or not all(c in "0123456789abcdef" for c in cache_key):
+        raise HTTPException(status_code=404, detail="Ismeretlen export.")
+
+    etag = export_etag(cache_key)
+    if etag_matches(http_request.headers.get("if-none-match"), etag):
+        return _not_modified(etag)
+
+    content = await run_in_threadpool(export_artifact_cache.get, cache_key, format)
+    if content is None:
+        raise HTTPException(status_code=404, detail="Az export már nincs a cache-ben, kérd le újra.")
+
+    filename, mime_type = EXPORT_FORMATS[format]
+    headers = {
+        "Content-Disposition": f'attachment; filename="{filename}"',
+        "ETag": etag,
+        "Cache-Control": "private, no-cache",
+        "X-Export-Cache": "hit",
+    }
+    return Response(content=content, media_type=mime_type, headers=headers)
@@ -0,0 +1,52 @@
+from typing import List
+
+from sqlalchemy import inspect, text
+from sqlalchemy.engine import Engine
+
+from .database import Base, engine
+from .models import RAGChunk
+
+
+# ---------------------------------------------------------
+#  EGYSZERŰ SÉMA-FRISSÍTÉS (Alembic nélkül)
+#  A create_all() csak hiányzó táblákat hoz létre, oszlopokat nem,
+#  ezért az új oszlopokat itt pótoljuk a meglévő táblákban.
+# ---------------------------------------------------------
+
+def add_missing_columns(bind: Engine, model) -> List[str]:
+    """
+    A modellben szereplő, de az adatbázisból hiányzó oszlopok hozzáadása
+    (ALTER TABLE ... ADD COLUMN), a hozzájuk tartozó indexekkel együtt.
+    Visszatér: a hozzáadott oszlopok nevei.
+    """
+    table = model.__table__
+    inspector = inspect(bind)
+
+    if not inspector.has_table(table.name):
+        return []
+
+    existing = {col["name"] for col in inspector.get_columns(table.name)}
+    added: List[str] = []
+
+    with bind.begin() as conn:
+        for column in table.columns:
+            if column.name in existing:
+                continue
+            col_type = column.type.compile(dialect=bind.dialect)
+            conn.execute(text(f"ALTER TABLE {table.name} ADD COLUMN {column.name} {col_type}"))
+            added.append(column.name)
+
+    for index in table.indexes:
+        if any(col.name in added for col in index.columns):
+            index.create(bind=bind, checkfirst=True)
+
+    return added
+
+
+def upgrade_schema(bind: Engine = engine) -> None:
+    """Táblák létrehozása + hiányzó oszlopok pótlása. Induláskor és rag_init előtt fut."""
+    Base.metadata.create_all(bind=bind)
+
+    added = add_missing_columns(bind, RAGChunk)
+    if added:
+        print(f"rag_chunks séma frissítve, új oszlopok: {', '.join(added)}")
@@ -1,17 +1,55 @@
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
-from .database import Base, engine
+from .database import engine, SessionLocal
+from .db_migrations import upgrade_schema
 from . import models
 from .api.routes import ai, contracts
 from fastapi.middleware.cors import CORSMiddleware
 from app.api.routes import contracts
+from .services.vector_index import vector_index
+from .services.bm25_index import lexical_index
+from .services.openai_client import close_openai_clients
+from .services.response_cache import CacheBypassMiddleware
+from .services.template_registry import template_registry
+from .services.document_pool import document_pool
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # szerződéssablonok betöltése + ellenőrzése, majd hot-reload figyelés
+    template_registry.load_all()
+    template_registry.start_watcher()
+
+    # PDF / DOCX munkák process-poolja (minden worker egyszer építi fel a PDF kontextust)
+    document_pool.start()
+
+    # RAG vektorindex betöltése induláskor (ne az első kérés fizesse meg)
+    db = SessionLocal()
+    try:
+        vector_index.load(db)
+        print(f"RAG index betöltve: {len(vector_index)} részlet.")
+        lexical_index.maybe_refresh(db)
+    except Exception as e:
+        print("RAG index betöltése sikertelen, első kereséskor újrapróbáljuk:", e)
+    finally:
+        db.close()
 
+    yield
 
-app = FastAPI(title="Magyar SzerződésGPT API")
+    template_registry.stop_watcher()
+    document_pool.shutdown()
+
+    # a megosztott OpenAI kapcsolat-poolok lezárása
+    await close_openai_clients()
+
+
+app = FastAPI(title="Magyar SzerződésGPT API", lifespan=lifespan)
 
 app.include_router(contracts.router)
 
-# táblák létrehozása
-Base.metadata.create_all(bind=engine)
+# táblák létrehozása + hiányzó oszlopok pótlása
+upgrade_schema(engine)
 
 # health check
 @app.get("/health")
@@ -35,6 +73,9 @@ app.add_middleware(
     allow_headers=["*"],          # bármilyen header
 )
 
+# "X-Cache-Bypass: 1" / "Cache-Control: no-cache" → friss LLM válasz (response_cache kihagyása)
+app.add_middleware(CacheBypassMiddleware)
+
 # routerek
 app.include_router(ai.router)
 app.include_router(contracts.router)
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Text
+from sqlalchemy import Column, Integer, String, Text, LargeBinary, Float
 from sqlalchemy.dialects.postgresql import JSON
 from .database import Base
 
@@ -17,4 +17,8 @@ class RAGChunk(Base):
     id = Column(Integer, primary_key=True, index=True)
     source = Column(String, index=True)   # pl. "Ptk. 6:1 §"
     content = Column(Text)                # a paragrafus/részlet szövege
-    embedding = Column(JSON)              # float lista (embedding)
+    content_hash = Column(String(64), index=True)  # sha256(source + content), inkrementális betöltéshez
+    embedding = Column(JSON(none_as_null=True))  # régi formátum: float lista (migráció után NULL)
+    embedding_bin = Column(LargeBinary)   # tömör bináris vektor (lásd embedding_codec)
+    embedding_dtype = Column(String(16))  # "float32" | "float16" | "int8"
+    embedding_scale = Column(Float)       # csak int8 kvantálásnál
@@ -1,86 +1,165 @@
+import argparse
 import os
-from typing import List, Tuple
+from typing import Callable, Iterator, List, Optional, Tuple
 
 import numpy as np
 from dotenv import load_dotenv
-from openai import OpenAI
 from sqlalchemy.orm import Session
 
-from .database import SessionLocal, engine, Base
-from .models import RAGChunk
+from .database import SessionLocal, engine
+from .db_migrations import upgrade_schema
+from .services.openai_client import get_openai_client
+from .services.embedding_snapshot import RAG_SNAPSHOT_DIR, write_snapshot
+from .services.rag_ingest import IngestStats, ingest_chunks
+from .services.vector_index import reload_vector_index
+from .services.bm25_index import RAG_BM25_PATH, lexical_index, write_bm25_index
 
 load_dotenv()
 
-OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
-client = OpenAI(api_key=OPENAI_API_KEY)
+DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), "data")
+PTK_CHUNKS_PATH = os.path.join(DATA_DIR, "ptk_chunks.txt")
 
 
-def parse_ptk_file(path: str) -> List[Tuple[str, str]]:
+ENTRY_SEPARATOR = "---"
+
+
+def iter_ptk_file(
+    path: str,
+    on_malformed: Optional[Callable[[int, str], None]] = None,
+) -> Iterator[Tuple[str, str]]:
     """
-    Beolvassa a data/ptk_chunks.txt fájlt.
-    Visszaad: listát (source, content) tuple-ökkel.
+    Soronként olvassa a data/ptk_chunks.txt fájlt, és minden elválasztónál
+    (egy sor, ami csak '---') azonnal visszaad egy (source, content) párt.
+    Egyszerre csak az aktuális bejegyzés sorai vannak a memóriában,
+    így a korpusz méretétől független a memóriahasználat.
+
+    Hibás bejegyzésnél (pl. forrás után nincs szöveg) az on_malformed
+    callback a bejegyzés első sorának számát kapja meg (alapból kiírjuk).
     """
-    with open(path, "r", encoding="utf-8") as f:
-        raw = f.read()
+    if on_malformed is None:
+        file_name = os.path.basename(path)
+
+        def on_malformed(line_no: int, message: str) -> None:
+            print(f"{file_name}:{line_no}: {message}, kihagyva")
 
-    entries = [e.strip() for e in raw.split("---") if e.strip()]
-    results: List[Tuple[str, str]] = []
+    lines: List[str] = []
+    entry_start = 0
 
-    for entry in entries:
-        lines = [l for l in entry.splitlines() if l.strip()]
+    def flush() -> Optional[Tuple[str, str]]:
+        if not lines:
+            return None
         if len(lines) < 2:
-            continue
-        source = lines[0].strip()
-        content = "\n".join(lines[1:]).strip()
-        results.append((source, content))
+            source = lines[0].strip()[:60]
+            on_malformed(entry_start, f"hiányos bejegyzés ('{source}' után nincs szöveg)")
+            return None
+        return lines[0].strip(), "\n".join(lines[1:]).strip()
+
+    with open(path, "r", encoding="utf-8") as f:
+        for line_no, raw_line in enumerate(f, start=1):
+            line = raw_line.rstrip("\r\n")
+            stripped = line.strip()
+
+            if stripped == ENTRY_SEPARATOR:
+                entry = flush()
+                if entry is not None:
+                    yield entry
+                lines = []
+                continue
+
+            if not stripped:
+                continue
+            if not lines:
+                entry_start = line_no
+            lines.append(line)
 
-    return results
+    entry = flush()
+    if entry is not None:
+        yield entry
 
 
-def embed_texts(texts: List[str]) -> List[List[float]]:
+def parse_ptk_file(path: str) -> List[Tuple[str, str]]:
     """
-    OpenAI embedding API: text-embedding-3-small-et használunk.
+    Beolvassa a data/ptk_chunks.txt fájlt.
+    Visszaad: listát (source, content) tuple-ökkel.
+    (Nagy korpusznál az iter_ptk_file generátort használd.)
     """
-    response = client.embeddings.create(
-        model="text-embedding-3-small",
-        input=texts,
-    )
-    embeddings = [item.embedding for item in response.data]
-    return embeddings
+    return list(iter_ptk_file(path))
 
 
-def init_rag_from_ptk():
+def init_rag_from_ptk(file_path: Optional[str] = None, embed_client=None) -> IngestStats:
     """
     Ptk. részletek beolvasása, embedding készítése, mentés az adatbázisba.
+    Inkrementális: csak az új / módosult részleteket embeddeli, a kikerülteket
+    törli, a változatlanokat nem érinti (lásd services.rag_ingest).
+    Az embed_client tesztnél stubbal helyettesíthető.
     """
-    Base.metadata.create_all(bind=engine)
+    upgrade_schema(engine)
 
     db: Session = SessionLocal()
+    file_path = file_path or PTK_CHUNKS_PATH
 
-    file_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), "data", "ptk_chunks.txt")
-    chunks = parse_ptk_file(file_path)
+    try:
+        print("Jogszabály-részletek betöltése, embedding készül...")
 
-    print(f"{len(chunks)} jogszabály-részletet találtam, embedding készül...")
+        stats = ingest_chunks(
+            db,
+            iter_ptk_file(file_path),
+            embed_client or get_openai_client(),
+        )
 
-    texts = [c[1] for c in chunks]
-    embeddings = embed_texts(texts)
+        if RAG_SNAPSHOT_DIR:
+            version = write_snapshot(db, RAG_SNAPSHOT_DIR)
+            print(f"Embedding snapshot kiírva: {version}")
+
+        # a lexikális (BM25) index is itt, ingestion után épül
+        bm25 = write_bm25_index(db, RAG_BM25_PATH)
+        lexical_index.set_index(bm25)
+        print(f"BM25 index kiírva: {RAG_BM25_PATH} ({len(bm25)} részlet, {len(bm25.terms)} term).")
+
+        # ha ugyanebben a processzben fut az API is, az index azonnal frissül;
+        # a többi worker a következő periodikus ellenőrzésnél veszi észre
+        added, removed = reload_vector_index(db)
+    finally:
+        db.close()
+
+    print(
+        f"RAG adatbázis frissítve: +{stats.added} új, ~{stats.updated} módosult, "
+        f"-{stats.deleted} törölt, {stats.unchanged} változatlan "
+        f"({stats.embeddings_saved} embedding megspórolva, {stats.embedding_calls} API hívás, "
+        f"{stats.retries} újrapróbálás), {stats.elapsed_sec} mp (index: +{added} / -{removed})."
+    )
+    return stats
 
-    # töröljük a régi bejegyzéseket (opcionális)
-    db.query(RAGChunk).delete()
 
-    for (source, content), emb in zip(chunks, embeddings):
-        db_chunk = RAGChunk(
-            source=source,
-            content=content,
-            embedding=emb,  # JSON-ként tároljuk a float listát
-        )
-        db.add(db_chunk)
+def write_snapshot_from_db(snapshot_dir: str | None = None) -> str:
+    """
+    Csak a snapshot újraírása a meglévő rag_chunks táblából (embedding hívás nélkül).
+    """
+    snapshot_dir = snapshot_dir or RAG_SNAPSHOT_DIR
+    if not snapshot_dir:
+        raise RuntimeError("Hiányzik a RAG_SNAPSHOT_DIR (vagy a --snapshot-dir).")
 
-    db.commit()
-    db.close()
+    db: Session = SessionLocal()
+    try:
+        version = write_snapshot(db, snapshot_dir)
+    finally:
+        db.close()
 
-    print("RAG adatbázis feltöltve.")
+    print(f"Embedding snapshot kiírva: {version}")
+    return version
 
 
 if __name__ == "__main__":
-    init_rag_from_ptk()
+    parser = argparse.ArgumentParser(description="RAG adatbázis feltöltése a Ptk. részletekből.")
+    parser.add_argument(
+        "--snapshot-only",
+        action="store_true",
+        help="nem töltünk újra, csak mmap-elhető snapshotot írunk a meglévő táblából",
+    )
+    parser.add_argument("--snapshot-dir", default=None)
+    args = parser.parse_args()
+
+    if args.snapshot_only:
+        write_snapshot_from_db(args.snapshot_dir)
+    else:
+        init_rag_from_ptk()
@@ -0,0 +1,81 @@
+import argparse
+
+from sqlalchemy.orm import Session
+
+from .database import SessionLocal, engine
+from .db_migrations import upgrade_schema
+from .models import RAGChunk
+from .services.embedding_codec import (
+    RAG_EMBEDDING_DTYPE,
+    SUPPORTED_DTYPES,
+    embedding_columns,
+)
+
+
+def migrate_json_embeddings(
+    dtype: str = RAG_EMBEDDING_DTYPE,
+    batch_size: int = 500,
+    keep_json: bool = False,
+) -> int:
+    """
+    A régi, JSON float listás embeddingek átírása a bináris oszlopba.
+    Kötegenként commitol, így megszakítás után újraindítva ott folytatja,
+    ahol abbahagyta (a már átírt soroknál az embedding_bin nem NULL).
+    Visszatér: az átírt sorok száma.
+    """
+    upgrade_schema(engine)
+
+    db: Session = SessionLocal()
+    migrated = 0
+    last_id = 0
+
+    try:
+        while True:
+            rows = (
+                db.query(RAGChunk)
+                .filter(
+                    RAGChunk.id > last_id,
+                    RAGChunk.embedding_bin.is_(None),
+                    RAGChunk.embedding.isnot(None),
+                )
+                .order_by(RAGChunk.id)
+                .limit(batch_size)
+                .all()
+            )
+            if not rows:
+                break
+
+            for row in rows:
+                values = embedding_columns(row.embedding, dtype)
+                if keep_json:
+                    values.pop("embedding")
+                for key, value in values.items():
+                    setattr(row, key, value)
+
+            db.commit()
+            last_id = rows[-1].id
+            migrated += len(rows)
+            print(f"{migrated} embedding átírva ({dtype})...")
+    finally:
+        db.close()
+
+    return migrated
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="RAGChunk embeddingek migrálása JSON-ból bináris formátumba."
+    )
+    parser.add_argument("--dtype", choices=SUPPORTED_DTYPES, default=RAG_EMBEDDING_DTYPE)
+    parser.add_argument("--batch-size", type=int, default=500)
+    parser.add_argument(
+        "--keep-json",
+        action="store_true",
+        help="a JSON oszlopot nem ürítjük (visszaállíthatóság miatt)",
+    )
+    args = parser.parse_args()
+
+    count = migrate_json_embeddings(args.dtype, args.batch_size, args.keep_json)
+    print(f"Kész: {count} sor migrálva.")
+    if count and not args.keep_json and engine.dialect.name == "postgresql":
+        print("A felszabadult hely visszanyeréséhez futtasd: VACUUM FULL rag_chunks;")
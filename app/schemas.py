@@ -66,14 +66,28 @@ class ContractReviewResponse(BaseModel):
 class ContractApplySuggestionsRequest(BaseModel):
     original_contract: str                # az eredeti, teljes szerződés szövege
     issues_to_apply: List[ContractReviewIssue]  # azok a javaslatok, amelyeket ténylegesen alkalmazni szeretnél
+    mode: Literal["diff", "full"] = "diff"      # "diff": csak az érintett pontok átírása; "full": teljes újragenerálás
+
+
+class ContractClauseChange(BaseModel):
+    issue_indexes: List[int]              # mely issues_to_apply elemek (0-tól) vonatkoznak erre a pontra
+    start: int                            # a módosított rész kezdete az eredeti szövegben (karakter)
+    end: int                              # ... és vége (kizárólagos)
+    original_text: str                    # az eredeti pont szövege
+    updated_text: str                     # az átírt pont szövege
+    match_score: float                    # a kivonat és a megtalált pont egyezése (0–1)
 
 
 class ContractApplySuggestionsResponse(BaseModel):
     updated_contract_text: str            # módosított szerződés teljes szövege
     change_summary: str                   # rövid összefoglaló arról, milyen fő változtatások történtek
+    mode: Literal["diff", "full"] = "full"        # ténylegesen melyik módon készült
+    changes: List[ContractClauseChange] = []      # strukturált diff ("diff" módban)
 
 class ContractExtractResponse(BaseModel):
     text: str
+    cache_hit: bool = False                 # a szöveg egy korábbi, azonos tartalmú feltöltésből jött
+    content_sha256: Optional[str] = None    # a feltöltött fájl tartalmának hash-e
 
 # ... (ContractGenerateRequest, ContractReviewRequest stb.)
 
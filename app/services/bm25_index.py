@@ -0,0 +1,358 @@
+import math
+import os
+import re
+import threading
+import time
+import unicodedata
+from array import array
+from collections import Counter
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+from dotenv import load_dotenv
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from ..models import RAGChunk
+from .vector_math import top_k_indices
+
+load_dotenv()
+
+DATA_DIR = Path(__file__).resolve().parent.parent.parent / "data"
+
+# a rag_init ide írja a kész indexet; ha nincs meg, az app az adatbázisból építi
+RAG_BM25_PATH = os.getenv("RAG_BM25_PATH") or str(DATA_DIR / "bm25_index.npz")
+RAG_BM25_CHECK_SEC = float(os.getenv("RAG_BM25_CHECK_SEC", "30"))
+
+BM25_K1 = 1.5
+BM25_B = 0.75
+# a forrás (pl. "Ptk. 6:130 §") tokenjei ennyiszer számítanak
+SOURCE_BOOST = 2
+
+
+# ---------------------------------------------------------
+#  MAGYAR TOKENIZÁLÁS
+# ---------------------------------------------------------
+
+# "6:130", "6 : 130", "6:130." → "6:130"
+_CITATION = re.compile(r"(?<![\d:])(\d{1,3})\s*:\s*(\d{1,4})(?!\d)")
+_WORD = re.compile(r"[a-z0-9]+")
+
+# ékezet nélküli alakban (a tokenizálás után hasonlítunk)
+_STOPWORDS = frozenset(
+    "a az egy es s is nem hogy vagy de ha mint meg mar csak el ki be fel le "
+    "ez azt ezt ami amely amelyet amelynek aki akik van volt lesz kell illetve "
+    "pedig sem mely ugy igy ilyen olyan itt ott ra re on en al szerint".split()
+)
+
+# gyakori rag- és jelvégződések (ékezet nélkül), a leghosszabbal kezdve;
+# nem teljes morfológia, csak annyi, hogy a ragozott alakok egymásra találjanak
+_SUFFIXES = sorted(
+    (
+        "aival eivel jaban jeben jabol jebol jarol jerol jatol jetol janak jenek "
+        "aban eben abol ebol arol erol atol etol anak enek aval evel akat eket okat oket "
+        "ban ben bol rol tol hoz hez nak nek val vel nal nel kent ert ait eit "
+        "ig ba be ra re on en ot at et ok ek ak ai ei ja je k t a e"
+    ).split(),
+    key=len,
+    reverse=True,
+)
+_MIN_STEM = 3
+
+# ezek a szavak egy hivatkozás-lekérdezésben nem hordoznak tartalmat
+_CITATION_NOISE = frozenset({"ptk", "paragrafus", "bekezdes", "pont", "tv", "torveny"})
+
+
+def fold(text: str) -> str:
+    """Kisbetűsítés + ékezetmentesítés (ő → o, ű → u, á → a ...)."""
+    decomposed = unicodedata.normalize("NFKD", text.casefold())
+    return "".join(ch for ch in decomposed if not unicodedata.combining(ch))
+
+
+def stem(word: str) -> str:
+    if word.isdigit():
+        return word
+    for suffix in _SUFFIXES:
+        if word.endswith(suffix) and len(word) - len(suffix) >= _MIN_STEM:
+            return word[: -len(suffix)]
+    return word
+
+
+def citations_in(text: str) -> List[str]:
+    return [f"{a}:{b}" for a, b in _CITATION.findall(text)]
+
+
+def analyze(text: str) -> List[str]:
+    """Szöveg → tokenek: paragrafus-hivatkozások egyben, a többi szó ékezet nélkül, tövezve."""
+    tokens = citations_in(text)
+    rest = fold(_CITATION.sub(" ", text))
+    tokens.extend(
+        stem(word) for word in _WORD.findall(rest)
+        if len(word) > 1 and word not in _STOPWORDS
+    )
+    return tokens
+
+
+def is_citation_query(query: str) -> bool:
+    """Pl. "Ptk. 6:130 §", "6:130" – csak hivatkozás, érdemi szöveg nélkül."""
+    if not citations_in(query):
+        return False
+    rest = _WORD.findall(fold(_CITATION.sub(" ", query)))
+    return all(word in _CITATION_NOISE or word.isdigit() for word in rest)
+
+
+# ---------------------------------------------------------
+#  BM25 INDEX (CSR postings listák numpy tömbökben)
+# ---------------------------------------------------------
+
+def _pack_strings(items: List[str]) -> np.ndarray:
+    return np.frombuffer("\n".join(items).encode("utf-8"), dtype=np.uint8)
+
+
+def _unpack_strings(packed: np.ndarray) -> List[str]:
+    data = packed.tobytes().decode("utf-8")
+    return data.split("\n") if data else []
+
+
+class BM25Index:
+    """
+    Tömör inverz index a RAGChunk.content + source mezőkre.
+
+    Termenként CSR-ben tárolt postings listák (offsets / doc_idx / tf),
+    így a keresés termenként egy szeletelés + vektoros pontozás.
+    A forrásban szereplő paragrafus-hivatkozásokhoz (pl. "6:130") külön
+    szótár tartozik: a pontos hivatkozásra egyetlen dict-keresés a válasz.
+    """
+
+    def __init__(
+        self,
+        chunk_ids: np.ndarray,
+        doc_len: np.ndarray,
+        terms: List[str],
+        offsets: np.ndarray,
+        doc_idx: np.ndarray,
+        tf: np.ndarray,
+        citation_keys: List[str],
+        citation_offsets: np.ndarray,
+        citation_docs: np.ndarray,
+    ) -> None:
+        self.chunk_ids = chunk_ids
+        self.doc_len = doc_len
+        self.terms = terms
+        self.offsets = offsets
+        self.doc_idx = doc_idx
+        self.tf = tf
+        self.citation_keys = citation_keys
+        self.citation_offsets = citation_offsets
+        self.citation_docs = citation_docs
+
+        self._term_id = {term: i for i, term in enumerate(terms)}
+        self._citation_id = {key: i for i, key in enumerate(citation_keys)}
+
+        n_docs = max(1, chunk_ids.shape[0])
+        df = np.diff(offsets).astype(np.float32)
+        self.idf = np.log1p((n_docs - df + 0.5) / (df + 0.5)).astype(np.float32)
+        avgdl = float(doc_len.mean()) if doc_len.size else 1.0
+        # a dokumentumhossz-normálás doc-onként előre kiszámolva
+        self._norm = (BM25_K1 * (1.0 - BM25_B + BM25_B * doc_len / max(avgdl, 1e-9))).astype(np.float32)
+
+    def __len__(self) -> int:
+        return int(self.chunk_ids.shape[0])
+
+    # -----------------------------------------------------
+    #  ÉPÍTÉS
+    # -----------------------------------------------------
+    @classmethod
+    def build(cls, docs: Iterable[Tuple[int, str, str]]) -> "BM25Index":
+        """docs: (RAGChunk.id, source, content) hármasok, akár generátorból."""
+        vocab: Dict[str, int] = {}
+        term_col, doc_col, tf_col = array("i"), array("i"), array("f")
+        citations: Dict[str, List[int]] = {}
+        chunk_ids, doc_len = array("q"), array("f")
+
+        for doc, (chunk_id, source, content) in enumerate(docs):
+            source = source or ""
+            tokens = analyze(content or "") + analyze(source) * SOURCE_BOOST
+            for term, count in Counter(tokens).items():
+                term_col.append(vocab.setdefault(term, len(vocab)))
+                doc_col.append(doc)
+                tf_col.append(count)
+
+            for citation in dict.fromkeys(citations_in(source)):
+                citations.setdefault(citation, []).append(doc)
+
+            chunk_ids.append(chunk_id)
+            doc_len.append(len(tokens))
+
+        terms_arr = np.frombuffer(term_col, dtype=np.int32) if term_col else np.empty(0, np.int32)
+        docs_arr = np.frombuffer(doc_col, dtype=np.int32) if doc_col else np.empty(0, np.int32)
+        tf_arr = np.frombuffer(tf_col, dtype=np.float32) if tf_col else np.empty(0, np.float32)
+
+        order = np.lexsort((docs_arr, terms_arr))
+        offsets = np.zeros(len(vocab) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(terms_arr, minlength=len(vocab)), out=offsets[1:])
+
+        terms = [""] * len(vocab)
+        for term, i in vocab.items():
+            terms[i] = term
+
+        citation_keys = list(citations)
+        citation_offsets = np.zeros(len(citation_keys) + 1, dtype=np.int64)
+        np.cumsum([len(citations[k]) for k in citation_keys], out=citation_offsets[1:])
+        citation_docs = np.array(
+            [d for k in citation_keys for d in citations[k]], dtype=np.int32
+        )
+
+        return cls(
+            chunk_ids=np.frombuffer(chunk_ids, dtype=np.int64).copy(),
+            doc_len=np.frombuffer(doc_len, dtype=np.float32).copy(),
+            terms=terms,
+            offsets=offsets,
+            doc_idx=docs_arr[order],
+            tf=tf_arr[order],
+            citation_keys=citation_keys,
+            citation_offsets=citation_offsets,
+            citation_docs=citation_docs,
+        )
+
+    @classmethod
+    def build_from_db(cls, db: Session, batch_size: int = 1000) -> "BM25Index":
+        rows = (
+            db.query(RAGChunk.id, RAGChunk.source, RAGChunk.content)
+            .order_by(RAGChunk.id)
+            .yield_per(batch_size)
+        )
+        return cls.build(rows)
+
+    # -----------------------------------------------------
+    #  MENTÉS / BETÖLTÉS
+    # -----------------------------------------------------
+    def save(self, path: str) -> None:
+        """Atomi mentés: ideiglenes fájlba írunk, majd os.replace."""
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        tmp_path = f"{path}.tmp-{os.getpid()}"
+        with open(tmp_path, "wb") as f:
+            np.savez(
+                f,
+                chunk_ids=self.chunk_ids,
+                doc_len=self.doc_len,
+                terms=_pack_strings(self.terms),
+                offsets=self.offsets,
+                doc_idx=self.doc_idx,
+                tf=self.tf,
+                citation_keys=_pack_strings(self.citation_keys),
+                citation_offsets=self.citation_offsets,
+                citation_docs=self.citation_docs,
+            )
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: str) -> "BM25Index":
+        with np.load(path) as data:
+            return cls(
+                chunk_ids=data["chunk_ids"],
+                doc_len=data["doc_len"],
+                terms=_unpack_strings(data["terms"]),
+                offsets=data["offsets"],
+                doc_idx=data["doc_idx"],
+                tf=data["tf"],
+                citation_keys=_unpack_strings(data["citation_keys"]),
+                citation_offsets=data["citation_offsets"],
+                citation_docs=data["citation_docs"],
+            )
+
+    # -----------------------------------------------------
+    #  KERESÉS
+    # -----------------------------------------------------
+    def search(self, query: str, top_k: int = 5) -> List[Tuple[float, int]]:
+        """BM25 top-k. Visszatér: [(pontszám, RAGChunk.id), ...] csökkenő sorrendben."""
+        term_ids = {self._term_id[t] for t in analyze(query) if t in self._term_id}
+        if not term_ids:
+            return []
+
+        scores = np.zeros(len(self), dtype=np.float32)
+        for t in term_ids:
+            start, end = self.offsets[t], self.offsets[t + 1]
+            docs = self.doc_idx[start:end]
+            tf = self.tf[start:end]
+            scores[docs] += self.idf[t] * tf * (BM25_K1 + 1.0) / (tf + self._norm[docs])
+
+        idx = top_k_indices(scores, top_k)
+        return [(float(scores[i]), int(self.chunk_ids[i])) for i in idx if scores[i] > 0]
+
+    def lookup_citations(self, query: str) -> List[int]:
+        """
+        Azok a RAGChunk id-k, amelyek forrása a query-ben szereplő
+        hivatkozás(ok)ra mutat – embedding és pontozás nélkül.
+        """
+        result: List[int] = []
+        for citation in citations_in(query):
+            i = self._citation_id.get(citation)
+            if i is None:
+                continue
+            docs = self.citation_docs[self.citation_offsets[i]:self.citation_offsets[i + 1]]
+            result.extend(int(self.chunk_ids[d]) for d in docs)
+        return list(dict.fromkeys(result))
+
+
+# ---------------------------------------------------------
+#  PROCESSZ-SZINTŰ LEXIKÁLIS INDEX
+# ---------------------------------------------------------
+
+class LexicalIndex:
+    """
+    A BM25 index betöltése / frissítése:
+    - ha van RAG_BM25_PATH fájl (a rag_init írja), azt töltjük, és mtime
+      változáskor újratöltjük,
+    - ha nincs, az adatbázisból építjük, és a tábla (count, max id)
+      aláírásának változásakor újraépítjük.
+    """
+
+    def __init__(self, path: Optional[str] = RAG_BM25_PATH) -> None:
+        self.path = path
+        self._index: Optional[BM25Index] = None
+        self._signature: Optional[Tuple] = None
+        self._last_check = 0.0
+        self._lock = threading.Lock()
+
+    @property
+    def index(self) -> Optional[BM25Index]:
+        return self._index
+
+    def maybe_refresh(self, db: Session) -> Optional[BM25Index]:
+        if self._index is not None and time.monotonic() - self._last_check < RAG_BM25_CHECK_SEC:
+            return self._index
+
+        with self._lock:
+            self._last_check = time.monotonic()
+
+            if self.path and os.path.exists(self.path):
+                signature = ("file", os.stat(self.path).st_mtime_ns)
+                if signature != self._signature:
+                    self._index = BM25Index.load(self.path)
+                    self._signature = signature
+                return self._index
+
+            count, max_id = db.query(func.count(RAGChunk.id), func.max(RAGChunk.id)).one()
+            signature = ("db", count, max_id)
+            if signature != self._signature:
+                self._index = BM25Index.build_from_db(db)
+                self._signature = signature
+            return self._index
+
+    def set_index(self, index: BM25Index) -> None:
+        with self._lock:
+            self._index = index
+            self._signature = ("manual", time.monotonic())
+            self._last_check = time.monotonic()
+
+
+lexical_index = LexicalIndex()
+
+
+def write_bm25_index(db: Session, path: str = RAG_BM25_PATH) -> BM25Index:
+    """Ingestion után: index építése az adatbázisból és mentése."""
+    index = BM25Index.build_from_db(db)
+    index.save(path)
+    return index
@@ -2,15 +2,75 @@ import time
 import json
 
 import time
-from app.utils.template_loader import load_contract_template
+from app.services.template_registry import template_registry
 from app.services.party_normalizer import normalize_parties_cached
 from app.services.prompt_builder import build_contract_prompt
-from app.services.openai_service import call_openai
-from app.utils.template_loader import fill_template_with_placeholders
-from app.utils.template_loader import extract_placeholders
+from typing import AsyncIterator, Tuple
+
+from app.services.openai_service import call_openai, call_openai_async, call_openai_stream
 
 print("🔥 LOADED contract_generator.py FROM:", __file__)
 
+
+def _normalize_mode(mode) -> str:
+    mode = getattr(mode, "value", mode)   # Enum esetén
+    mode = str(mode).strip().lower()      # " FAST " → "fast"
+    if "." in mode:
+        mode = mode.split(".")[-1]        # "GenerationMode.fast" → "fast"
+    return mode
+
+
+# ==================================================
+# 🧠 DETAILED MODE – prompt és eredmény (sync / async közös)
+# ==================================================
+DETAILED_MODEL = "gpt-4o"
+DETAILED_MAX_TOKENS = 3500
+DETAILED_TEMPERATURE = 0.3
+
+
+def _detailed_call_args(contract_type: str, form_data: dict, mode: str) -> dict:
+    # 1️⃣ Template betöltése
+    template_html = template_registry.get(contract_type, "detailed").source
+
+    # 2️⃣ Prompt építése
+    prompt = build_contract_prompt(
+        template_html=template_html,
+        form_data=form_data,
+        mode=mode,
+    )
+
+    return {
+        "model": DETAILED_MODEL,
+        "system_prompt": (
+            "Te egy magyar jogra specializált szerződésgenerátor vagy. "
+            "Feladatod egy részletes, kiegyensúlyozott, magyar jog szerint "
+            "strukturált szerződéstervezet elkészítése."
+        ),
+        "user_prompt": prompt,
+        "temperature": DETAILED_TEMPERATURE,
+        "max_tokens": DETAILED_MAX_TOKENS,
+    }
+
+
+def _detailed_result(response: dict, start_time: float) -> dict:
+    contract_html = response.get("content", "")
+
+    duration = round(time.perf_counter() - start_time, 2)
+
+    telemetry = {
+        "mode": "detailed",
+        "model": DETAILED_MODEL,
+        "duration_sec": duration,
+        "max_tokens": DETAILED_MAX_TOKENS,
+    }
+
+    return {
+        "contract_html": contract_html,
+        "summary_hu": "Részletes szerződéstervezet generálva.",
+        "telemetry": telemetry,
+    }
+
+
 def generate_contract(
     contract_type: str,
     mode: str,
@@ -30,10 +90,7 @@ def generate_contract(
 
     # 🔧 MODE NORMALIZÁLÁS (KRITIKUS)
     raw_mode = mode
-    mode = getattr(mode, "value", mode)   # Enum esetén
-    mode = str(mode).strip().lower()      # " FAST " → "fast"
-    if "." in mode:
-        mode = mode.split(".")[-1]        # "GenerationMode.fast" → "fast"
+    mode = _normalize_mode(mode)
 
     print("🧪 MODE DEBUG:", raw_mode, "→", mode, type(raw_mode))
 
@@ -147,35 +204,22 @@ def generate_contract(
 
         form_data = normalized_form_data
 
-        template_html = load_contract_template(contract_type, "fast")
-        print("📄 TEMPLATE LENGTH:", len(template_html))
-
-        placeholders = extract_placeholders(template_html)
-        print("🧩 PLACEHOLDERS FOUND:", placeholders)
+        # előfordított sablon a registryből (induláskor betöltve, hot-reload)
+        template = template_registry.get(contract_type, "fast").compiled
+        print("📄 TEMPLATE LENGTH:", len(template.source))
+        print("🧩 PLACEHOLDERS FOUND:", template.placeholders)
 
 
         print("📥 FORM DATA:", form_data)
 
         # ⚡ FAST DIRECT MAPPING – TEMPLATE KULCSOK ALAPJÁN
-        mapped_values = {}
-
-        for placeholder in placeholders:
-            key = placeholder.lower()
-
-            for form_key, value in form_data.items():
-                if key in form_key.lower():
-                    mapped_values[placeholder] = value
-                    break
-            else:
-                mapped_values[placeholder] = ""
+        # (placeholder → form kulcs leképezés form-kulcs készletenként memoizált)
+        mapped_values = template.map_values(form_data)
 
 
         print("🤖 MAPPED VALUES:", mapped_values)
 
-        contract_html = fill_template_with_placeholders(
-            template_html,
-            mapped_values,
-        )
+        contract_html = template.render(mapped_values)
 
         
         print("📄 FINAL HTML LENGTH:", len(contract_html))
@@ -200,49 +244,61 @@ def generate_contract(
     # 🧠 DETAILED MODE – teljes AI generálás
     # ==================================================
     else:
-        model = "gpt-4o"
-        max_tokens = 3500
-        temperature = 0.3
+        # 3️⃣ OpenAI hívás
+        response = call_openai(**_detailed_call_args(contract_type, form_data, mode))
+        return _detailed_result(response, start_time)
 
-        # 1️⃣ Template betöltése
-        template_html = load_contract_template(contract_type, "detailed")
 
-        # 2️⃣ Prompt építése
-        prompt = build_contract_prompt(
-            template_html=template_html,
-            form_data=form_data,
-            mode=mode,
-        )
+async def generate_contract_async(
+    contract_type: str,
+    mode: str,
+    form_data: dict,
+):
+    """
+    Mint a generate_contract(), de DETAILED módban az OpenAI hívást a
+    megosztott AsyncOpenAI klienssel várjuk (nem blokkolja az eseményhurkot).
+    A FAST mód nem hív API-t, azt változatlanul szinkron futtatjuk.
+    """
+    if _normalize_mode(mode) == "fast":
+        return generate_contract(contract_type, mode, form_data)
 
-        # 3️⃣ OpenAI hívás
-        response = call_openai(
-            model=model,
-            system_prompt=(
-                "Te egy magyar jogra specializált szerződésgenerátor vagy. "
-                "Feladatod egy részletes, kiegyensúlyozott, magyar jog szerint "
-                "strukturált szerződéstervezet elkészítése."
-            ),
-            user_prompt=prompt,
-            temperature=temperature,
-            max_tokens=max_tokens,
-        )
-
-        contract_html = response.get("content", "")
+    start_time = time.perf_counter()
+    call_args = _detailed_call_args(contract_type, form_data, _normalize_mode(mode))
+    response = await call_openai_async(**call_args)
+    return _detailed_result(response, start_time)
 
-        duration = round(time.perf_counter() - start_time, 2)
 
-        telemetry = {
-            "mode": "detailed",
-            "model": model,
-            "duration_sec": duration,
-            "max_tokens": max_tokens,
-        }
 
-        return {
-            "contract_html": contract_html,
-            "summary_hu": "Részletes szerződéstervezet generálva.",
-            "telemetry": telemetry,
-        }
+def generate_contract_stream(
+    contract_type: str,
+    mode: str,
+    form_data: dict,
+) -> Tuple[AsyncIterator[str], dict]:
+    """
+    Streamelt generálás az SSE endpointhoz.
+    A sablon betöltése és a prompt építése itt, azonnal történik (a hibák még
+    HTTP hibaként jöhetnek vissza); a visszaadott iterátor a modell tokenjeit adja.
+    FAST módban nincs API hívás: a kész szöveg egyetlen darabban jön.
+    Visszatér: (token-iterátor, alap telemetria).
+    """
+    if _normalize_mode(mode) == "fast":
+        result = generate_contract(contract_type, mode, form_data)
+
+        async def single_chunk() -> AsyncIterator[str]:
+            yield result["contract_html"]
+
+        return single_chunk(), result["telemetry"]
+
+    call_args = _detailed_call_args(contract_type, form_data, _normalize_mode(mode))
+    telemetry = {
+        "mode": "detailed",
+        "model": DETAILED_MODEL,
+        "max_tokens": DETAILED_MAX_TOKENS,
+        "streamed": True,
+    }
+    return call_openai_stream(**call_args), telemetry
+
+
 def generate_placeholder_mapping_fast(
     placeholders: list[str],
     form_data: dict,
@@ -0,0 +1,178 @@
+import asyncio
+import functools
+import multiprocessing
+import os
+import threading
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Dict, Optional, TypeVar
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+T = TypeVar("T")
+
+# ---------------------------------------------------------
+#  KONFIGURÁCIÓ
+# ---------------------------------------------------------
+# worker processzek száma; 0 → szálakon fut (pl. fejlesztéskor / korlátozott környezetben)
+DOC_WORKERS = int(os.getenv("DOC_WORKERS", str(min(4, os.cpu_count() or 1))))
+# ennyi job lehet egyszerre a poolban (futó + várakozó); felette 429
+DOC_MAX_PENDING = int(os.getenv("DOC_MAX_PENDING", str(max(1, DOC_WORKERS) * 4)))
+DOC_JOB_TIMEOUT_SEC = float(os.getenv("DOC_JOB_TIMEOUT_SEC", "60"))
+# "spawn": a worker nem örökli a szülő szálait / kapcsolatait (uvicorn, OpenAI kliens, watcher)
+DOC_POOL_START_METHOD = os.getenv("DOC_POOL_START_METHOD", "spawn")
+# 429 esetén a kliensnek javasolt várakozás
+DOC_RETRY_AFTER_SEC = int(os.getenv("DOC_RETRY_AFTER_SEC", "2"))
+
+
+class PoolSaturatedError(Exception):
+    """A dokumentum-pool tele van (DOC_MAX_PENDING) – a kérést el kell utasítani (429)."""
+
+
+class JobTimeoutError(Exception):
+    """A job nem végzett DOC_JOB_TIMEOUT_SEC alatt (504)."""
+
+
+def _warm_worker() -> None:
+    # a PDF fontok / stílusok processzenként egyszer épülnek fel (lásd pdf_render_context)
+    try:
+        from .pdf_render_context import get_pdf_context
+
+        get_pdf_context()
+    except Exception as e:
+        print("PDF kontextus előkészítése sikertelen a workerben:", e)
+
+
+class DocumentPool:
+    """
+    Processz-pool a CPU-igényes dokumentummunkához (PDF / DOCX export,
+    PDF / DOCX szövegkinyerés), hogy az eseményhurok szabad maradjon:
+    - korlátos sor: legfeljebb max_pending job lehet bent, felette
+      PoolSaturatedError (→ 429 + Retry-After),
+    - jobonkénti timeout (JobTimeoutError → 504); a lejárt job helye csak a
+      tényleges befejezésekor szabadul fel, így a telítettség valós marad,
+    - összeomlott worker (BrokenProcessPool) esetén a poolt újraépítjük.
+    """
+
+    def __init__(
+        self,
+        workers: int = DOC_WORKERS,
+        max_pending: int = DOC_MAX_PENDING,
+        timeout_sec: float = DOC_JOB_TIMEOUT_SEC,
+        start_method: str = DOC_POOL_START_METHOD,
+    ) -> None:
+        self.workers = workers
+        self.max_pending = max_pending
+        self.timeout_sec = timeout_sec
+        self.start_method = start_method
+
+        self._executor: Optional[Executor] = None
+        self._lock = threading.Lock()
+        self._pending = 0
+
+        self.completed = 0
+        self.rejected = 0
+        self.timeouts = 0
+        self.errors = 0
+        self.restarts = 0
+
+    # -----------------------------------------------------
+    #  ÉLETCIKLUS
+    # -----------------------------------------------------
+    def _create_executor(self) -> Executor:
+        if self.workers <= 0:
+            return ThreadPoolExecutor(max_workers=4, thread_name_prefix="doc-worker")
+        return ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=multiprocessing.get_context(self.start_method),
+            initializer=_warm_worker,
+        )
+
+    def start(self) -> None:
+        with self._lock:
+            if self._executor is None:
+                self._executor = self._create_executor()
+
+    def shutdown(self) -> None:
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def _restart(self, broken: Executor) -> None:
+        with self._lock:
+            if self._executor is not broken:
+                return  # más már újraépítette
+            self._executor = self._create_executor()
+            self.restarts += 1
+        broken.shutdown(wait=False, cancel_futures=True)
+        print("Dokumentum-pool újraindítva (összeomlott worker).")
+
+    # -----------------------------------------------------
+    #  FUTTATÁS
+    # -----------------------------------------------------
+    def _acquire(self) -> Executor:
+        self.start()
+        with self._lock:
+            if self._pending >= self.max_pending:
+                self.rejected += 1
+                raise PoolSaturatedError(
+                    f"A dokumentumfeldolgozás jelenleg túlterhelt ({self._pending} folyamatban lévő job)."
+                )
+            self._pending += 1
+            return self._executor
+
+    def _release(self, future: Future) -> None:
+        with self._lock:
+            self._pending -= 1
+            if not future.cancelled() and future.exception() is None:
+                self.completed += 1
+
+    async def run(self, fn: Callable[..., T], *args: Any, timeout: Optional[float] = None, **kwargs: Any) -> T:
+        """fn(*args, **kwargs) futtatása a poolban; fn és az argumentumok legyenek pickle-ölhetők."""
+        executor = self._acquire()
+        try:
+            future = executor.submit(functools.partial(fn, *args, **kwargs))
+        except BaseException:
+            with self._lock:
+                self._pending -= 1
+            raise
+        future.add_done_callback(self._release)
+
+        try:
+            return await asyncio.wait_for(asyncio.wrap_future(future), timeout or self.timeout_sec)
+        except asyncio.TimeoutError:
+            with self._lock:
+                self.timeouts += 1
+            raise JobTimeoutError(
+                f"A dokumentumfeldolgozás nem fejeződött be {timeout or self.timeout_sec:g} mp alatt."
+            ) from None
+        except BrokenProcessPool:
+            with self._lock:
+                self.errors += 1
+            self._restart(executor)
+            raise
+        except Exception:
+            with self._lock:
+                self.errors += 1
+            raise
+
+    def stats(self) -> Dict[str, object]:
+        with self._lock:
+            return {
+                "mode": "process" if self.workers > 0 else "thread",
+                "workers": self.workers,
+                "pending": self._pending,
+                "max_pending": self.max_pending,
+                "timeout_sec": self.timeout_sec,
+                "completed": self.completed,
+                "rejected": self.rejected,
+                "timeouts": self.timeouts,
+                "errors": self.errors,
+                "restarts": self.restarts,
+            }
+
+
+document_pool = DocumentPool()
@@ -1,17 +1,123 @@
+import os
+import re
 from pathlib import Path
-from typing import Any, Dict, Optional
+from typing import Any, Dict, List, Optional, Tuple
 
-from jinja2 import Environment, FileSystemLoader, select_autoescape
+from dotenv import load_dotenv
+from jinja2 import Environment, FileSystemBytecodeCache, FileSystemLoader, Template, select_autoescape
+from markupsafe import escape
+
+from ..utils.lru_cache import LRUCache
+
+load_dotenv()
 
 # templates könyvtár: app/templates
 BASE_DIR = Path(__file__).resolve().parent.parent
 TEMPLATES_DIR = BASE_DIR / "templates"
 
+# lefordított sablonok (bytecode) tára: újraindítás után nem kell újra fordítani; üres → kikapcsolva
+DATA_DIR = BASE_DIR.parent / "data"
+JINJA_BYTECODE_CACHE_DIR = os.getenv("JINJA_BYTECODE_CACHE_DIR", str(DATA_DIR / "jinja_cache"))
+# ennyi branding-változat előrenderelt layoutját tartjuk memóriában
+LAYOUT_CACHE_SIZE = int(os.getenv("LAYOUT_CACHE_SIZE", "64"))
+
+
+def _bytecode_cache() -> Optional[FileSystemBytecodeCache]:
+    if not JINJA_BYTECODE_CACHE_DIR:
+        return None
+    try:
+        os.makedirs(JINJA_BYTECODE_CACHE_DIR, exist_ok=True)
+    except OSError as e:
+        print("Jinja bytecode cache kikapcsolva:", e)
+        return None
+    return FileSystemBytecodeCache(JINJA_BYTECODE_CACHE_DIR)
+
+
 env = Environment(
     loader=FileSystemLoader(str(TEMPLATES_DIR)),
     autoescape=select_autoescape(["html", "xml"]),
+    bytecode_cache=_bytecode_cache(),
+    # a feldolgozott sablonok memóriában maradnak (fájlváltozáskor újratöltődnek)
+    cache_size=400,
 )
 
+LAYOUT_TEMPLATE = "layout/base.html"
+
+DEFAULT_LAYOUT_VARS = {
+    "document_title": "Szerződés",
+    "document_date": "",
+    "document_number": "",
+    "brand_name": "Magyar SzerződésGPT",
+    "brand_subtitle": "AI-alapú szerződésgenerálás (általános tájékoztatás)",
+    "footer_text": "A dokumentum automatikusan generált, és nem minősül jogi tanácsadásnak.",
+}
+
+# brandingenként állandó layout mezők (a fejléc / lábléc "kerete")
+BRANDING_VARS = ("brand_name", "brand_subtitle", "footer_text")
+# dokumentumonként változó mezők; a contract_html már kész HTML (| safe a layoutban)
+DOCUMENT_VARS = ("document_title", "document_date", "document_number", "contract_html")
+_RAW_VARS = {"contract_html"}
+
+
+# ---------------------------------------------------------
+#  ELŐRENDERELT LAYOUT (brandingenként)
+# ---------------------------------------------------------
+# A layoutot egyszer, jelölő értékekkel rendereljük ki, és a jelölők mentén
+# darabokra vágjuk; exportkor csak a dokumentum mezőit kell a darabok közé
+# fűzni (a CSS, fejléc és lábléc nem renderelődik újra).
+
+_MARKER = "\x00{}\x00"
+_MARKER_PATTERN = re.compile("\x00(" + "|".join(DOCUMENT_VARS) + ")\x00")
+
+
+class _PrerenderedLayout:
+    def __init__(self, literals: List[str], names: List[str]) -> None:
+        self.literals = literals
+        self.names = names
+
+    def render(self, values: Dict[str, Any]) -> str:
+        out = [self.literals[0]]
+        for name, literal in zip(self.names, self.literals[1:]):
+            value = values[name]
+            out.append(str(value) if name in _RAW_VARS else str(escape(value)))
+            out.append(literal)
+        return "".join(out)
+
+
+# branding → (layout Template, előrenderelt változat vagy None, ha nem bontható)
+_layouts: LRUCache[Tuple[Template, Optional[_PrerenderedLayout]]] = LRUCache(max_entries=LAYOUT_CACHE_SIZE)
+
+
+def _prerender_layout(template: Template, branding: Dict[str, Any]) -> Optional[_PrerenderedLayout]:
+    markers = {name: _MARKER.format(name) for name in DOCUMENT_VARS}
+    parts = _MARKER_PATTERN.split(template.render({**branding, **markers}))
+
+    # ha a layout szűrőt / feltételt tesz egy dokumentum mezőre, a jelölő eltűnik
+    # vagy torzul → ennél a layoutnál maradunk a teljes renderelésnél
+    names = parts[1::2]
+    if set(names) != set(DOCUMENT_VARS) or any("\x00" in literal for literal in parts[0::2]):
+        return None
+
+    # a jelölő mindig "igaz": egy {% if document_number %} ág vagy default() szűrő
+    # a jelölős renderben másképp fut le, mint üres értékkel. Üres mezőkkel is
+    # kirendereljük, és csak akkor bontunk, ha a darabok összefűzése pontosan ezt adja.
+    empty = {name: "" for name in DOCUMENT_VARS}
+    if template.render({**branding, **empty}) != "".join(parts[0::2]):
+        return None
+    return _PrerenderedLayout(parts[0::2], names)
+
+
+def _layout_for(branding: Dict[str, Any]) -> Tuple[Template, Optional[_PrerenderedLayout]]:
+    # a get_template a memóriából jön; fájlváltozáskor új Template objektumot ad
+    template = env.get_template(LAYOUT_TEMPLATE)
+    key = tuple(str(branding[name]) for name in BRANDING_VARS)
+
+    cached = _layouts.get(key)
+    if cached is None or cached[0] is not template:
+        cached = (template, _prerender_layout(template, branding))
+        _layouts.set(key, cached)
+    return cached
+
 
 def render_contract_html(
     template_name: str,
@@ -22,7 +128,8 @@ def render_contract_html(
     Összerakja a teljes HTML dokumentumot:
     - betölti a contracts/{template_name}.html sablont,
     - abba beleteszi a template_vars változókat,
-    - majd a layout/base.html-be ágyazza contract_html néven.
+    - majd a layout/base.html-be ágyazza contract_html néven
+      (a brandinghez előrenderelt layout darabjai közé).
     """
 
     layout_vars = layout_vars or {}
@@ -33,23 +140,10 @@ def render_contract_html(
     contract_html = contract_template.render(**template_vars)
 
     # 2) master layout
-    base_template = env.get_template("layout/base.html")
-
-    context = {
-        "document_title": layout_vars.get("document_title", "Szerződés"),
-        "document_date": layout_vars.get("document_date", ""),
-        "document_number": layout_vars.get("document_number", ""),
-        "brand_name": layout_vars.get("brand_name", "Magyar SzerződésGPT"),
-        "brand_subtitle": layout_vars.get(
-            "brand_subtitle",
-            "AI-alapú szerződésgenerálás (általános tájékoztatás)",
-        ),
-        "footer_text": layout_vars.get(
-            "footer_text",
-            "A dokumentum automatikusan generált, és nem minősül jogi tanácsadásnak.",
-        ),
-        "contract_html": contract_html,
-    }
-
-    full_html = base_template.render(**context)
-    return full_html
+    context = {name: layout_vars.get(name, default) for name, default in DEFAULT_LAYOUT_VARS.items()}
+    context["contract_html"] = contract_html
+
+    base_template, layout = _layout_for(context)
+    if layout is None:
+        return base_template.render(**context)
+    return layout.render(context)
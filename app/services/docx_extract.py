@@ -0,0 +1,134 @@
+import re
+import zipfile
+from typing import IO, Iterator, List, Union
+from xml.etree.ElementTree import Element, iterparse
+
+# ---------------------------------------------------------
+#  DOCX SZÖVEGKINYERÉS STREAMELVE (python-docx objektumfa nélkül)
+# ---------------------------------------------------------
+# A word/document.xml-t közvetlenül a zipből, iterparse-szal olvassuk:
+# - bekezdések és táblázatsorok dokumentumsorrendben,
+# - a feldolgozott elemeket azonnal eldobjuk (korlátos memória),
+# - a fejlécek / láblécek (word/header*.xml, word/footer*.xml) szövege is
+#   bekerül: a fejléc elöl, a lábléc a végén, az ismétlődőek egyszer.
+
+W = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+MC = "{http://schemas.openxmlformats.org/markup-compatibility/2006}"
+
+_P, _T, _TBL, _TR, _TC = W + "p", W + "t", W + "tbl", W + "tr", W + "tc"
+_BODY = W + "body"
+_TEXTBOX = W + "txbxContent"
+_FALLBACK = MC + "Fallback"
+
+# futáson belüli, szöveget jelentő elemek
+_RUN_TEXT = {
+    W + "tab": "\t",
+    W + "br": "\n",
+    W + "cr": "\n",
+    W + "noBreakHyphen": "-",
+}
+
+# táblázatsor celláinak elválasztója a kinyert szövegben
+CELL_SEPARATOR = " | "
+
+_PART = re.compile(r"^word/(header|footer)(\d*)\.xml$")
+
+
+def _paragraph_text(paragraph: Element) -> str:
+    """A bekezdés szövege; a szövegdobozok bekezdései külön eseményként jönnek."""
+    parts: List[str] = []
+    stack = [paragraph]
+    while stack:
+        element = stack.pop()
+        if element.tag == _T:
+            parts.append(element.text or "")
+        elif element.tag in _RUN_TEXT:
+            parts.append(_RUN_TEXT[element.tag])
+        stack.extend(child for child in reversed(element) if child.tag not in (_TEXTBOX, _FALLBACK))
+    return "".join(parts)
+
+
+def iter_part_blocks(xml_file: IO) -> Iterator[str]:
+    """
+    Egy WordprocessingML rész (document / header / footer) blokkjai:
+    bekezdésenként egy szöveg, táblázatsoronként a cellák szövege
+    CELL_SEPARATOR-ral összefűzve (a cellán belüli bekezdések szóközzel).
+    """
+    # nyitott táblázatok: sorok → aktuális sor cellái → aktuális cella bekezdései
+    rows: List[List[str]] = []
+    cells: List[List[str]] = []
+    tables = 0
+    fallback = 0
+    parents: List[Element] = []
+
+    for event, element in iterparse(xml_file, events=("start", "end")):
+        tag = element.tag
+        if event == "start":
+            parents.append(element)
+            if tag == _FALLBACK:
+                fallback += 1
+            elif tag == _TBL:
+                tables += 1
+            elif tag == _TR and tables == 1:
+                rows.append([])
+            elif tag == _TC and tables == 1:
+                cells.append([])
+            continue
+
+        parents.pop()
+        if tag == _FALLBACK:
+            # az mc:Fallback a Choice ág régi formátumú másolata
+            fallback -= 1
+        elif fallback:
+            pass
+        elif tag == _P:
+            text = _paragraph_text(element)
+            if tables:
+                if cells and text:
+                    cells[-1].append(text)
+            else:
+                yield text
+        elif tag == _TC and tables == 1:
+            rows[-1].append(" ".join(cells.pop()))
+        elif tag == _TR and tables == 1:
+            row = rows.pop()
+            if any(row):
+                yield CELL_SEPARATOR.join(row)
+        elif tag == _TBL:
+            tables -= 1
+
+        # a body (fejlécnél / láblécnél a gyökér) közvetlen gyerekeit feldolgozás után eldobjuk
+        if parents and (parents[-1].tag == _BODY or len(parents) == 1):
+            parents[-1].clear()
+
+
+def iter_docx_blocks(source: Union[str, IO], headers_footers: bool = True) -> Iterator[str]:
+    with zipfile.ZipFile(source) as archive:
+        names = archive.namelist()
+        parts = sorted(
+            (match.group(1), int(match.group(2) or 0), name)
+            for name in names
+            if (match := _PART.match(name))
+        )
+
+        def unique_blocks(kind: str) -> Iterator[str]:
+            seen = set()
+            for part_kind, _number, name in parts:
+                if part_kind != kind:
+                    continue
+                with archive.open(name) as xml_file:
+                    block = "\n".join(b for b in iter_part_blocks(xml_file) if b.strip())
+                if block and block not in seen:
+                    seen.add(block)
+                    yield block
+
+        if headers_footers:
+            yield from unique_blocks("header")
+        with archive.open("word/document.xml") as xml_file:
+            yield from iter_part_blocks(xml_file)
+        if headers_footers:
+            yield from unique_blocks("footer")
+
+
+def extract_docx_text(source: Union[str, IO], headers_footers: bool = True) -> str:
+    return "\n".join(iter_docx_blocks(source, headers_footers))
@@ -0,0 +1,110 @@
+import hashlib
+import os
+import re
+import threading
+import unicodedata
+from typing import Callable, Dict, Optional, Sequence
+
+import numpy as np
+from dotenv import load_dotenv
+
+from ..utils.lru_cache import LRUCache
+from ..utils.sqlite_cache import SQLiteCache
+from .embedding_codec import decode_embedding, encode_embedding
+
+load_dotenv()
+
+EMBED_CACHE_MAX_ENTRIES = int(os.getenv("EMBED_CACHE_MAX_ENTRIES", "10000"))
+EMBED_CACHE_TTL_SEC = float(os.getenv("EMBED_CACHE_TTL_SEC", str(7 * 24 * 3600)))
+# opcionális perzisztens tár (SQLite fájl), hogy újraindítás után se legyen hideg a cache
+EMBED_CACHE_DB = os.getenv("EMBED_CACHE_DB") or None
+EMBED_CACHE_DB_MAX_ENTRIES = int(os.getenv("EMBED_CACHE_DB_MAX_ENTRIES", "200000"))
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_query_text(text: str) -> str:
+    """Unicode NFC + whitespace összevonás: az apró formai eltérések ne rontsák a találatot."""
+    return _WHITESPACE.sub(" ", unicodedata.normalize("NFC", text)).strip()
+
+
+def embedding_cache_key(text: str, model: str) -> str:
+    payload = f"{model}\x00{normalize_query_text(text)}".encode("utf-8")
+    return hashlib.sha256(payload).hexdigest()
+
+
+class EmbeddingCache:
+    """
+    Két szintű query-embedding cache:
+    1. processzen belüli LRU (méret- és TTL-korláttal),
+    2. opcionális SQLite tár (EMBED_CACHE_DB), több worker és újraindítás között.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = EMBED_CACHE_MAX_ENTRIES,
+        ttl_sec: float = EMBED_CACHE_TTL_SEC,
+        db_path: Optional[str] = EMBED_CACHE_DB,
+    ) -> None:
+        self.ttl_sec = ttl_sec
+        self._memory: LRUCache[np.ndarray] = LRUCache(
+            max_entries=max_entries,
+            ttl_sec=ttl_sec,
+            sizeof=lambda arr: int(arr.nbytes),
+        )
+        self._store = (
+            SQLiteCache(db_path, table="query_embeddings", max_entries=EMBED_CACHE_DB_MAX_ENTRIES)
+            if db_path
+            else None
+        )
+        self._lock = threading.Lock()
+        self.persistent_hits = 0
+        self.api_calls = 0
+
+    def get_or_compute(
+        self,
+        text: str,
+        model: str,
+        compute: Callable[[str], Sequence[float]],
+    ) -> np.ndarray:
+        key = embedding_cache_key(text, model)
+
+        cached = self._memory.get(key)
+        if cached is not None:
+            return cached
+
+        if self._store is not None:
+            blob = self._store.get(key)
+            if blob is not None:
+                vector = decode_embedding(blob, "float32")
+                self._memory.set(key, vector)
+                with self._lock:
+                    self.persistent_hits += 1
+                return vector
+
+        vector = np.array(compute(normalize_query_text(text)), dtype=np.float32)
+        # a cache-elt tömböt több kérés is megkapja: ne lehessen helyben módosítani
+        vector.setflags(write=False)
+        with self._lock:
+            self.api_calls += 1
+
+        self._memory.set(key, vector)
+        if self._store is not None:
+            blob, _scale = encode_embedding(vector, "float32")
+            self._store.set(key, blob, ttl_sec=self.ttl_sec)
+
+        return vector
+
+    def stats(self) -> Dict[str, object]:
+        memory = self._memory.stats()
+        return {
+            "memory": memory,
+            "persistent_enabled": self._store is not None,
+            "persistent_hits": self.persistent_hits,
+            "api_calls": self.api_calls,
+            # ennyi embedding API hívást spóroltunk meg összesen
+            "api_calls_saved": memory["hits"] + self.persistent_hits,
+        }
+
+
+query_embedding_cache = EmbeddingCache()
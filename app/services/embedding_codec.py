@@ -0,0 +1,92 @@
+import os
+from typing import Optional, Sequence, Tuple
+
+import numpy as np
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# alapértelmezett tárolási formátum új soroknál: float32 | float16 | int8
+RAG_EMBEDDING_DTYPE = os.getenv("RAG_EMBEDDING_DTYPE", "float32")
+
+SUPPORTED_DTYPES = ("float32", "float16", "int8")
+
+# fix little-endian bájtsorrend, hogy a tárolt bájtok platformfüggetlenek legyenek
+_NUMPY_DTYPES = {
+    "float32": np.dtype("<f4"),
+    "float16": np.dtype("<f2"),
+    "int8": np.dtype("i1"),
+}
+
+
+def encode_embedding(
+    vector: Sequence[float] | np.ndarray,
+    dtype: str = RAG_EMBEDDING_DTYPE,
+) -> Tuple[bytes, Optional[float]]:
+    """
+    Embedding → tömör bájtsor a LargeBinary oszlophoz.
+    Visszatér: (bájtok, skála). A skála csak int8 kvantálásnál nem None:
+    szimmetrikus, vektoronkénti skála (max |x| / 127).
+    """
+    if dtype not in _NUMPY_DTYPES:
+        raise ValueError(f"Ismeretlen embedding formátum: {dtype}")
+
+    arr = np.asarray(vector, dtype=np.float32)
+
+    if dtype == "int8":
+        max_abs = float(np.abs(arr).max()) if arr.size else 0.0
+        scale = max_abs / 127.0 if max_abs > 0 else 1.0
+        quantized = np.clip(np.rint(arr / scale), -127, 127).astype(_NUMPY_DTYPES["int8"])
+        return quantized.tobytes(), scale
+
+    return arr.astype(_NUMPY_DTYPES[dtype], copy=False).tobytes(), None
+
+
+def decode_embedding(
+    blob: bytes | memoryview,
+    dtype: str = "float32",
+    scale: Optional[float] = None,
+) -> np.ndarray:
+    """
+    Bájtsor → numpy vektor.
+    float32 esetén np.frombuffer nézetet ad vissza (nincs másolás, csak olvasható);
+    float16 / int8 esetén float32-re alakítunk, mert a pontozás float32-ben fut.
+    """
+    if dtype not in _NUMPY_DTYPES:
+        raise ValueError(f"Ismeretlen embedding formátum: {dtype}")
+
+    arr = np.frombuffer(blob, dtype=_NUMPY_DTYPES[dtype])
+
+    if dtype == "float32":
+        return arr
+    if dtype == "int8":
+        return arr.astype(np.float32) * np.float32(scale if scale is not None else 1.0)
+    return arr.astype(np.float32)
+
+
+def chunk_embedding(chunk) -> np.ndarray:
+    """
+    RAGChunk embeddingje float32 vektorként.
+    A bináris oszlopot preferáljuk; a még nem migrált soroknál a JSON listát olvassuk.
+    """
+    if chunk.embedding_bin is not None:
+        return decode_embedding(
+            chunk.embedding_bin,
+            chunk.embedding_dtype or "float32",
+            chunk.embedding_scale,
+        )
+    return np.asarray(chunk.embedding, dtype=np.float32)
+
+
+def embedding_columns(
+    vector: Sequence[float] | np.ndarray,
+    dtype: str = RAG_EMBEDDING_DTYPE,
+) -> dict:
+    """RAGChunk oszlopértékek egy embeddinghez (insert / update-hez)."""
+    blob, scale = encode_embedding(vector, dtype)
+    return {
+        "embedding": None,
+        "embedding_bin": blob,
+        "embedding_dtype": dtype,
+        "embedding_scale": scale,
+    }
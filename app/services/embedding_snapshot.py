@@ -0,0 +1,279 @@
+import hashlib
+import json
+import os
+import shutil
+import time
+from typing import Dict, Optional, Sequence
+
+import numpy as np
+from dotenv import load_dotenv
+from sqlalchemy.orm import Session
+
+from ..models import RAGChunk
+from .embedding_codec import chunk_embedding
+
+load_dotenv()
+
+# ha meg van adva, a workerek innen mmap-elik az embeddingeket (nem az adatbázisból)
+RAG_SNAPSHOT_DIR = os.getenv("RAG_SNAPSHOT_DIR") or None
+# megnyitáskor ellenőrizzük-e a checksumot (egyszeri teljes olvasás, a page cache-be úgyis bekerül)
+RAG_SNAPSHOT_VERIFY = os.getenv("RAG_SNAPSHOT_VERIFY", "1") == "1"
+# ennyi régi verziót hagyunk meg (a még futó workerek miatt)
+RAG_SNAPSHOT_KEEP = int(os.getenv("RAG_SNAPSHOT_KEEP", "2"))
+
+SNAPSHOT_FORMAT = 1
+
+CURRENT_FILE = "CURRENT"
+VECTORS_FILE = "vectors.f32"   # (n, dim) float32, soronként normálva, little-endian
+ROWS_FILE = "rows.npy"         # (n, 5) int64: id, source_off, source_len, content_off, content_len
+TEXTS_FILE = "texts.bin"       # UTF-8 source/content bájtok egymás után
+META_FILE = "meta.json"        # verzió, méretek, sha256 fájlonként
+
+_ROW_COLUMNS = 5
+
+
+class SnapshotError(RuntimeError):
+    pass
+
+
+# ---------------------------------------------------------
+#  ÍRÁS (rag_init)
+# ---------------------------------------------------------
+
+def _normalized_f32(vector: np.ndarray) -> np.ndarray:
+    vec = np.asarray(vector, dtype="<f4")
+    norm = float(np.linalg.norm(vec))
+    return vec / norm if norm > 0 else vec
+
+
+def write_snapshot(db: Session, snapshot_dir: str, batch_size: int = 1000) -> str:
+    """
+    A rag_chunks tábla kiírása mmap-elhető snapshotba.
+    A sorokat kötegekben olvassuk, a fájlokat folyamatosan írjuk, így a
+    memóriahasználat nem függ a korpusz méretétől.
+
+    Az új verzió egy ideiglenes könyvtárba készül, onnan átnevezzük,
+    végül a CURRENT mutatót os.replace-szel cseréljük (atomi művelet).
+    Visszatér: az új verzió neve.
+    """
+    os.makedirs(snapshot_dir, exist_ok=True)
+    tmp_dir = os.path.join(snapshot_dir, f".tmp-{os.getpid()}-{time.time_ns()}")
+    os.makedirs(tmp_dir)
+
+    hashes = {name: hashlib.sha256() for name in (VECTORS_FILE, TEXTS_FILE)}
+    rows = []
+    text_offset = 0
+    dim = None
+
+    try:
+        with open(os.path.join(tmp_dir, VECTORS_FILE), "wb") as vec_f, \
+                open(os.path.join(tmp_dir, TEXTS_FILE), "wb") as txt_f:
+            query = db.query(RAGChunk).order_by(RAGChunk.id).yield_per(batch_size)
+
+            for chunk in query:
+                vec = _normalized_f32(chunk_embedding(chunk))
+                if dim is None:
+                    dim = int(vec.shape[0])
+                elif vec.shape[0] != dim:
+                    raise SnapshotError(
+                        f"Eltérő embedding dimenzió (id={chunk.id}): {vec.shape[0]} != {dim}"
+                    )
+
+                vec_bytes = vec.tobytes()
+                vec_f.write(vec_bytes)
+                hashes[VECTORS_FILE].update(vec_bytes)
+
+                source_b = (chunk.source or "").encode("utf-8")
+                content_b = (chunk.content or "").encode("utf-8")
+                txt_f.write(source_b)
+                txt_f.write(content_b)
+                hashes[TEXTS_FILE].update(source_b)
+                hashes[TEXTS_FILE].update(content_b)
+
+                rows.append((
+                    chunk.id,
+                    text_offset, len(source_b),
+                    text_offset + len(source_b), len(content_b),
+                ))
+                text_offset += len(source_b) + len(content_b)
+
+        rows_arr = np.asarray(rows, dtype="<i8").reshape(-1, _ROW_COLUMNS)
+        np.save(os.path.join(tmp_dir, ROWS_FILE), rows_arr)
+
+        checksums = {name: h.hexdigest() for name, h in hashes.items()}
+        checksums[ROWS_FILE] = _file_sha256(os.path.join(tmp_dir, ROWS_FILE))
+
+        combined = hashlib.sha256(
+            "".join(checksums[name] for name in sorted(checksums)).encode("ascii")
+        ).hexdigest()
+        version = f"{time.strftime('%Y%m%dT%H%M%S')}-{combined[:12]}"
+
+        meta = {
+            "format": SNAPSHOT_FORMAT,
+            "version": version,
+            "count": int(rows_arr.shape[0]),
+            "dim": int(dim or 0),
+            "dtype": "float32",
+            "sha256": checksums,
+            "created_at": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        }
+        with open(os.path.join(tmp_dir, META_FILE), "w", encoding="utf-8") as f:
+            json.dump(meta, f, indent=2)
+
+        for name in (VECTORS_FILE, TEXTS_FILE, ROWS_FILE, META_FILE):
+            _fsync(os.path.join(tmp_dir, name))
+
+        final_dir = os.path.join(snapshot_dir, version)
+        os.rename(tmp_dir, final_dir)
+    except BaseException:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        raise
+
+    _swap_current(snapshot_dir, version)
+    _prune_old_versions(snapshot_dir, keep=RAG_SNAPSHOT_KEEP)
+
+    return version
+
+
+def _swap_current(snapshot_dir: str, version: str) -> None:
+    tmp_path = os.path.join(snapshot_dir, f"{CURRENT_FILE}.tmp-{os.getpid()}")
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        f.write(version)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, os.path.join(snapshot_dir, CURRENT_FILE))
+
+
+def _prune_old_versions(snapshot_dir: str, keep: int) -> None:
+    """
+    A legutóbbi `keep` verzión kívül mindent törlünk; a CURRENT-ben álló
+    verziót soha. A sorrend az mtime (a verziónév másodperces időbélyeg +
+    hash, egy másodpercen belüli írásoknál névsorban nem monoton).
+    A régi verziót még mmap-elő workerek nem akadnak el: Linuxon a
+    törölt fájl addig él, amíg van rá leképezés.
+    """
+    current = read_current_version(snapshot_dir)
+    versions = []
+    for name in os.listdir(snapshot_dir):
+        path = os.path.join(snapshot_dir, name)
+        if name.startswith(".") or not os.path.isdir(path):
+            continue
+        try:
+            versions.append((os.stat(path).st_mtime_ns, name))
+        except FileNotFoundError:
+            continue
+    versions.sort()
+
+    for _mtime, name in versions[:-keep] if keep > 0 else versions:
+        if name == current:
+            continue
+        shutil.rmtree(os.path.join(snapshot_dir, name), ignore_errors=True)
+
+
+def _fsync(path: str) -> None:
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def _file_sha256(path: str, block_size: int = 1 << 20) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(block_size), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+# ---------------------------------------------------------
+#  OLVASÁS (workerek)
+# ---------------------------------------------------------
+
+def read_current_version(snapshot_dir: str) -> Optional[str]:
+    try:
+        with open(os.path.join(snapshot_dir, CURRENT_FILE), "r", encoding="utf-8") as f:
+            return f.read().strip() or None
+    except FileNotFoundError:
+        return None
+
+
+class SnapshotTexts(Sequence[str]):
+    """
+    Lusta source/content lista: a szöveget csak a találatoknál dekódoljuk
+    a közösen mmap-elt texts.bin-ből, így a workerek heapjébe nem kerül.
+    """
+
+    def __init__(self, texts: np.memmap, offsets: np.ndarray, lengths: np.ndarray):
+        self._texts = texts
+        self._offsets = offsets
+        self._lengths = lengths
+
+    def __len__(self) -> int:
+        return int(self._offsets.shape[0])
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(len(self)))]
+        start = int(self._offsets[i])
+        end = start + int(self._lengths[i])
+        return self._texts[start:end].tobytes().decode("utf-8")
+
+
+class EmbeddingSnapshot:
+    """Egy megnyitott (mmap-elt) snapshot verzió."""
+
+    def __init__(self, path: str, meta: Dict, vectors: np.ndarray, rows: np.ndarray, texts: np.memmap):
+        self.path = path
+        self.meta = meta
+        self.version: str = meta["version"]
+        self.vectors = vectors
+        self.ids = np.asarray(rows[:, 0])
+        self.sources = SnapshotTexts(texts, rows[:, 1], rows[:, 2])
+        self.contents = SnapshotTexts(texts, rows[:, 3], rows[:, 4])
+
+    def __len__(self) -> int:
+        return int(self.meta["count"])
+
+    @classmethod
+    def open(
+        cls,
+        snapshot_dir: str,
+        version: Optional[str] = None,
+        verify: bool = RAG_SNAPSHOT_VERIFY,
+    ) -> "EmbeddingSnapshot":
+        version = version or read_current_version(snapshot_dir)
+        if not version:
+            raise SnapshotError(f"Nincs aktuális snapshot itt: {snapshot_dir}")
+
+        path = os.path.join(snapshot_dir, version)
+        with open(os.path.join(path, META_FILE), "r", encoding="utf-8") as f:
+            meta = json.load(f)
+
+        if meta.get("format") != SNAPSHOT_FORMAT:
+            raise SnapshotError(f"Nem támogatott snapshot formátum: {meta.get('format')}")
+
+        if verify:
+            for name, expected in meta["sha256"].items():
+                if _file_sha256(os.path.join(path, name)) != expected:
+                    raise SnapshotError(f"Hibás checksum: {version}/{name}")
+
+        count, dim = int(meta["count"]), int(meta["dim"])
+
+        # üres fájlt nem lehet mmap-elni
+        if count:
+            vectors = np.memmap(
+                os.path.join(path, VECTORS_FILE), dtype="<f4", mode="r", shape=(count, dim)
+            )
+            rows = np.load(os.path.join(path, ROWS_FILE), mmap_mode="r")
+        else:
+            vectors = np.empty((0, dim), dtype=np.float32)
+            rows = np.empty((0, _ROW_COLUMNS), dtype=np.int64)
+
+        texts_path = os.path.join(path, TEXTS_FILE)
+        if os.path.getsize(texts_path):
+            texts = np.memmap(texts_path, dtype=np.uint8, mode="r")
+        else:
+            texts = np.empty(0, dtype=np.uint8)
+
+        return cls(path, meta, vectors, rows, texts)
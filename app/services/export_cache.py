@@ -0,0 +1,190 @@
+import hashlib
+import json
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# ---------------------------------------------------------
+#  EXPORT ARTEFAKTUM CACHE (PDF / DOCX a lemezen)
+# ---------------------------------------------------------
+# Ugyanannak a tervezetnek a PDF / DOCX exportját többször is letöltik:
+# a kész fájlt a szerződés szövegének, a formátumnak és a branding
+# mezőknek a hash-e alatt tároljuk, méretkorlátos LRU kiürítéssel.
+
+EXPORT_CACHE_ENABLED = os.getenv("EXPORT_CACHE_ENABLED", "1") == "1"
+EXPORT_CACHE_DIR = os.getenv(
+    "EXPORT_CACHE_DIR",
+    os.path.join(os.path.dirname(__file__), "..", "..", "data", "export_cache"),
+)
+EXPORT_CACHE_MAX_BYTES = int(os.getenv("EXPORT_CACHE_MAX_BYTES", str(256 * 1024 * 1024)))
+
+# az export kimenetét érintő változáskor (html_blocks / export_service) növelni kell
+EXPORT_RENDERER_VERSION = "2"
+
+
+def export_cache_key(contract_text: str, format: str, meta: Dict) -> str:
+    payload = json.dumps(
+        {"v": EXPORT_RENDERER_VERSION, "format": format, "text": contract_text, "meta": meta},
+        ensure_ascii=False,
+        sort_keys=True,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def export_etag(key: str) -> str:
+    """
+    Gyenge ETag: az újragenerált fájl tartalmilag azonos, de bájtra nem
+    (a DOCX zip időbélyegei), ezért a kulcsból képezzük, nem a bájtokból.
+    """
+    return f'W/"{key}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """If-None-Match gyenge összehasonlítással (RFC 9110 13.1.2)."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    opaque = etag[2:] if etag.startswith("W/") else etag
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == opaque:
+            return True
+    return False
+
+
+class ExportArtifactCache:
+    """
+    Kulcs → fájl a lemezen (<dir>/<kulcs[:2]>/<kulcs>.<formátum>):
+    - a teljes méret EXPORT_CACHE_MAX_BYTES alatt marad, a legrégebben
+      használt fájlok törlődnek először,
+    - a használat sorrendje az mtime-ban is megmarad (találatkor frissítjük),
+      így újraindítás után a könyvtár bejárásából visszaáll,
+    - az írás atomikus (ideiglenes fájl + os.replace); ha több uvicorn worker
+      osztozik a könyvtáron, a másik által törölt fájl egyszerű miss.
+    """
+
+    def __init__(self, directory: str = EXPORT_CACHE_DIR, max_bytes: int = EXPORT_CACHE_MAX_BYTES) -> None:
+        self.directory = os.path.abspath(directory)
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[str, Tuple[str, int]]" = OrderedDict()
+        self._total_bytes = 0
+        self._lock = threading.Lock()
+        self._loaded = False
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def _path(self, key: str, format: str) -> str:
+        return os.path.join(self.directory, key[:2], f"{key}.{format}")
+
+    def _load(self) -> None:
+        """A meglévő fájlok indexelése mtime szerint (lustán, az első használatkor)."""
+        if self._loaded:
+            return
+        self._loaded = True
+        found = []
+        if os.path.isdir(self.directory):
+            for root, _dirs, files in os.walk(self.directory):
+                for name in files:
+                    key, dot, format = name.partition(".")
+                    if not dot or name.endswith(".tmp"):
+                        continue
+                    path = os.path.join(root, name)
+                    try:
+                        stat = os.stat(path)
+                    except FileNotFoundError:
+                        continue
+                    found.append((stat.st_mtime, f"{key}.{format}", path, stat.st_size))
+        for _mtime, entry_key, path, size in sorted(found):
+            self._entries[entry_key] = (path, size)
+            self._total_bytes += size
+        self._evict()
+
+    def _evict(self) -> None:
+        while self._total_bytes > self.max_bytes and self._entries:
+            _entry_key, (path, size) = self._entries.popitem(last=False)
+            self._total_bytes -= size
+            self.evictions += 1
+            try:
+                os.unlink(path)
+            except FileNotFoundError:
+                pass
+
+    def get(self, key: str, format: str) -> Optional[bytes]:
+        entry_key = f"{key}.{format}"
+        with self._lock:
+            self._load()
+            entry = self._entries.get(entry_key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(entry_key)
+
+        path, size = entry
+        try:
+            with open(path, "rb") as f:
+                content = f.read()
+            os.utime(path)
+        except FileNotFoundError:
+            with self._lock:
+                if self._entries.pop(entry_key, None) is not None:
+                    self._total_bytes -= size
+                self.misses += 1
+            return None
+
+        with self._lock:
+            self.hits += 1
+        return content
+
+    def set(self, key: str, format: str, content: bytes) -> None:
+        # a korlátnál nagyobb fájlt nem tároljuk (kiürítené az egész cache-t)
+        if len(content) > self.max_bytes:
+            return
+
+        path = self._path(key, format)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as out:
+                out.write(content)
+            os.replace(tmp_path, path)
+        except BaseException:
+            try:
+                os.unlink(tmp_path)
+            except FileNotFoundError:
+                pass
+            raise
+
+        entry_key = f"{key}.{format}"
+        with self._lock:
+            self._load()
+            previous = self._entries.pop(entry_key, None)
+            if previous is not None:
+                self._total_bytes -= previous[1]
+            self._entries[entry_key] = (path, len(content))
+            self._total_bytes += len(content)
+            self._evict()
+
+    def stats(self) -> Dict[str, object]:
+        with self._lock:
+            return {
+                "enabled": EXPORT_CACHE_ENABLED,
+                "entries": len(self._entries),
+                "bytes": self._total_bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+
+
+export_artifact_cache = ExportArtifactCache()
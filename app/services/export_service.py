@@ -1,61 +1,134 @@
 import os
 from io import BytesIO
-from typing import Dict, Tuple
+from typing import Dict, List, Optional, Tuple
 
-from bs4 import BeautifulSoup
+from xml.sax.saxutils import escape
 
 from reportlab.platypus import (
     SimpleDocTemplate,
     Paragraph,
     Spacer,
+    Table,
+    TableStyle,
 )
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+from reportlab.lib import colors
 from reportlab.lib.pagesizes import A4
 from reportlab.lib.units import mm
-from reportlab.pdfbase.ttfonts import TTFont
-from reportlab.pdfbase import pdfmetrics
+from reportlab.pdfbase.pdfmetrics import stringWidth
+
+from docx import Document
+from docx.oxml import OxmlElement
+from docx.oxml.ns import qn
+from docx.shared import Mm
+from docx.text.paragraph import Paragraph as DocxParagraph
+from lxml.etree import SubElement
+
+from app.services.html_blocks import Block, Run, parse_html_blocks
+from app.services.pdf_render_context import (
+    PdfFontSet,
+    PdfRenderContext,
+    get_pdf_context,
+)
 
 import os
 print(">>> LOADED export_service.py FROM:", os.path.abspath(__file__))
 
 
+# listaelemek behúzása mélységenként
+LIST_INDENT_MM = 6
+# táblázatcellák bal / jobb belső margója (a ReportLab Table alapértéke)
+TABLE_CELL_PADDING_PT = 6
+
 
 # ---------------------------------------------------------
-# Segédfüggvény: HTML → egyszerű szöveg
+# PDF generálása Unicode támogatással (ő/ű OK)
 # ---------------------------------------------------------
 
-def _html_to_plain_text(html: str) -> str:
+def _pdf_markup(runs: List[Run], fonts: PdfFontSet, bold: bool = False) -> str:
     """
-    HTML-ből egyszerű szöveg előállítása. A <br> és <p> tageket sortörésre alakítjuk.
+    Futások → ReportLab Paragraph jelölés (escape-elve, <b>/<i>/<u>, <br/>).
+    <b> / <i> csak akkor kerül ki, ha tényleg másik fontra vált: a hiányzó
+    változat úgyis az alap font, a több fragmentes bekezdést viszont a
+    ReportLab szavanként méri és tördeli (a PDF idejének nagyobbik része).
+    A bold=True a félkövér alapfontú stílusokhoz (címsorok) kell.
     """
-    soup = BeautifulSoup(html, "html.parser")
-
-    # br → \n
-    for br in soup.find_all("br"):
-        br.replace_with("\n")
-
-    # p tagek között legyen sortörés
-    text_blocks = []
-    for p in soup.find_all("p"):
-        text_blocks.append(p.get_text(strip=True))
-    if text_blocks:
-        return "\n\n".join(text_blocks)
-
-    # fallback: teljes szöveg
-    return soup.get_text("\n", strip=True)
+    base = fonts.face(bold, False)
+    parts = []
+    for run in runs:
+        text = escape(run.text).replace("\n", "<br/>")
+        if run.underline:
+            text = f"<u>{text}</u>"
+        if fonts.face(bold or run.bold, run.italic) != base:
+            if run.italic:
+                text = f"<i>{text}</i>"
+            if run.bold:
+                text = f"<b>{text}</b>"
+        parts.append(text)
+    return "".join(parts)
+
+
+def _pdf_cell(runs: List[Run], ctx: PdfRenderContext, width: float):
+    """
+    Táblázatcella: a formázás nélküli, egy sorba férő szöveg sima string
+    (a Table nem tördeli), a többi Paragraph a közös törzsstílussal.
+    """
+    markup = _pdf_markup(runs, ctx.fonts)
+    text = "".join(run.text for run in runs)
+    if (
+        markup == escape(text)
+        and "\n" not in text
+        and stringWidth(text, ctx.body.fontName, ctx.body.fontSize) <= width - 2 * TABLE_CELL_PADDING_PT
+    ):
+        return text
+    return Paragraph(markup, ctx.body)
+
+
+def _pdf_table(block: Block, width: float, ctx: PdfRenderContext) -> Table:
+    columns = max(len(row) for row in block.rows)
+    column_width = width / columns
+    data = [
+        [_pdf_cell(cell, ctx, column_width) for cell in row] + [""] * (columns - len(row))
+        for row in block.rows
+    ]
+    table = Table(data, colWidths=[column_width] * columns, repeatRows=block.header_rows)
+    table.setStyle(TableStyle([
+        ("GRID", (0, 0), (-1, -1), 0.5, colors.grey),
+        ("VALIGN", (0, 0), (-1, -1), "TOP"),
+        ("FONT", (0, 0), (-1, -1), ctx.body.fontName, ctx.body.fontSize, ctx.body.leading),
+        ("LEFTPADDING", (0, 0), (-1, -1), TABLE_CELL_PADDING_PT),
+        ("RIGHTPADDING", (0, 0), (-1, -1), TABLE_CELL_PADDING_PT),
+    ]))
+    return table
+
+
+def blocks_to_flowables(blocks: List[Block], width: float) -> list:
+    ctx = get_pdf_context()
+    fonts = ctx.fonts
+    story = []
+    for block in blocks:
+        if block.kind == "table":
+            story.append(_pdf_table(block, width, ctx))
+        elif block.kind == "heading":
+            style = ctx.title if block.level == 1 else ctx.heading
+            story.append(Paragraph(_pdf_markup(block.runs, fonts, bold=True), style))
+            continue
+        elif block.kind == "list_item":
+            story.append(Paragraph(
+                _pdf_markup(block.runs, fonts),
+                ctx.list_item(block.level),
+                bulletText=block.marker or None,
+            ))
+        else:
+            story.append(Paragraph(_pdf_markup(block.runs, fonts), ctx.body))
+        story.append(Spacer(1, 6))
+    return story
 
 
-# ---------------------------------------------------------
-# PDF generálása Unicode támogatással (ő/ű OK)
-# ---------------------------------------------------------
-
-def generate_pdf_from_html(html: str) -> bytes:
+def generate_pdf(blocks: List[Block]) -> bytes:
     """
     Unicode-képes PDF generálás ReportLab + Platypus segítségével.
     Minden magyar ékezet (ő / ű) támogatott.
     """
-
-    text = _html_to_plain_text(html)
     buffer = BytesIO()
 
     doc = SimpleDocTemplate(
@@ -67,28 +140,8 @@ def generate_pdf_from_html(html: str) -> bytes:
         bottomMargin=20 * mm,
     )
 
-    # DejaVuSans.ttf → az egyetlen 100%-osan Unicode-képes font ReportLabhoz
-    font_path = os.path.join(os.path.dirname(__file__), "fonts", "DejaVuSans.ttf")
-    pdfmetrics.registerFont(TTFont("DejaVuSans", font_path))
-
-    styles = getSampleStyleSheet()
-    style = ParagraphStyle(
-        "Body",
-        parent=styles["Normal"],
-        fontName="DejaVuSans",
-        fontSize=11,
-        leading=14,
-    )
-
-    story = []
-
-    for line in text.split("\n"):
-        if line.strip():
-            story.append(Paragraph(line, style))
-        else:
-            story.append(Spacer(1, 6))
-
-    doc.build(story)
+    # fontok (DejaVuSans + változatok) és stílusok: processzenként egyszer
+    doc.build(blocks_to_flowables(blocks, doc.width))
 
     pdf_data = buffer.getvalue()
     buffer.close()
@@ -96,33 +149,148 @@ def generate_pdf_from_html(html: str) -> bytes:
     return pdf_data
 
 
+def generate_pdf_from_html(html: str) -> bytes:
+    return generate_pdf(parse_html_blocks(html))
+
+
 # ---------------------------------------------------------
 # DOCX export (ha szükséges)
 # ---------------------------------------------------------
 
-from docx import Document
+_W_R, _W_RPR, _W_T, _W_BR, _W_TAB = qn("w:r"), qn("w:rPr"), qn("w:t"), qn("w:br"), qn("w:tab")
+_W_PPR, _W_PSTYLE, _W_VAL = qn("w:pPr"), qn("w:pStyle"), qn("w:val")
+_XML_SPACE = qn("xml:space")
 
-def generate_docx_from_html(html: str) -> bytes:
+
+def _docx_runs(paragraph, runs: List[Run]) -> None:
+    """
+    Futások közvetlenül w:r elemként: a python-docx add_run / .text / .bold
+    minden gyerekelemnél a séma szerinti helyet keresi (xpath), ez volt a
+    DOCX idejének nagyobbik része. Kimenet: ugyanaz, mint az add_run-é
+    (\n → w:br, \t → w:tab, aláhúzás → w:u="single").
+    """
+    p = paragraph._p
+    for run in runs:
+        r = SubElement(p, _W_R)
+        if run.bold or run.italic or run.underline:
+            rpr = SubElement(r, _W_RPR)
+            if run.bold:
+                SubElement(rpr, qn("w:b"))
+            if run.italic:
+                SubElement(rpr, qn("w:i"))
+            if run.underline:
+                SubElement(rpr, qn("w:u")).set(_W_VAL, "single")
+        for i, line in enumerate(run.text.split("\n")):
+            if i:
+                SubElement(r, _W_BR)
+            for j, part in enumerate(line.split("\t")):
+                if j:
+                    SubElement(r, _W_TAB)
+                if part:
+                    t = SubElement(r, _W_T)
+                    t.text = part
+                    if part[0] == " " or part[-1] == " ":
+                        t.set(_XML_SPACE, "preserve")
+
+
+class _DocxStyles:
     """
-    Nagyon egyszerű DOCX generálás HTML-ből.
-    (Nincs styling, de Unicode kompatibilis.)
+    Stílusnév → style_id, dokumentumonként egyszer feloldva: a python-docx
+    név szerinti stílusátadásnál minden bekezdésnél végigkeresi a stílustáblát.
+    Az új bekezdés közvetlenül a törzs záró w:sectPr-je elé kerül.
     """
 
-    text = _html_to_plain_text(html)
-    document = Document()
+    def __init__(self, document) -> None:
+        self._styles = document.styles
+        self._ids: Dict[str, str] = {}
+        self._body = document._body
+        self._sect_pr = document.element.body.sectPr
+
+    def style_id(self, name: str) -> str:
+        style_id = self._ids.get(name)
+        if style_id is None:
+            style_id = self._ids[name] = self._styles[name].style_id
+        return style_id
+
+    def paragraph(self, document, name: Optional[str] = None) -> DocxParagraph:
+        if self._sect_pr is None:
+            paragraph = document.add_paragraph()
+            p = paragraph._p
+        else:
+            p = OxmlElement("w:p")
+            self._sect_pr.addprevious(p)
+            paragraph = DocxParagraph(p, self._body)
+        if name is not None:
+            SubElement(SubElement(p, _W_PPR), _W_PSTYLE).set(_W_VAL, self.style_id(name))
+        return paragraph
+
+
+def blocks_to_docx(blocks: List[Block], document) -> None:
+    styles = _DocxStyles(document)
+    for block in blocks:
+        if block.kind == "table":
+            columns = max(len(row) for row in block.rows)
+            table = document.add_table(rows=len(block.rows), cols=columns)
+            table._tbl.tblStyle_val = styles.style_id("Table Grid")
+            for row, cells in zip(table.rows, block.rows):
+                for cell, runs in zip(row.cells, cells):
+                    _docx_runs(cell.paragraphs[0], runs)
+        elif block.kind == "heading":
+            # h1 → a dokumentum címe, h2.. → Heading 1..
+            name = "Title" if block.level == 1 else f"Heading {block.level - 1}"
+            _docx_runs(styles.paragraph(document, name), block.runs)
+        elif block.kind == "list_item":
+            # a Word automatikus számozása dokumentumszintű, ezért a
+            # számozott listák sorszámát szövegként írjuk ki
+            depth = min(block.level, 3)
+            suffix = "" if depth == 1 else f" {depth}"
+            runs = block.runs
+            if block.marker == "•":
+                paragraph = styles.paragraph(document, "List Bullet" + suffix)
+            elif not block.marker:
+                # beágyazott lista utáni folytatás: behúzva, jel nélkül
+                paragraph = styles.paragraph(document, "List Continue" + suffix)
+            else:
+                paragraph = styles.paragraph(document, "List" + suffix)
+                runs = [Run(block.marker + "\t")] + runs
+            if block.level > 3:
+                paragraph.paragraph_format.left_indent = Mm(LIST_INDENT_MM * block.level)
+            _docx_runs(paragraph, runs)
+        else:
+            _docx_runs(styles.paragraph(document), block.runs)
 
-    for line in text.split("\n"):
-        document.add_paragraph(line)
+
+def generate_docx(blocks: List[Block]) -> bytes:
+    """
+    DOCX generálás a HTML blokkjaiból: címsorok, listák, félkövér / dőlt
+    szöveg és táblázatok megmaradnak (Unicode kompatibilis).
+    """
+    document = Document()
+    blocks_to_docx(blocks, document)
 
     buffer = BytesIO()
     document.save(buffer)
     return buffer.getvalue()
 
 
+def generate_docx_from_html(html: str) -> bytes:
+    return generate_docx(parse_html_blocks(html))
+
+
 # ---------------------------------------------------------
 # Export gyártó főfüggvény
 # ---------------------------------------------------------
 
+# formátum → (fájlnév, MIME típus)
+EXPORT_FORMATS: Dict[str, Tuple[str, str]] = {
+    "pdf": ("contract.pdf", "application/pdf"),
+    "docx": (
+        "contract.docx",
+        "application/vnd.openxmlformats-officedocument.wordprocessingml.document",
+    ),
+}
+
+
 def create_export_file(
     template_name: str,
     template_vars: Dict,
@@ -138,16 +306,16 @@ def create_export_file(
     """
 
     html = template_vars.get("contract_text", "")
+    if format not in EXPORT_FORMATS:
+        raise ValueError(f"Ismeretlen export formátum: {format}")
 
-    if format == "pdf":
-        content = generate_pdf_from_html(html)
-        return "contract.pdf", content, "application/pdf"
-
-    elif format == "docx":
-        content = generate_docx_from_html(html)
-        return "contract.docx", content, (
-            "application/vnd.openxmlformats-officedocument.wordprocessingml.document"
-        )
+    # egyetlen HTML-feldolgozás, ugyanaz a blokklista megy a PDF / DOCX íróba
+    blocks = parse_html_blocks(html)
 
+    if format == "pdf":
+        content = generate_pdf(blocks)
     else:
-        raise ValueError(f"Ismeretlen export formátum: {format}")
+        content = generate_docx(blocks)
+
+    filename, mime_type = EXPORT_FORMATS[format]
+    return filename, content, mime_type
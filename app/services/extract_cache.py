@@ -0,0 +1,93 @@
+import json
+import os
+import threading
+from typing import Dict, List, Optional
+
+from dotenv import load_dotenv
+
+from ..utils.lru_cache import LRUCache
+from ..utils.sqlite_cache import SQLiteCache
+
+load_dotenv()
+
+EXTRACT_CACHE_MAX_ENTRIES = int(os.getenv("EXTRACT_CACHE_MAX_ENTRIES", "512"))
+EXTRACT_CACHE_MAX_BYTES = int(os.getenv("EXTRACT_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+EXTRACT_CACHE_TTL_SEC = float(os.getenv("EXTRACT_CACHE_TTL_SEC", str(7 * 24 * 3600)))
+# opcionális perzisztens tár (SQLite fájl), workerek és újraindítás között
+EXTRACT_CACHE_DB = os.getenv("EXTRACT_CACHE_DB") or None
+EXTRACT_CACHE_DB_MAX_ENTRIES = int(os.getenv("EXTRACT_CACHE_DB_MAX_ENTRIES", "20000"))
+
+# a kinyerő logika változásakor növelni kell, hogy a régi szövegek ne jöjjenek vissza
+EXTRACTOR_VERSION = "2"
+
+
+def extract_cache_key(sha256: str, kind: str) -> str:
+    """Tartalom-hash + fájltípus (ugyanaz a bájtsor .txt-ként mást ad, mint .docx-ként)."""
+    return f"v{EXTRACTOR_VERSION}:{kind}:{sha256}"
+
+
+class ExtractTextCache:
+    """
+    Tartalom-hash → kinyert szöveg cache a feltöltésekhez (ugyanazt a
+    szerződést review-hoz, javításhoz, exporthoz is újra feltöltik):
+    1. processzen belüli LRU (darab- és bájtkorláttal, TTL-lel),
+    2. opcionális SQLite tár (EXTRACT_CACHE_DB).
+    Az érték az oldalak szövege (PDF-nél oldalanként, máshol egy elem),
+    így az oldalankénti stream is kiszolgálható belőle.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = EXTRACT_CACHE_MAX_ENTRIES,
+        max_bytes: int = EXTRACT_CACHE_MAX_BYTES,
+        ttl_sec: float = EXTRACT_CACHE_TTL_SEC,
+        db_path: Optional[str] = EXTRACT_CACHE_DB,
+    ) -> None:
+        self.ttl_sec = ttl_sec
+        self._memory: LRUCache[List[str]] = LRUCache(
+            max_entries=max_entries,
+            ttl_sec=ttl_sec,
+            max_bytes=max_bytes,
+            sizeof=lambda pages: sum(len(page.encode("utf-8")) for page in pages),
+        )
+        self._store = (
+            SQLiteCache(db_path, table="extracted_texts", max_entries=EXTRACT_CACHE_DB_MAX_ENTRIES)
+            if db_path
+            else None
+        )
+        self._lock = threading.Lock()
+        self.persistent_hits = 0
+
+    def get(self, key: str) -> Optional[List[str]]:
+        pages = self._memory.get(key)
+        if pages is not None:
+            return pages
+
+        if self._store is not None:
+            blob = self._store.get(key)
+            if blob is not None:
+                pages = json.loads(blob.decode("utf-8"))
+                self._memory.set(key, pages)
+                with self._lock:
+                    self.persistent_hits += 1
+                return pages
+
+        return None
+
+    def set(self, key: str, pages: List[str]) -> None:
+        # üres (olvashatatlan / szkennelt) eredményt nem rögzítünk
+        if not any(page.strip() for page in pages):
+            return
+        self._memory.set(key, pages)
+        if self._store is not None:
+            self._store.set(key, json.dumps(pages, ensure_ascii=False).encode("utf-8"), ttl_sec=self.ttl_sec)
+
+    def stats(self) -> Dict[str, object]:
+        return {
+            "memory": self._memory.stats(),
+            "persistent_enabled": self._store is not None,
+            "persistent_hits": self.persistent_hits,
+        }
+
+
+extract_text_cache = ExtractTextCache()
@@ -1,20 +1,121 @@
-from typing import IO
+import asyncio
+import os
+import time
+from collections import deque
+from typing import IO, AsyncIterator, Deque, Iterator, List, Tuple, Union
+
+from dotenv import load_dotenv
 from pypdf import PdfReader
-from docx import Document
+from .docx_extract import extract_docx_text
+from .document_pool import DOC_JOB_TIMEOUT_SEC, DocumentPool, PoolSaturatedError, document_pool
 
-def extract_text_from_pdf(file_obj: IO) -> str:
+load_dotenv()
+
+# feltöltési / feldolgozási korlátok
+EXTRACT_MAX_UPLOAD_BYTES = int(os.getenv("EXTRACT_MAX_UPLOAD_BYTES", str(50 * 1024 * 1024)))
+PDF_MAX_PAGES = int(os.getenv("PDF_MAX_PAGES", "500"))
+# egy worker-job ennyi oldalt nyer ki; egyszerre legfeljebb ennyi tartomány fut
+PDF_PAGE_BATCH = int(os.getenv("PDF_PAGE_BATCH", "16"))
+PDF_PARALLEL_RANGES = int(os.getenv("PDF_PARALLEL_RANGES", str(max(1, document_pool.workers))))
+
+
+class PdfTooManyPagesError(Exception):
+    """A PDF több oldalas, mint PDF_MAX_PAGES (413)."""
+
+
+def iter_pdf_page_texts(file_obj: IO) -> Iterator[str]:
+    """Oldalankénti szöveg, egyesével (a teljes szöveg nem épül fel a memóriában)."""
     reader = PdfReader(file_obj)
-    texts = []
     for page in reader.pages:
-        texts.append(page.extract_text() or "")
-    return "\n\n".join(texts)
+        yield page.extract_text() or ""
 
-def extract_text_from_docx(file_obj: IO) -> str:
-    doc = Document(file_obj)
-    return "\n".join(p.text for p in doc.paragraphs)
+def extract_text_from_pdf(file_obj: IO) -> str:
+    return join_pages(list(iter_pdf_page_texts(file_obj)))
+
+def extract_text_from_docx(file_obj: Union[str, IO]) -> str:
+    # bekezdések + táblázatok + fejléc / lábléc, iterparse-szal (lásd docx_extract)
+    return extract_docx_text(file_obj)
 
 def extract_text_from_txt(file_obj: IO) -> str:
     data = file_obj.read()
     if isinstance(data, bytes):
         return data.decode("utf-8", errors="ignore")
     return str(data)
+
+
+# ---------------------------------------------------------
+#  PDF: OLDALTARTOMÁNYOK PÁRHUZAMOSAN, SORRENDBEN STREAMELVE
+# ---------------------------------------------------------
+# A workerek útvonal alapján nyitják meg a (lemezre spoolozott) PDF-et, így
+# a fájl nem utazik jobonként a processzek között; a PdfReader lustán olvas.
+
+def pdf_page_count(path: str) -> int:
+    return len(PdfReader(path).pages)
+
+def extract_pdf_page_range(path: str, start: int, end: int) -> List[str]:
+    reader = PdfReader(path)
+    return [reader.pages[i].extract_text() or "" for i in range(start, end)]
+
+
+def check_pdf_pages(page_count: int) -> None:
+    if page_count > PDF_MAX_PAGES:
+        raise PdfTooManyPagesError(
+            f"A PDF túl hosszú ({page_count} oldal, legfeljebb {PDF_MAX_PAGES} dolgozható fel)."
+        )
+
+
+async def _run_range(pool: DocumentPool, path: str, start: int, end: int) -> Tuple[int, List[str]]:
+    # stream közben a telített pool nem hiba: kicsit várunk és újra próbáljuk
+    deadline = time.monotonic() + DOC_JOB_TIMEOUT_SEC
+    while True:
+        try:
+            return start, await pool.run(extract_pdf_page_range, path, start, end)
+        except PoolSaturatedError:
+            if time.monotonic() >= deadline:
+                raise
+            await asyncio.sleep(0.05)
+
+
+async def stream_pdf_pages(
+    path: str,
+    page_count: int,
+    batch_pages: int = PDF_PAGE_BATCH,
+    parallel: int = PDF_PARALLEL_RANGES,
+    pool: DocumentPool = document_pool,
+) -> AsyncIterator[Tuple[int, str]]:
+    """
+    (oldalindex, szöveg) párok oldalsorrendben. Egyszerre legfeljebb
+    `parallel` oldaltartomány fut a poolban; az első tartomány oldalai már
+    akkor kimennek, amikor a többi még készül. Lezáráskor (pl. a kliens
+    lekapcsolódott) a még várakozó jobokat visszavonjuk.
+    """
+    ranges = iter([(s, min(s + batch_pages, page_count)) for s in range(0, page_count, batch_pages)])
+    in_flight: Deque[asyncio.Task] = deque()
+
+    def submit_next() -> None:
+        page_range = next(ranges, None)
+        if page_range is not None:
+            in_flight.append(asyncio.ensure_future(_run_range(pool, path, *page_range)))
+
+    try:
+        for _ in range(max(1, parallel)):
+            submit_next()
+        while in_flight:
+            start, texts = await in_flight.popleft()
+            submit_next()
+            for offset, text in enumerate(texts):
+                yield start + offset, text
+    finally:
+        for task in in_flight:
+            task.cancel()
+
+
+async def extract_pdf_pages_parallel(path: str, pool: DocumentPool = document_pool) -> List[str]:
+    """A PDF összes oldalának szövege a párhuzamos oldaltartományokból (a /extract-text-hez)."""
+    page_count = await pool.run(pdf_page_count, path)
+    check_pdf_pages(page_count)
+    return [text async for _index, text in stream_pdf_pages(path, page_count, pool=pool)]
+
+
+def join_pages(pages: List[str]) -> str:
+    return "\n\n".join(pages)
@@ -0,0 +1,295 @@
+from dataclasses import dataclass, field
+from html.parser import HTMLParser
+from typing import Dict, List, Optional, Tuple
+
+# ---------------------------------------------------------
+#  HTML → DOKUMENTUM-BLOKKOK (egyetlen menetben)
+# ---------------------------------------------------------
+# Az export HTML-jét egyszer olvassuk végig egy HTMLParser-rel, és
+# formátumfüggetlen blokkokat állítunk elő (címsor, bekezdés, listaelem,
+# táblázat, félkövér / dőlt / aláhúzott futásokkal). Ugyanebből a
+# blokklistából készül a ReportLab PDF és a python-docx DOCX is.
+
+
+@dataclass
+class Run:
+    text: str
+    bold: bool = False
+    italic: bool = False
+    underline: bool = False
+
+
+@dataclass
+class Block:
+    kind: str                                   # "heading" | "paragraph" | "list_item" | "table"
+    runs: List[Run] = field(default_factory=list)
+    level: int = 0                              # címsor szintje (1–6) / lista mélysége (1-től)
+    marker: str = ""                            # listaelem jele: "1." vagy "•" ("" = folytatás)
+    rows: List[List[List[Run]]] = field(default_factory=list)   # táblázat: sorok → cellák → futások
+    header_rows: int = 0                        # a táblázat elején lévő <th> sorok száma
+
+    @property
+    def text(self) -> str:
+        return "".join(run.text for run in self.runs)
+
+
+_HEADINGS = {"h1": 1, "h2": 2, "h3": 3, "h4": 4, "h5": 5, "h6": 6}
+_BOLD = {"b", "strong", "th"}
+_ITALIC = {"i", "em"}
+_UNDERLINE = {"u", "ins"}
+# ezek határolják a bekezdéseket (a tartalmuk önálló blokk lesz)
+_BLOCK_BREAKS = {"p", "div", "section", "article", "main", "header", "footer", "blockquote", "pre", "hr", "address"}
+_SKIP = {"head", "style", "script", "title", "template"}
+_WHITESPACE = " \t\n\r\f"
+
+
+class _BlockParser(HTMLParser):
+    def __init__(self) -> None:
+        super().__init__(convert_charrefs=True)
+        self.blocks: List[Block] = []
+
+        self._runs: List[Run] = []           # az épp gyűjtött blokk futásai
+        self._kind = "paragraph"
+        self._level = 0
+        self._marker = ""
+        self._explicit = False               # <p>/<h*>/<li>-ben vagyunk (nem laza szövegben)
+
+        self._style: Dict[str, int] = {"bold": 0, "italic": 0, "underline": 0}
+        self._skip = 0
+        self._pre = 0
+        self._lists: List[List] = []         # [ordered, számláló]
+        self._items: List[int] = []          # nyitott <li>-k mélysége (beágyazott lista utáni folytatáshoz)
+        self._tables: List[Block] = []
+        self._cells: List[Optional[List[Run]]] = []   # táblázatonként a nyitott cella (vagy None)
+
+    @property
+    def _cell(self) -> Optional[List[Run]]:
+        return self._cells[-1] if self._cells else None
+
+    # -----------------------------------------------------
+    #  BLOKKOK LEZÁRÁSA
+    # -----------------------------------------------------
+    def _flush(self) -> None:
+        # laza szövegben (blokkelemen és cellán kívül) a sortörés bekezdéshatár
+        loose = not self._explicit and self._cell is None
+        runs = _normalize_runs(self._runs, keep_newlines=self._pre > 0 or loose)
+        self._runs = []
+        if runs:
+            if self._cell is not None:
+                if self._cell:
+                    self._cell.append(Run(" "))
+                self._cell.extend(runs)
+            elif loose:
+                # laza szöveg (pl. sima szöveg HTML nélkül): soronként egy bekezdés
+                for line in _split_lines(runs):
+                    self.blocks.append(Block("paragraph", line))
+            else:
+                self.blocks.append(Block(self._kind, runs, self._level, self._marker))
+        self._kind, self._level, self._marker, self._explicit = "paragraph", 0, "", False
+
+    def _start_block(self, kind: str, level: int = 0, marker: str = "") -> None:
+        self._flush()
+        self._kind, self._level, self._marker, self._explicit = kind, level, marker, True
+
+    # -----------------------------------------------------
+    #  HTMLParser események
+    # -----------------------------------------------------
+    def handle_starttag(self, tag: str, attrs: List[Tuple[str, Optional[str]]]) -> None:
+        if tag in _SKIP:
+            self._skip += 1
+            return
+        if self._skip:
+            return
+
+        if tag in _HEADINGS:
+            self._start_block("heading", _HEADINGS[tag])
+        elif tag in _BLOCK_BREAKS:
+            self._start_block("paragraph")
+            if tag == "pre":
+                self._pre += 1
+        elif tag in ("ul", "ol"):
+            self._flush()
+            start = dict(attrs).get("start")
+            self._lists.append([tag == "ol", int(start) - 1 if start and start.isdigit() else 0])
+        elif tag == "li":
+            ordered, counter = self._lists[-1] if self._lists else (False, 0)
+            if self._lists:
+                self._lists[-1][1] = counter + 1
+            depth = max(1, len(self._lists))
+            # lezáratlan <li> (a </li> elhagyható): az azonos szintű előző elem véget ér
+            while self._items and self._items[-1] >= depth:
+                self._items.pop()
+            self._items.append(depth)
+            self._start_block("list_item", depth, f"{counter + 1}." if ordered else "•")
+        elif tag == "table":
+            self._flush()
+            self._tables.append(Block("table"))
+            self._cells.append(None)
+        elif tag == "tr" and self._tables:
+            self._tables[-1].rows.append([])
+        elif tag in ("td", "th") and self._tables:
+            self._flush()
+            table = self._tables[-1]
+            if not table.rows:
+                table.rows.append([])
+            if tag == "th" and len(table.rows) == table.header_rows + 1:
+                table.header_rows = len(table.rows)
+            self._cells[-1] = []
+            table.rows[-1].append(self._cells[-1])
+        elif tag == "br":
+            self._runs.append(Run("\n", **self._run_style()))
+
+        if tag in _BOLD:
+            self._style["bold"] += 1
+        elif tag in _ITALIC:
+            self._style["italic"] += 1
+        elif tag in _UNDERLINE:
+            self._style["underline"] += 1
+
+    def handle_startendtag(self, tag: str, attrs: List[Tuple[str, Optional[str]]]) -> None:
+        if tag == "br" and not self._skip:
+            self._runs.append(Run("\n", **self._run_style()))
+        elif tag == "hr" and not self._skip:
+            self._flush()
+
+    def handle_endtag(self, tag: str) -> None:
+        if tag in _SKIP:
+            self._skip = max(0, self._skip - 1)
+            return
+        if self._skip:
+            return
+
+        if tag in _BOLD:
+            self._style["bold"] = max(0, self._style["bold"] - 1)
+        elif tag in _ITALIC:
+            self._style["italic"] = max(0, self._style["italic"] - 1)
+        elif tag in _UNDERLINE:
+            self._style["underline"] = max(0, self._style["underline"] - 1)
+
+        if tag in _HEADINGS or tag in _BLOCK_BREAKS or tag == "li":
+            self._flush()
+            if tag == "pre":
+                self._pre = max(0, self._pre - 1)
+            if tag == "li" and self._items:
+                self._items.pop()
+        elif tag in ("ul", "ol"):
+            self._flush()
+            if self._lists:
+                self._lists.pop()
+            while self._items and self._items[-1] > len(self._lists):
+                self._items.pop()
+            if self._items:
+                # a beágyazott lista utáni szöveg a befoglaló listaelem folytatása (jel nélkül)
+                self._kind, self._level, self._marker, self._explicit = "list_item", self._items[-1], "", True
+        elif tag in ("td", "th") and self._tables:
+            self._flush()
+            self._cells[-1] = None
+        elif tag == "table" and self._tables:
+            self._flush()
+            table = self._tables.pop()
+            self._cells.pop()
+            table.rows = [row for row in table.rows if row]
+            if table.rows:
+                if self._cell is not None:
+                    # beágyazott táblázat: a befoglaló cellába kerül szövegként
+                    self._cell.extend(_table_as_runs(table))
+                else:
+                    self.blocks.append(table)
+
+    def handle_data(self, data: str) -> None:
+        if self._skip or not data:
+            return
+        self._runs.append(Run(data, **self._run_style()))
+
+    def _run_style(self) -> Dict[str, bool]:
+        return {name: count > 0 for name, count in self._style.items()}
+
+    def close(self) -> None:
+        super().close()
+        self._flush()
+        while self._tables:
+            self.handle_endtag("table")
+
+
+def _normalize_runs(runs: List[Run], keep_newlines: bool) -> List[Run]:
+    """HTML whitespace-összevonás futásokon át (a <br> / <pre> sortörései maradnak)."""
+    result: List[Run] = []
+    previous_space = True
+    for run in runs:
+        if run.text == "\n" or keep_newlines:
+            text = run.text
+            if keep_newlines:
+                text = text.replace("\r\n", "\n")
+            previous_space = text.endswith(("\n", " "))
+        else:
+            words = run.text.split()
+            if not words:
+                if not previous_space:
+                    text, previous_space = " ", True
+                else:
+                    continue
+            else:
+                lead = " " if run.text[0] in _WHITESPACE and not previous_space else ""
+                trail = " " if run.text[-1] in _WHITESPACE else ""
+                text = lead + " ".join(words) + trail
+                previous_space = bool(trail)
+        if result and (result[-1].bold, result[-1].italic, result[-1].underline) == (run.bold, run.italic, run.underline):
+            result[-1] = Run(result[-1].text + text, run.bold, run.italic, run.underline)
+        else:
+            result.append(Run(text, run.bold, run.italic, run.underline))
+
+    # szélek: vezető / záró whitespace és sortörés le
+    while result and not result[0].text.strip():
+        result.pop(0)
+    while result and not result[-1].text.strip():
+        result.pop()
+    if result:
+        first, last = result[0], result[-1]
+        result[0] = Run(first.text.lstrip(), first.bold, first.italic, first.underline)
+        last = result[-1]
+        result[-1] = Run(last.text.rstrip(), last.bold, last.italic, last.underline)
+    return result
+
+
+def _split_lines(runs: List[Run]) -> List[List[Run]]:
+    lines: List[List[Run]] = [[]]
+    for run in runs:
+        parts = run.text.split("\n")
+        for i, part in enumerate(parts):
+            if i:
+                lines.append([])
+            if part:
+                lines[-1].append(Run(part, run.bold, run.italic, run.underline))
+    return [trimmed for line in lines if (trimmed := _normalize_runs(line, keep_newlines=False))]
+
+
+def _table_as_runs(table: Block) -> List[Run]:
+    runs: List[Run] = []
+    for row in table.rows:
+        for i, cell in enumerate(row):
+            runs.append(Run(" | " if i else "\n"))
+            runs.extend(cell)
+    return runs
+
+
+def parse_html_blocks(html: str) -> List[Block]:
+    """
+    Export HTML → blokkok. A blokkelem nélküli (sima) szöveg soronként
+    bekezdés lesz, a <pre> tartalma megtartja a sortöréseit.
+    """
+    parser = _BlockParser()
+    parser.feed(html or "")
+    parser.close()
+    return parser.blocks
+
+
+def blocks_to_plain_text(blocks: List[Block]) -> str:
+    lines: List[str] = []
+    for block in blocks:
+        if block.kind == "table":
+            lines.extend(" | ".join("".join(r.text for r in cell) for cell in row) for row in block.rows)
+        elif block.kind == "list_item":
+            lines.append(f"{block.marker} {block.text}".lstrip())
+        else:
+            lines.append(block.text)
+    return "\n\n".join(lines)
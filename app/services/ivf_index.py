@@ -0,0 +1,157 @@
+import os
+from typing import Optional, Tuple
+
+import numpy as np
+from dotenv import load_dotenv
+
+from .vector_math import normalize_rows, top_k_indices
+
+load_dotenv()
+
+# "auto": IVF csak RAG_ANN_MIN_CHUNKS felett; "off": mindig pontos keresés
+RAG_ANN_BACKEND = os.getenv("RAG_ANN_BACKEND", "auto")
+RAG_ANN_MIN_CHUNKS = int(os.getenv("RAG_ANN_MIN_CHUNKS", "20000"))
+# listák száma; 0 → kb. sqrt(n)
+RAG_IVF_NLIST = int(os.getenv("RAG_IVF_NLIST", "0"))
+# ennyi legközelebbi listát nézünk meg keresésenként (recall ↔ késleltetés)
+RAG_IVF_NPROBE = int(os.getenv("RAG_IVF_NPROBE", "8"))
+RAG_IVF_TRAIN_ITER = int(os.getenv("RAG_IVF_TRAIN_ITER", "15"))
+
+# k-means tanításhoz legfeljebb ennyi mintát veszünk listánként
+_TRAIN_SAMPLES_PER_LIST = 128
+# a hozzárendelés ekkora sorblokkokban megy (memóriakorlát)
+_ASSIGN_BLOCK = 16384
+
+
+def ann_enabled(n_rows: int, backend: str = RAG_ANN_BACKEND) -> bool:
+    """Kell-e IVF ekkora korpuszhoz (kis korpusznál a pontos keresés a gyorsabb)."""
+    if n_rows == 0:
+        return False
+    return backend == "ivf" or (backend == "auto" and n_rows >= RAG_ANN_MIN_CHUNKS)
+
+
+def default_nlist(n_rows: int) -> int:
+    if RAG_IVF_NLIST > 0:
+        return min(RAG_IVF_NLIST, n_rows)
+    return max(1, min(n_rows, int(np.sqrt(n_rows))))
+
+
+# ---------------------------------------------------------
+#  K-MEANS (szférikus: normált vektorok, skaláris szorzat)
+# ---------------------------------------------------------
+
+def _assign(matrix: np.ndarray, centroids: np.ndarray) -> np.ndarray:
+    labels = np.empty(matrix.shape[0], dtype=np.int32)
+    for start in range(0, matrix.shape[0], _ASSIGN_BLOCK):
+        block = np.asarray(matrix[start:start + _ASSIGN_BLOCK], dtype=np.float32)
+        labels[start:start + block.shape[0]] = np.argmax(block @ centroids.T, axis=1)
+    return labels
+
+
+def train_centroids(
+    matrix: np.ndarray,
+    nlist: int,
+    n_iter: int = RAG_IVF_TRAIN_ITER,
+    seed: int = 0,
+) -> np.ndarray:
+    """
+    Durva kvantáló (coarse quantizer) tanítása mintavételezett k-means-szel.
+    A bemenet soronként normált; a centroidokat is normáljuk (cosine k-means).
+    """
+    rng = np.random.default_rng(seed)
+    n = matrix.shape[0]
+
+    sample_size = min(n, nlist * _TRAIN_SAMPLES_PER_LIST)
+    sample_idx = np.sort(rng.choice(n, size=sample_size, replace=False))
+    sample = np.asarray(matrix[sample_idx], dtype=np.float32)
+
+    centroids = sample[rng.choice(sample_size, size=nlist, replace=False)].copy()
+
+    for _ in range(n_iter):
+        labels = _assign(sample, centroids)
+
+        # listánkénti összegek: címke szerint rendezve, szegmensenként reduceat
+        # (az np.add.at soronkénti ciklusánál nagyságrendekkel gyorsabb)
+        counts = np.bincount(labels, minlength=nlist)
+        nonempty = np.flatnonzero(counts)
+        starts = (np.cumsum(counts) - counts)[nonempty]
+        sums = np.zeros_like(centroids)
+        sums[nonempty] = np.add.reduceat(sample[np.argsort(labels, kind="stable")], starts, axis=0)
+
+        # üres lista → véletlen mintapontból újraindítjuk
+        empty = np.flatnonzero(counts == 0)
+        if empty.size:
+            sums[empty] = sample[rng.choice(sample_size, size=empty.size, replace=False)]
+
+        centroids = normalize_rows(sums)
+
+    return centroids
+
+
+# ---------------------------------------------------------
+#  IVF INDEX
+# ---------------------------------------------------------
+
+class IVFIndex:
+    """
+    Inverted file index a vektorindex mátrixa fölött.
+    Nem másolja a vektorokat: csak a centroidokat és a listánként
+    rendezett sorindexeket tárolja (order + offsets, CSR-szerűen).
+    """
+
+    def __init__(self, centroids: np.ndarray, order: np.ndarray, offsets: np.ndarray):
+        self.centroids = centroids
+        self.order = order        # sorindexek listák szerint csoportosítva
+        self.offsets = offsets    # a lista i elemei: order[offsets[i]:offsets[i + 1]]
+
+    @property
+    def nlist(self) -> int:
+        return int(self.centroids.shape[0])
+
+    @classmethod
+    def build(
+        cls,
+        matrix: np.ndarray,
+        nlist: Optional[int] = None,
+        n_iter: int = RAG_IVF_TRAIN_ITER,
+        seed: int = 0,
+    ) -> "IVFIndex":
+        n = matrix.shape[0]
+        nlist = min(nlist or default_nlist(n), n)
+
+        centroids = train_centroids(matrix, nlist, n_iter=n_iter, seed=seed)
+        labels = _assign(matrix, centroids)
+
+        order = np.argsort(labels, kind="stable").astype(np.int64)
+        counts = np.bincount(labels, minlength=nlist)
+        offsets = np.zeros(nlist + 1, dtype=np.int64)
+        np.cumsum(counts, out=offsets[1:])
+
+        return cls(centroids, order, offsets)
+
+    def search(
+        self,
+        matrix: np.ndarray,
+        query: np.ndarray,
+        top_k: int,
+        nprobe: int = RAG_IVF_NPROBE,
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Közelítő top-k: csak a query-hez legközelebbi nprobe lista elemeit pontozzuk.
+        A query-nek normáltnak kell lennie. Visszatér: (sorindexek, pontszámok).
+        """
+        nprobe = max(1, min(nprobe, self.nlist))
+        probe = top_k_indices(self.centroids @ query, nprobe)
+
+        candidates = np.concatenate(
+            [self.order[self.offsets[l]:self.offsets[l + 1]] for l in probe]
+        )
+        if candidates.size == 0:
+            return candidates, np.empty(0, dtype=np.float32)
+
+        # rendezett olvasás: memmap esetén szekvenciálisabb lapelérés
+        candidates.sort()
+        scores = np.asarray(matrix[candidates], dtype=np.float32) @ query
+        best = top_k_indices(scores, top_k)
+
+        return candidates[best], scores[best]
@@ -0,0 +1,99 @@
+import importlib.util
+import os
+import threading
+from typing import Optional
+
+import httpx
+from dotenv import load_dotenv
+from openai import AsyncOpenAI, DefaultAsyncHttpxClient, DefaultHttpxClient, OpenAI
+
+load_dotenv()
+
+OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
+
+# kapcsolat-pool és időkorlátok (processzenként egy sync és egy async pool)
+OPENAI_MAX_CONNECTIONS = int(os.getenv("OPENAI_MAX_CONNECTIONS", "100"))
+OPENAI_MAX_KEEPALIVE = int(os.getenv("OPENAI_MAX_KEEPALIVE", "20"))
+OPENAI_KEEPALIVE_EXPIRY_SEC = float(os.getenv("OPENAI_KEEPALIVE_EXPIRY_SEC", "30"))
+OPENAI_TIMEOUT_SEC = float(os.getenv("OPENAI_TIMEOUT_SEC", "120"))
+OPENAI_CONNECT_TIMEOUT_SEC = float(os.getenv("OPENAI_CONNECT_TIMEOUT_SEC", "10"))
+OPENAI_MAX_RETRIES = int(os.getenv("OPENAI_MAX_RETRIES", "2"))
+# HTTP/2 csak akkor, ha a h2 csomag telepítve van (httpx[http2]); különben HTTP/1.1 keep-alive
+OPENAI_HTTP2 = os.getenv("OPENAI_HTTP2", "1").lower() not in ("0", "false", "no")
+
+
+def http2_enabled() -> bool:
+    return OPENAI_HTTP2 and importlib.util.find_spec("h2") is not None
+
+
+def _limits() -> httpx.Limits:
+    return httpx.Limits(
+        max_connections=OPENAI_MAX_CONNECTIONS,
+        max_keepalive_connections=OPENAI_MAX_KEEPALIVE,
+        keepalive_expiry=OPENAI_KEEPALIVE_EXPIRY_SEC,
+    )
+
+
+def _timeout() -> httpx.Timeout:
+    return httpx.Timeout(OPENAI_TIMEOUT_SEC, connect=OPENAI_CONNECT_TIMEOUT_SEC)
+
+
+# ---------------------------------------------------------
+#  MEGOSZTOTT KLIENSEK
+#  (egy kapcsolat-pool processzenként: nincs új TLS kézfogás kérésenként)
+# ---------------------------------------------------------
+
+_lock = threading.Lock()
+_sync_client: Optional[OpenAI] = None
+_async_client: Optional[AsyncOpenAI] = None
+
+
+def get_openai_client() -> OpenAI:
+    """Processz-szintű, poolozott szinkron kliens (szálak között megosztható)."""
+    global _sync_client
+    if _sync_client is None:
+        with _lock:
+            if _sync_client is None:
+                _sync_client = OpenAI(
+                    api_key=OPENAI_API_KEY,
+                    max_retries=OPENAI_MAX_RETRIES,
+                    timeout=_timeout(),
+                    http_client=DefaultHttpxClient(
+                        limits=_limits(),
+                        timeout=_timeout(),
+                        http2=http2_enabled(),
+                    ),
+                )
+    return _sync_client
+
+
+def get_async_openai_client() -> AsyncOpenAI:
+    """Processz-szintű, poolozott AsyncOpenAI kliens a FastAPI eseményhurokhoz."""
+    global _async_client
+    if _async_client is None:
+        with _lock:
+            if _async_client is None:
+                _async_client = AsyncOpenAI(
+                    api_key=OPENAI_API_KEY,
+                    max_retries=OPENAI_MAX_RETRIES,
+                    timeout=_timeout(),
+                    http_client=DefaultAsyncHttpxClient(
+                        limits=_limits(),
+                        timeout=_timeout(),
+                        http2=http2_enabled(),
+                    ),
+                )
+    return _async_client
+
+
+async def close_openai_clients() -> None:
+    """Leállításkor: a poolok lezárása (a következő get_* újat épít)."""
+    global _sync_client, _async_client
+    with _lock:
+        sync_client, async_client = _sync_client, _async_client
+        _sync_client = _async_client = None
+
+    if sync_client is not None:
+        sync_client.close()
+    if async_client is not None:
+        await async_client.close()
@@ -1,10 +1,21 @@
 import os
 import json
-from typing import Tuple
-
+import asyncio
+import contextvars
+import difflib
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import AsyncIterator, Awaitable, Callable, Dict, List, Optional, Tuple, TypeVar
+
+import anyio
 from dotenv import load_dotenv
 from openai import OpenAI
 
+from .openai_client import get_async_openai_client, get_openai_client
+from .response_cache import Validator, cache_bypass, response_cache, response_cache_key
+from ..utils.single_flight import SingleFlight
+from ..utils.contract_sections import Section, clause_spans, find_clause, split_sections
+
 from .. import schemas  # ContractGenerateRequest, ContractReviewRequest/Response, ContractApplySuggestions...
 
 load_dotenv()
@@ -17,11 +28,113 @@ if not OPENAI_API_KEY:
 
 
 # ---------------------------------------------------------
-#  MINDEN OPENAI-HÍVÁS: ÚJ KLIENS -> STATLESS MŰKÖDÉS
-#  (így minden gombnyomásra ÚJ szerződés generálódik)
+#  KÖZÖS, POOLOZOTT KLIENS
+#  A hívások továbbra is statelessek (minden gombnyomásra ÚJ
+#  szerződés generálódik), csak a HTTP kapcsolatok újrahasznosítottak.
 # ---------------------------------------------------------
+Messages = List[Dict[str, str]]
+
+
 def get_client() -> OpenAI:
-    return OpenAI(api_key=OPENAI_API_KEY)
+    return get_openai_client()
+
+
+# ---------------------------------------------------------
+#  KÖZÖS CHAT COMPLETION: SINGLE-FLIGHT + CACHE
+#  - az egyszerre futó, azonos kérések (pl. dupla kattintás) egyetlen
+#    OpenAI hívást várnak meg és ugyanazt az eredményt kapják,
+#  - alacsony temperature mellett azonos bemenetre azonos választ
+#    adunk vissza a response_cache-ből (X-Cache-Bypass: 1 → friss válasz).
+# ---------------------------------------------------------
+ai_single_flight = SingleFlight()
+
+def _completion_args(
+    model: str,
+    messages: Messages,
+    temperature: float,
+    max_tokens: int | None,
+    response_format: Dict[str, str] | None,
+) -> Dict[str, object]:
+    args: Dict[str, object] = {"model": model, "messages": messages, "temperature": temperature}
+    if max_tokens is not None:
+        args["max_tokens"] = max_tokens
+    if response_format is not None:
+        args["response_format"] = response_format
+    return args
+
+
+def _flight_key(key: str) -> tuple:
+    # az X-Cache-Bypass kérés ne csatlakozhasson egy (esetleg cache-ből válaszoló)
+    # normál híváshoz: a bypass-os hívások csak egymással vonódnak össze
+    return (key, cache_bypass.get())
+
+
+def chat_completion(
+    endpoint: str,
+    model: str,
+    messages: Messages,
+    temperature: float,
+    max_tokens: int | None = None,
+    response_format: Dict[str, str] | None = None,
+    validate: Validator | None = None,
+) -> str:
+    args = _completion_args(model, messages, temperature, max_tokens, response_format)
+
+    def call() -> str:
+        response = get_client().chat.completions.create(**args)
+        return response.choices[0].message.content or ""
+
+    key = response_cache_key(model, messages, temperature, max_tokens, response_format=response_format)
+    flight_key = _flight_key(key)
+    if not response_cache.cacheable(temperature):
+        return ai_single_flight.do(flight_key, call)
+    return ai_single_flight.do(flight_key, lambda: response_cache.get_or_call(endpoint, key, call, validate))
+
+
+async def chat_completion_async(
+    endpoint: str,
+    model: str,
+    messages: Messages,
+    temperature: float,
+    max_tokens: int | None = None,
+    response_format: Dict[str, str] | None = None,
+    validate: Validator | None = None,
+) -> str:
+    args = _completion_args(model, messages, temperature, max_tokens, response_format)
+
+    async def call() -> str:
+        response = await get_async_openai_client().chat.completions.create(**args)
+        return response.choices[0].message.content or ""
+
+    key = response_cache_key(model, messages, temperature, max_tokens, response_format=response_format)
+    flight_key = _flight_key(key)
+    if not response_cache.cacheable(temperature):
+        return await ai_single_flight.do_async(flight_key, call)
+    return await ai_single_flight.do_async(flight_key, lambda: response_cache.aget_or_call(endpoint, key, call, validate))
+
+
+# ---------------------------------------------------------
+#  PÁRHUZAMOS FUTTATÁS KORLÁTOZOTT KONKURENCIÁVAL (sync / async)
+# ---------------------------------------------------------
+_T = TypeVar("_T")
+_R = TypeVar("_R")
+
+
+def _run_in_threads(fn: Callable[[_T], _R], items: List[_T], concurrency: int, name: str) -> List[_R]:
+    # a szálak is lássák a kérés contextvar-jait (pl. X-Cache-Bypass)
+    with ThreadPoolExecutor(max_workers=max(1, concurrency), thread_name_prefix=name) as pool:
+        futures = [pool.submit(contextvars.copy_context().run, fn, item) for item in items]
+        return [future.result() for future in futures]
+
+
+async def _gather_bounded(fn: Callable[[_T], Awaitable[_R]], items: List[_T], concurrency: int) -> List[_R]:
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+
+    async def run(item: _T) -> _R:
+        async with semaphore:
+            return await fn(item)
+
+    return list(await asyncio.gather(*(run(item) for item in items)))
 
 
 # ---------------------------------------------------------
@@ -64,42 +177,37 @@ Ha szerződést generálsz vagy javítasz:
 # ---------------------------------------------------------
 #  EGYSZERŰ TESZT: MONDAT VISSZAADÁSA
 # ---------------------------------------------------------
+def _ai_test_messages() -> Messages:
+    return [
+        {
+            "role": "system",
+            "content": (
+                "Te egy magyar nyelvű jogi asszisztens vagy. "
+                "Válaszolj röviden és barátságosan."
+            ),
+        },
+        {
+            "role": "user",
+            "content": (
+                "Írj egy rövid mondatot arról, hogy működik a Magyar SzerződésGPT API."
+            ),
+        },
+    ]
+
+
 def ai_test_sentence() -> str:
     """Egyszerű teszt: visszaad egy rövid mondatot magyarul."""
-    client = get_client()
-    response = client.chat.completions.create(
-        model="gpt-5.1",
-        messages=[
-            {
-                "role": "system",
-                "content": (
-                    "Te egy magyar nyelvű jogi asszisztens vagy. "
-                    "Válaszolj röviden és barátságosan."
-                ),
-            },
-            {
-                "role": "user",
-                "content": (
-                    "Írj egy rövid mondatot arról, hogy működik a Magyar SzerződésGPT API."
-                ),
-            },
-        ],
-        temperature=0.4,
-    )
-    return response.choices[0].message.content or ""
+    return chat_completion("ai_test", "gpt-5.1", _ai_test_messages(), temperature=0.4)
+
+
+async def ai_test_sentence_async() -> str:
+    return await chat_completion_async("ai_test", "gpt-5.1", _ai_test_messages(), temperature=0.4)
 
 
 # ---------------------------------------------------------
 #  1) GENERATE: szerződés generálása
 # ---------------------------------------------------------
-def generate_contract(request: schemas.ContractGenerateRequest) -> Tuple[str, str]:
-    """
-    Magyar nyelvű szerződés generálása a megadott adatok alapján.
-    Visszatér: (szerződés szövege, magyar összefoglaló).
-    Minden hívás teljesen új, stateless generálás.
-    """
-    client = get_client()
-
+def _generate_messages(request: schemas.ContractGenerateRequest) -> Messages:
     extra_terms = request.special_terms or "nincs külön megadva"
 
     user_prompt = f"""
@@ -142,17 +250,13 @@ Követelmények a kimenetre:
 4. A nyelvezet legyen egyértelmű, pontos, formális, magyar jogi stílusú.
 """
 
-    response = client.chat.completions.create(
-        model="gpt-5.1",
-        messages=[
-            {"role": "system", "content": SYSTEM_PROMPT_CONTRACT},
-            {"role": "user", "content": user_prompt},
-        ],
-        temperature=0.25,
-    )
+    return [
+        {"role": "system", "content": SYSTEM_PROMPT_CONTRACT},
+        {"role": "user", "content": user_prompt},
+    ]
 
-    text = response.choices[0].message.content or ""
 
+def _split_generated(text: str) -> Tuple[str, str]:
     # Kettébontjuk a választ
     if "[OSSZEFOGLALO]" in text:
         contract_part, summary_part = text.split("[OSSZEFOGLALO]", 1)
@@ -167,28 +271,60 @@ Követelmények a kimenetre:
     return contract_text, summary_hu
 
 
-# ---------------------------------------------------------
-#  2) REVIEW: szerződés elemzése / kockázatértékelése
-# ---------------------------------------------------------
-def analyze_contract(request: schemas.ContractReviewRequest) -> schemas.ContractReviewResponse:
+def generate_contract(request: schemas.ContractGenerateRequest) -> Tuple[str, str]:
     """
-    AI-alapú szerződés review:
-    - rövid, laikus összefoglaló,
-    - max. 5 kockázatos pont,
-    - általános kockázati szint.
-    Az eredmény szigorúan a ContractReviewResponse JSON-sémának megfelelő.
+    Magyar nyelvű szerződés generálása a megadott adatok alapján.
+    Visszatér: (szerződés szövege, magyar összefoglaló).
+    Minden hívás teljesen új, stateless generálás.
     """
-    client = get_client()
+    text = chat_completion("generate", "gpt-5.1", _generate_messages(request), temperature=0.25)
+    return _split_generated(text)
+
+
+async def generate_contract_async(request: schemas.ContractGenerateRequest) -> Tuple[str, str]:
+    text = await chat_completion_async("generate", "gpt-5.1", _generate_messages(request), temperature=0.25)
+    return _split_generated(text)
 
+
+# ---------------------------------------------------------
+#  2) REVIEW: szerződés elemzése / kockázatértékelése
+# ---------------------------------------------------------
+REVIEW_MODEL = "gpt-5.1"
+# e fölött (karakterben) a szerződést részenként elemezzük (map-reduce)
+REVIEW_LONG_THRESHOLD_CHARS = int(os.getenv("REVIEW_LONG_THRESHOLD_CHARS", "40000"))
+# egy rész mérete: annyi, hogy lehetőleg egy párhuzamos hullámban elférjenek,
+# de a kontextus-korlát miatt legfeljebb REVIEW_SECTION_MAX_CHARS
+REVIEW_SECTION_MIN_CHARS = int(os.getenv("REVIEW_SECTION_MIN_CHARS", "8000"))
+REVIEW_SECTION_MAX_CHARS = int(os.getenv("REVIEW_SECTION_MAX_CHARS", "40000"))
+REVIEW_MAP_CONCURRENCY = int(os.getenv("REVIEW_MAP_CONCURRENCY", "8"))
+REVIEW_MAX_ISSUES = 5
+# részenként kevesebb pontot kérünk: rövidebb kimenet, gyorsabb map lépés
+REVIEW_SECTION_MAX_ISSUES = 3
+
+
+def _review_messages(
+    request: schemas.ContractReviewRequest,
+    contract_text: Optional[str] = None,
+    part_note: Optional[str] = None,
+    max_issues: int = REVIEW_MAX_ISSUES,
+) -> Messages:
     contract_type = request.contract_type or "ismeretlen típus"
     party_role = request.party_role or "nem megadott szerep"
+    contract_text = request.contract_text if contract_text is None else contract_text
+
+    task = "Elemezd az alábbi szerződést."
+    if part_note:
+        task = (
+            f"Elemezd az alábbi szerződés-részletet ({part_note}). "
+            "Csak ezt a részt értékeld; az összefoglaló is erre a részre vonatkozzon."
+        )
 
     user_instructions = f"""
-Elemezd az alábbi szerződést.
+{task}
 
 Cél:
 - Készíts rövid, magyar nyelvű, laikus összefoglalót.
-- Emeld ki a legfeljebb 5 legfontosabb kockázatos vagy szokatlan pontot.
+- Emeld ki a legfeljebb {max_issues} legfontosabb kockázatos vagy szokatlan pontot.
 - Minden problémás ponthoz adj:
   - rövid idézetet vagy összefoglalót,
   - magyarázatot, hogy mi a gond jogilag vagy gyakorlatban,
@@ -201,7 +337,7 @@ Tájékoztató adatok:
 - A felhasználó szerződésbeli szerepe: {party_role}
 
 Elemzendő szerződés szövege:
-\"\"\"{request.contract_text}\"\"\"
+\"\"\"{contract_text}\"\"\"
 
 A VÁLASZOD SZIGORÚAN ÉRVÉNYES JSON legyen, pontosan az alábbi szerkezetben:
 
@@ -221,48 +357,224 @@ A VÁLASZOD SZIGORÚAN ÉRVÉNYES JSON legyen, pontosan az alábbi szerkezetben:
 }}
 
 Fontos:
-- Legfeljebb 5 elemet adj vissza az 'issues' listában.
+- Legfeljebb {max_issues} elemet adj vissza az 'issues' listában.
 - A 'disadvantaged_party' mező értéke VAGY egy rövid szöveg (pl. "megbízó"), VAGY JSON null (nem string), ha senki nincs egyértelmű hátrányban.
 - A JSON legyen szintaktikailag érvényes, ne írj kommentet vagy extra szöveget.
 """
 
-    response = client.chat.completions.create(
-        model="gpt-5.1",
-        response_format={"type": "json_object"},
-        messages=[
-            {
-                "role": "system",
-                "content": (
-                    "Te egy magyar jogra specializált, óvatos AI jogi asszisztens vagy. "
-                    "Általános tájékoztatást adsz, nem minősülsz ügyvédnek, és mindig jelzed, "
-                    "hogy a válasz nem helyettesíti a jogi tanácsadást."
-                ),
-            },
-            {"role": "system", "content": SYSTEM_PROMPT_CONTRACT},
-            {"role": "user", "content": user_instructions},
-        ],
+    return [
+        {
+            "role": "system",
+            "content": (
+                "Te egy magyar jogra specializált, óvatos AI jogi asszisztens vagy. "
+                "Általános tájékoztatást adsz, nem minősülsz ügyvédnek, és mindig jelzed, "
+                "hogy a válasz nem helyettesíti a jogi tanácsadást."
+            ),
+        },
+        {"role": "system", "content": SYSTEM_PROMPT_CONTRACT},
+        {"role": "user", "content": user_instructions},
+    ]
+
+
+def _parse_review(content: str) -> schemas.ContractReviewResponse:
+    # a response_cache is ezzel ellenőriz: csak feldolgozható választ rögzít
+    return schemas.ContractReviewResponse(**json.loads(content or "{}"))
+
+
+def analyze_contract(request: schemas.ContractReviewRequest) -> schemas.ContractReviewResponse:
+    """
+    AI-alapú szerződés review:
+    - rövid, laikus összefoglaló,
+    - max. 5 kockázatos pont,
+    - általános kockázati szint.
+    Az eredmény szigorúan a ContractReviewResponse JSON-sémának megfelelő.
+    Ugyanarra a szerződésre (és paraméterekre) a választ cache-ből adjuk.
+    Hosszú szerződésnél (REVIEW_LONG_THRESHOLD_CHARS felett) részenként elemzünk.
+    """
+    if len(request.contract_text) > REVIEW_LONG_THRESHOLD_CHARS:
+        return analyze_long_contract(request)
+
+    content = chat_completion(
+        "review",
+        REVIEW_MODEL,
+        _review_messages(request),
         temperature=0.2,
+        response_format={"type": "json_object"},
+        validate=_parse_review,
     )
+    return _parse_review(content)
 
-    content = response.choices[0].message.content or "{}"
-    data = json.loads(content)
 
-    review = schemas.ContractReviewResponse(**data)
-    return review
+async def analyze_contract_async(
+    request: schemas.ContractReviewRequest,
+) -> schemas.ContractReviewResponse:
+    if len(request.contract_text) > REVIEW_LONG_THRESHOLD_CHARS:
+        return await analyze_long_contract_async(request)
+
+    content = await chat_completion_async(
+        "review",
+        REVIEW_MODEL,
+        _review_messages(request),
+        temperature=0.2,
+        response_format={"type": "json_object"},
+        validate=_parse_review,
+    )
+    return _parse_review(content)
 
 
 # ---------------------------------------------------------
-#  3) APPLY SUGGESTIONS: javaslatok beépítése a szerződésbe
+#  2/b) HOSSZÚ SZERZŐDÉS: MAP-REDUCE REVIEW
+#  map:    a pontszámozás mentén vágott részek párhuzamos elemzése
+#  reduce: a kockázatok összefésülése / duplikátumszűrése (max. 5),
+#          összesített kockázati szint, rövid összesítő összefoglaló
 # ---------------------------------------------------------
-def apply_suggestions(
-    request: schemas.ContractApplySuggestionsRequest,
-) -> schemas.ContractApplySuggestionsResponse:
+_RISK_RANK = {"alacsony": 0, "közepes": 1, "magas": 2}
+
+
+def review_sections(text: str, concurrency: int, section_max_chars: int) -> List[Section]:
+    target = -(-len(text) // max(1, concurrency))  # felfelé kerekítve
+    return split_sections(text, max_chars=min(section_max_chars, max(REVIEW_SECTION_MIN_CHARS, target)))
+
+
+def _section_messages(
+    request: schemas.ContractReviewRequest,
+    sections: List[Section],
+) -> List[Messages]:
+    total = len(sections)
+    return [
+        _review_messages(
+            request,
+            contract_text=section.text,
+            part_note=f"{index}/{total}. rész, {section.label}",
+            max_issues=REVIEW_SECTION_MAX_ISSUES,
+        )
+        for index, section in enumerate(sections, start=1)
+    ]
+
+
+def _issue_key(issue: schemas.ContractReviewIssue) -> str:
+    return " ".join(f"{issue.issue} {issue.clause_excerpt}".casefold().split())
+
+
+def merge_review_issues(
+    partials: List[schemas.ContractReviewResponse],
+    max_issues: int = REVIEW_MAX_ISSUES,
+    similarity: float = 0.8,
+) -> List[schemas.ContractReviewIssue]:
     """
-    Az eredeti szerződés szövegéből kiindulva építse be a kiválasztott javaslatokat,
-    és adjon vissza egy módosított szerződés-verziót + rövid változás-összefoglalót.
+    A részenkénti kockázatok összefésülése: a (közel) azonos problémák közül a
+    súlyosabb marad, majd kockázati szint szerint (stabilan) a legfontosabb max_issues.
+    """
+    merged: List[Tuple[str, schemas.ContractReviewIssue]] = []
+    for partial in partials:
+        for issue in partial.issues:
+            key = _issue_key(issue)
+            for i, (other_key, other) in enumerate(merged):
+                if difflib.SequenceMatcher(None, key, other_key).ratio() >= similarity:
+                    if _RISK_RANK[issue.risk_level] > _RISK_RANK[other.risk_level]:
+                        merged[i] = (key, issue)
+                    break
+            else:
+                merged.append((key, issue))
+
+    ranked = sorted(merged, key=lambda item: -_RISK_RANK[item[1].risk_level])
+    return [issue for _, issue in ranked[:max_issues]]
+
+
+def _summary_messages(partials: List[schemas.ContractReviewResponse]) -> Messages:
+    summaries = "\n".join(
+        f"{index}. rész: {partial.summary_hu}" for index, partial in enumerate(partials, start=1)
+    )
+    return [
+        {"role": "system", "content": SYSTEM_PROMPT_CONTRACT},
+        {
+            "role": "user",
+            "content": (
+                "Egy hosszú szerződést részenként elemeztünk. Az alábbi rész-összefoglalók "
+                "alapján írj egyetlen rövid, laikus, magyar nyelvű összefoglalót a teljes "
+                "szerződésről (max. 8-10 mondat). Csak az összefoglaló szövegét add vissza.\n\n"
+                f"{summaries}"
+            ),
+        },
+    ]
+
+
+def _reduce_review(
+    partials: List[schemas.ContractReviewResponse],
+    summary_hu: str,
+) -> schemas.ContractReviewResponse:
+    overall = max((p.overall_risk for p in partials), key=_RISK_RANK.__getitem__, default="alacsony")
+    notes = next((p.notes for p in partials if p.notes), None)
+    split_note = f"A szerződést {len(partials)} részletben elemeztük."
+    return schemas.ContractReviewResponse(
+        summary_hu=summary_hu.strip(),
+        issues=merge_review_issues(partials),
+        overall_risk=overall,
+        notes=f"{notes} {split_note}" if notes else split_note,
+    )
+
+
+def _review_section(messages: Messages) -> schemas.ContractReviewResponse:
+    content = chat_completion(
+        "review",
+        REVIEW_MODEL,
+        messages,
+        temperature=0.2,
+        response_format={"type": "json_object"},
+        validate=_parse_review,
+    )
+    return _parse_review(content)
+
+
+async def _review_section_async(messages: Messages) -> schemas.ContractReviewResponse:
+    content = await chat_completion_async(
+        "review",
+        REVIEW_MODEL,
+        messages,
+        temperature=0.2,
+        response_format={"type": "json_object"},
+        validate=_parse_review,
+    )
+    return _parse_review(content)
+
+
+def analyze_long_contract(
+    request: schemas.ContractReviewRequest,
+    concurrency: int = REVIEW_MAP_CONCURRENCY,
+    section_max_chars: int = REVIEW_SECTION_MAX_CHARS,
+) -> schemas.ContractReviewResponse:
     """
-    client = get_client()
+    Map-reduce review: a részek legfeljebb `concurrency` szálon, párhuzamosan
+    futnak (részenként cache-elve, így egy módosított szerződésnél csak a
+    változott részek mennek újra), majd egy rövid összegző hívás következik.
+    """
+    sections = review_sections(request.contract_text, concurrency, section_max_chars)
+    messages = _section_messages(request, sections)
+    partials = _run_in_threads(_review_section, messages, concurrency, "review-map")
+
+    summary = chat_completion("review_reduce", REVIEW_MODEL, _summary_messages(partials), temperature=0.2)
+    return _reduce_review(partials, summary)
+
+
+async def analyze_long_contract_async(
+    request: schemas.ContractReviewRequest,
+    concurrency: int = REVIEW_MAP_CONCURRENCY,
+    section_max_chars: int = REVIEW_SECTION_MAX_CHARS,
+) -> schemas.ContractReviewResponse:
+    sections = review_sections(request.contract_text, concurrency, section_max_chars)
+    messages = _section_messages(request, sections)
+    partials = await _gather_bounded(_review_section_async, messages, concurrency)
+
+    summary = await chat_completion_async(
+        "review_reduce", REVIEW_MODEL, _summary_messages(partials), temperature=0.2
+    )
+    return _reduce_review(partials, summary)
+
 
+# ---------------------------------------------------------
+#  3) APPLY SUGGESTIONS: javaslatok beépítése a szerződésbe
+# ---------------------------------------------------------
+def _apply_suggestions_messages(request: schemas.ContractApplySuggestionsRequest) -> Messages:
     # Összefoglaljuk a kiválasztott javaslatokat a prompt számára
     issues_summary_lines = []
     for idx, issue in enumerate(request.issues_to_apply, start=1):
@@ -304,21 +616,203 @@ A válaszod SZIGORÚAN az alábbi JSON struktúrában add meg (ne írj semmi má
 }}
 """
 
-    response = client.chat.completions.create(
-        model="gpt-5.1",
-        response_format={"type": "json_object"},
-        messages=[
-            {"role": "system", "content": system_msg},
-            {"role": "system", "content": SYSTEM_PROMPT_CONTRACT},
-            {"role": "user", "content": user_instructions},
-        ],
+    return [
+        {"role": "system", "content": system_msg},
+        {"role": "system", "content": SYSTEM_PROMPT_CONTRACT},
+        {"role": "user", "content": user_instructions},
+    ]
+
+
+# ---------------------------------------------------------
+#  3/b) DIFF MÓD: csak az érintett pontok átírása
+#  - a kivonatokhoz tartozó pontokat helyben, fuzzy egyezéssel keressük,
+#  - a modell csak ezeket írja át (párhuzamosan), a kimenet így a
+#    módosított pontok hosszával arányos, nem a teljes szerződésével,
+#  - az átírt pontokat visszaillesztjük, és strukturált diffet adunk vissza.
+# ---------------------------------------------------------
+APPLY_REWRITE_CONCURRENCY = int(os.getenv("APPLY_REWRITE_CONCURRENCY", "8"))
+APPLY_MATCH_MIN_SCORE = float(os.getenv("APPLY_MATCH_MIN_SCORE", "0.6"))
+
+
+@dataclass
+class ClauseEdit:
+    start: int
+    end: int
+    issue_indexes: List[int]
+    score: float
+
+
+def plan_clause_edits(request: schemas.ContractApplySuggestionsRequest) -> Optional[List[ClauseEdit]]:
+    """
+    Kivonat → pont párosítás. Az ugyanarra a pontra vonatkozó javaslatok
+    egyetlen átírásba kerülnek. None, ha bármelyik kivonat nem található.
+    """
+    text = request.original_contract
+    spans = clause_spans(text)
+    edits: Dict[Tuple[int, int], ClauseEdit] = {}
+
+    for index, issue in enumerate(request.issues_to_apply):
+        match = find_clause(text, issue.clause_excerpt, spans, min_score=APPLY_MATCH_MIN_SCORE)
+        if match is None:
+            return None
+        edit = edits.setdefault((match.start, match.end), ClauseEdit(match.start, match.end, [], match.score))
+        edit.issue_indexes.append(index)
+        edit.score = min(edit.score, match.score)
+
+    return sorted(edits.values(), key=lambda edit: edit.start)
+
+
+def _clause_rewrite_messages(
+    request: schemas.ContractApplySuggestionsRequest,
+    edit: ClauseEdit,
+) -> Messages:
+    clause = request.original_contract[edit.start:edit.end]
+    suggestions = "\n".join(
+        f"- Probléma: {request.issues_to_apply[i].issue}\n"
+        f"  Javasolt módosítás: {request.issues_to_apply[i].suggestion}"
+        for i in edit.issue_indexes
+    )
+    return [
+        {
+            "role": "system",
+            "content": (
+                "Te egy magyar jogi asszisztens vagy. Egy szerződés EGYETLEN pontját "
+                "írod át a megadott javaslatok szerint, a jogi stílus megtartásával."
+            ),
+        },
+        {
+            "role": "user",
+            "content": (
+                f"A szerződés érintett pontja:\n\"\"\"{clause}\"\"\"\n\n"
+                f"Beépítendő javaslatok:\n{suggestions}\n\n"
+                "Szabályok:\n"
+                "- Csak annyit módosíts, amennyi a javaslatokhoz szükséges.\n"
+                "- A pont számozása / fejléce maradjon változatlan.\n"
+                "- KIZÁRÓLAG az átírt pont szövegét add vissza, idézőjelek és magyarázat nélkül."
+            ),
+        },
+    ]
+
+
+def _clean_rewrite(text: str, original: str) -> str:
+    """
+    A modell néha idézőjelek közé teszi a teljes választ: csak az ilyen
+    körbezáró párt vesszük le. Egy definiált fogalom idézőjele a szöveg
+    elején / végén (pl. ... a továbbiakban: "Megbízó") megmarad.
+    """
+    cleaned = text.strip()
+    if len(cleaned) >= 2 and cleaned[0] == cleaned[-1] == '"' and '"' not in cleaned[1:-1]:
+        cleaned = cleaned[1:-1].strip()
+    return cleaned or original
+
+
+def _rewrite_clause(request: schemas.ContractApplySuggestionsRequest, edit: ClauseEdit) -> str:
+    text = chat_completion(
+        "apply_suggestions", "gpt-5.1", _clause_rewrite_messages(request, edit), temperature=0.25
+    )
+    return _clean_rewrite(text, request.original_contract[edit.start:edit.end])
+
+
+async def _rewrite_clause_async(request: schemas.ContractApplySuggestionsRequest, edit: ClauseEdit) -> str:
+    text = await chat_completion_async(
+        "apply_suggestions", "gpt-5.1", _clause_rewrite_messages(request, edit), temperature=0.25
+    )
+    return _clean_rewrite(text, request.original_contract[edit.start:edit.end])
+
+
+def _splice_edits(
+    request: schemas.ContractApplySuggestionsRequest,
+    edits: List[ClauseEdit],
+    rewritten: List[str],
+) -> schemas.ContractApplySuggestionsResponse:
+    original = request.original_contract
+    parts: List[str] = []
+    changes: List[schemas.ContractClauseChange] = []
+    position = 0
+
+    for edit, updated in zip(edits, rewritten):
+        parts.append(original[position:edit.start])
+        parts.append(updated)
+        position = edit.end
+        changes.append(
+            schemas.ContractClauseChange(
+                issue_indexes=edit.issue_indexes,
+                start=edit.start,
+                end=edit.end,
+                original_text=original[edit.start:edit.end],
+                updated_text=updated,
+                match_score=edit.score,
+            )
+        )
+    parts.append(original[position:])
+
+    summary_lines = [
+        f"- {change.original_text.splitlines()[0][:80]}: "
+        + "; ".join(request.issues_to_apply[i].issue for i in change.issue_indexes)
+        for change in changes
+    ]
+    change_summary = f"{len(changes)} pont módosult a kiválasztott javaslatok alapján:\n" + "\n".join(summary_lines)
+
+    return schemas.ContractApplySuggestionsResponse(
+        updated_contract_text="".join(parts),
+        change_summary=change_summary,
+        mode="diff",
+        changes=changes,
+    )
+
+
+def _parse_apply_suggestions(content: str) -> schemas.ContractApplySuggestionsResponse:
+    return schemas.ContractApplySuggestionsResponse(**json.loads(content or "{}"))
+
+
+def apply_suggestions(
+    request: schemas.ContractApplySuggestionsRequest,
+) -> schemas.ContractApplySuggestionsResponse:
+    """
+    Az eredeti szerződés szövegéből kiindulva építse be a kiválasztott javaslatokat,
+    és adjon vissza egy módosított szerződés-verziót + rövid változás-összefoglalót.
+    "diff" módban (alapértelmezett) csak az érintett pontokat íratjuk át, lásd lent;
+    ha valamelyik kivonathoz nincs biztos egyezés, a teljes újragenerálásra esünk vissza.
+    """
+    if request.mode == "diff":
+        edits = plan_clause_edits(request)
+        if edits is not None:
+            rewritten = _run_in_threads(
+                lambda edit: _rewrite_clause(request, edit), edits, APPLY_REWRITE_CONCURRENCY, "apply-rewrite"
+            )
+            return _splice_edits(request, edits, rewritten)
+
+    content = chat_completion(
+        "apply_suggestions",
+        "gpt-5.1",
+        _apply_suggestions_messages(request),
         temperature=0.25,
+        response_format={"type": "json_object"},
+        validate=_parse_apply_suggestions,
     )
+    return _parse_apply_suggestions(content)
 
-    content = response.choices[0].message.content or "{}"
-    data = json.loads(content)
 
-    return schemas.ContractApplySuggestionsResponse(**data)
+async def apply_suggestions_async(
+    request: schemas.ContractApplySuggestionsRequest,
+) -> schemas.ContractApplySuggestionsResponse:
+    if request.mode == "diff":
+        edits = plan_clause_edits(request)
+        if edits is not None:
+            rewritten = await _gather_bounded(
+                lambda edit: _rewrite_clause_async(request, edit), edits, APPLY_REWRITE_CONCURRENCY
+            )
+            return _splice_edits(request, edits, rewritten)
+
+    content = await chat_completion_async(
+        "apply_suggestions",
+        "gpt-5.1",
+        _apply_suggestions_messages(request),
+        temperature=0.25,
+        response_format={"type": "json_object"},
+        validate=_parse_apply_suggestions,
+    )
+    return _parse_apply_suggestions(content)
 
 
 # ---------------------------------------------------------
@@ -327,16 +821,7 @@ A válaszod SZIGORÚAN az alábbi JSON struktúrában add meg (ne írj semmi má
 MODEL_IMPROVE = "gpt-5.1"
 
 
-def ai_improve_contract(
-    req: schemas.ContractImproveRequest,
-) -> schemas.ContractImproveResponse:
-    """
-    Eredeti szerződés szövege alapján készít egy javított, kiegyensúlyozottabb verziót.
-    Nem írja át a szerződés lényegét, csak pontosít, kiegyensúlyoz és jogilag tisztábbá tesz.
-    A kimenetben CSAK a javított szerződés szövege szerepel.
-    """
-    client = get_client()
-
+def _improve_messages(req: schemas.ContractImproveRequest) -> Messages:
     system_prompt = (
         "Te egy magyar jogra fókuszáló AI asszisztens vagy. "
         "Feladatod, hogy a megadott szerződés szövegéből készíts egy javított, "
@@ -361,23 +846,46 @@ def ai_improve_contract(
         f"ERDETI SZERZŐDÉS SZÖVEGE:\n\n{req.contract_text}"
     )
 
-    resp = client.chat.completions.create(
-        model=MODEL_IMPROVE,
-        messages=[
-            {"role": "system", "content": system_prompt},
-            {"role": "system", "content": SYSTEM_PROMPT_CONTRACT},
-            {"role": "user", "content": user_prompt},
-        ],
-        temperature=0.3,
+    return [
+        {"role": "system", "content": system_prompt},
+        {"role": "system", "content": SYSTEM_PROMPT_CONTRACT},
+        {"role": "user", "content": user_prompt},
+    ]
+
+
+def ai_improve_contract(
+    req: schemas.ContractImproveRequest,
+) -> schemas.ContractImproveResponse:
+    """
+    Eredeti szerződés szövege alapján készít egy javított, kiegyensúlyozottabb verziót.
+    Nem írja át a szerződés lényegét, csak pontosít, kiegyensúlyoz és jogilag tisztábbá tesz.
+    A kimenetben CSAK a javított szerződés szövege szerepel.
+    """
+    improved_text = chat_completion("improve", MODEL_IMPROVE, _improve_messages(req), temperature=0.3)
+
+    return schemas.ContractImproveResponse(
+        improved_text=improved_text.strip(),
+        summary_hu=None,
     )
 
-    improved_text = resp.choices[0].message.content or ""
+
+async def ai_improve_contract_async(
+    req: schemas.ContractImproveRequest,
+) -> schemas.ContractImproveResponse:
+    improved_text = await chat_completion_async(
+        "improve", MODEL_IMPROVE, _improve_messages(req), temperature=0.3
+    )
 
     return schemas.ContractImproveResponse(
         improved_text=improved_text.strip(),
         summary_hu=None,
     )
 
+
+def ai_improve_contract_stream(req: schemas.ContractImproveRequest) -> AsyncIterator[str]:
+    """A javított szerződés szövege token-darabonként (SSE endpointhoz)."""
+    return stream_chat_completion(MODEL_IMPROVE, _improve_messages(req), temperature=0.3)
+
 # ---------------------------------------------------------
 #  KÖZÖS, ALACSONY SZINTŰ OPENAI HÍVÁS
 #  (template-alapú generáláshoz)
@@ -388,20 +896,98 @@ def call_openai(
     user_prompt: str,
     temperature: float = 0.2,
     max_tokens: int | None = None,
+    cache_endpoint: str = "call_openai",
+    validate: Validator | None = None,
 ):
-    client = get_client()
+    content = chat_completion(
+        cache_endpoint,
+        model,
+        [
+            {"role": "system", "content": system_prompt},
+            {"role": "user", "content": user_prompt},
+        ],
+        temperature=temperature,
+        max_tokens=max_tokens,
+        validate=validate,
+    )
 
-    response = client.chat.completions.create(
-        model=model,
-        messages=[
+    return {
+        "content": content
+    }
+
+
+async def call_openai_async(
+    model: str,
+    system_prompt: str,
+    user_prompt: str,
+    temperature: float = 0.2,
+    max_tokens: int | None = None,
+    cache_endpoint: str = "call_openai",
+    validate: Validator | None = None,
+):
+    content = await chat_completion_async(
+        cache_endpoint,
+        model,
+        [
             {"role": "system", "content": system_prompt},
             {"role": "user", "content": user_prompt},
         ],
         temperature=temperature,
-        max_tokens=max_tokens,   # ⬅️ EZ AZ ÚJ RÉSZ
+        max_tokens=max_tokens,
+        validate=validate,
     )
 
     return {
-        "content": response.choices[0].message.content or ""
+        "content": content
     }
 
+
+# ---------------------------------------------------------
+#  STREAMING (stream=True): tokenek érkezés szerint
+# ---------------------------------------------------------
+async def stream_chat_completion(
+    model: str,
+    messages: Messages,
+    temperature: float = 0.2,
+    max_tokens: int | None = None,
+) -> AsyncIterator[str]:
+    """
+    A modell válaszának szövegdarabjai, ahogy érkeznek.
+    Ha a fogyasztó idő előtt lezárja a generátort (pl. a kliens lekapcsolódott),
+    a HTTP streamet is bezárjuk, így az OpenAI oldalon is leáll a generálás.
+    """
+    stream = await get_async_openai_client().chat.completions.create(
+        model=model,
+        messages=messages,
+        temperature=temperature,
+        max_tokens=max_tokens,
+        stream=True,
+    )
+    try:
+        async for chunk in stream:
+            if not chunk.choices:
+                continue
+            delta = chunk.choices[0].delta.content
+            if delta:
+                yield delta
+    finally:
+        with anyio.CancelScope(shield=True):
+            await stream.close()
+
+
+def call_openai_stream(
+    model: str,
+    system_prompt: str,
+    user_prompt: str,
+    temperature: float = 0.2,
+    max_tokens: int | None = None,
+) -> AsyncIterator[str]:
+    return stream_chat_completion(
+        model,
+        [
+            {"role": "system", "content": system_prompt},
+            {"role": "user", "content": user_prompt},
+        ],
+        temperature=temperature,
+        max_tokens=max_tokens,
+    )
@@ -1,27 +1,18 @@
 import json
-import hashlib
 
 from app.services.openai_service import call_openai
 
 
-# egyszerű in-memory cache (később Redis / DB)
-_NORMALIZE_CACHE = {}
-
-
 def normalize_parties_cached(parties_text: str) -> dict:
     """
     Szabad szöveges felek leírását strukturált jogi adatokra bontja.
-    Cache-elve, hogy FAST maradjon.
+    Cache-elve, hogy FAST maradjon: a nyers választ a közös, méretkorlátos
+    response_cache tárolja ("party_normalizer" endpoint TTL-lel).
     """
 
     if not parties_text or not parties_text.strip():
         return {}
 
-    key = hashlib.sha256(parties_text.encode("utf-8")).hexdigest()
-
-    if key in _NORMALIZE_CACHE:
-        return _NORMALIZE_CACHE[key]
-
     prompt = f"""
 A következő szöveg szerződő feleket ír le magyar nyelven:
 
@@ -54,9 +45,9 @@ Ne adj magyarázatot.
         user_prompt=prompt,
         temperature=0.0,
         max_tokens=400,
+        cache_endpoint="party_normalizer",
+        # csonka / nem JSON válasz nem kerülhet a cache-be (7 napig azt kapná minden hívás)
+        validate=json.loads,
     )
 
-    data = json.loads(response["content"])
-    _NORMALIZE_CACHE[key] = data
-
-    return data
+    return json.loads(response["content"])
@@ -0,0 +1,165 @@
+import os
+import threading
+from dataclasses import dataclass
+from typing import Dict, Optional
+
+from dotenv import load_dotenv
+from reportlab.lib.enums import TA_CENTER
+from reportlab.lib.styles import ParagraphStyle, getSampleStyleSheet
+from reportlab.pdfbase import pdfmetrics
+from reportlab.pdfbase.ttfonts import TTFont
+
+load_dotenv()
+
+# ---------------------------------------------------------
+#  FONTKÉSZLET (env-ből konfigurálható)
+# ---------------------------------------------------------
+# DejaVuSans → Unicode-képes (ő / ű) font ReportLabhoz; a félkövér / dőlt
+# változat opcionális: ha a fájl nincs meg, az alap fontra esünk vissza.
+PDF_FONT_DIR = os.getenv("PDF_FONT_DIR", os.path.join(os.path.dirname(__file__), "fonts"))
+PDF_FONT_FAMILY = os.getenv("PDF_FONT_FAMILY", "DejaVuSans")
+PDF_FONT_FILES = {
+    "regular": os.getenv("PDF_FONT_REGULAR", "DejaVuSans.ttf"),
+    "bold": os.getenv("PDF_FONT_BOLD", "DejaVuSans-Bold.ttf"),
+    "italic": os.getenv("PDF_FONT_ITALIC", "DejaVuSans-Oblique.ttf"),
+    "bold_italic": os.getenv("PDF_FONT_BOLD_ITALIC", "DejaVuSans-BoldOblique.ttf"),
+}
+
+# listák behúzása mélységenként és a jel (•, "12.") helye előtte, pontban
+LIST_INDENT_PT = 18
+LIST_BULLET_WIDTH_PT = 14
+
+_FACE_SUFFIX = {"regular": "", "bold": "-Bold", "italic": "-Oblique", "bold_italic": "-BoldOblique"}
+
+
+@dataclass(frozen=True)
+class PdfFontSet:
+    """A regisztrált fontnevek változatonként (hiányzó változat → az alap font neve)."""
+
+    regular: str
+    bold: str
+    italic: str
+    bold_italic: str
+
+    def face(self, bold: bool, italic: bool) -> str:
+        """A <b> / <i> jelölésnek megfelelő fontnév (amit a Paragraph is választana)."""
+        if bold:
+            return self.bold_italic if italic else self.bold
+        return self.italic if italic else self.regular
+
+
+def register_font_set(
+    family: str = PDF_FONT_FAMILY,
+    font_dir: str = PDF_FONT_DIR,
+    files: Optional[Dict[str, str]] = None,
+) -> PdfFontSet:
+    """
+    TTF fájlok regisztrálása (a TTF feldolgozása drága, ezért csak egyszer),
+    plusz font-család, hogy a Paragraph <b> / <i> jelölése is működjön.
+    """
+    files = files or PDF_FONT_FILES
+
+    regular_path = os.path.join(font_dir, files["regular"])
+    if not os.path.exists(regular_path):
+        raise FileNotFoundError(f"PDF alap font nem található: {regular_path}")
+
+    registered = set(pdfmetrics.getRegisteredFontNames())
+    names: Dict[str, str] = {}
+    for face in ("regular", "bold", "italic", "bold_italic"):
+        name = family + _FACE_SUFFIX[face]
+        path = os.path.join(font_dir, files[face])
+        if name not in registered:
+            if not os.path.exists(path):
+                if face != "regular":
+                    print(f"PDF font hiányzik ({face}): {path} – az alap fontot használjuk.")
+                names[face] = names.get("regular", family)
+                continue
+            pdfmetrics.registerFont(TTFont(name, path))
+        names[face] = name
+
+    fonts = PdfFontSet(**names)
+    pdfmetrics.registerFontFamily(
+        family,
+        normal=fonts.regular,
+        bold=fonts.bold,
+        italic=fonts.italic,
+        boldItalic=fonts.bold_italic,
+    )
+    return fonts
+
+
+# ---------------------------------------------------------
+#  RENDERELÉSI KONTEXTUS (processzenként egyszer)
+# ---------------------------------------------------------
+
+class PdfRenderContext:
+    """
+    Fontok + bekezdésstílusok, amelyeket minden PDF export újrahasznál
+    (korábban minden exportnál újra beolvastuk a TTF-et és a stíluslapot).
+    """
+
+    def __init__(self, fonts: PdfFontSet) -> None:
+        self.fonts = fonts
+        base = getSampleStyleSheet()
+
+        self.body = ParagraphStyle(
+            "Body",
+            parent=base["Normal"],
+            fontName=fonts.regular,
+            fontSize=11,
+            leading=14,
+        )
+        self.title = ParagraphStyle(
+            "ContractTitle",
+            parent=base["Title"],
+            fontName=fonts.bold,
+            fontSize=16,
+            leading=20,
+            alignment=TA_CENTER,
+            spaceAfter=10,
+        )
+        self.heading = ParagraphStyle(
+            "ContractHeading",
+            parent=base["Heading2"],
+            fontName=fonts.bold,
+            fontSize=12,
+            leading=15,
+            spaceBefore=8,
+            spaceAfter=4,
+        )
+        self.note = ParagraphStyle(
+            "ContractNote",
+            parent=self.body,
+            fontName=fonts.italic,
+            fontSize=9,
+            leading=12,
+        )
+        # listaelem-stílusok mélységenként (lustán, de szintén csak egyszer)
+        self._list_styles: Dict[int, ParagraphStyle] = {}
+
+    def list_item(self, depth: int) -> ParagraphStyle:
+        """Behúzott bekezdés a lista jelével (bulletText) a behúzás előtt."""
+        style = self._list_styles.get(depth)
+        if style is None:
+            style = ParagraphStyle(
+                f"ContractList{depth}",
+                parent=self.body,
+                leftIndent=LIST_INDENT_PT * depth,
+                bulletIndent=LIST_INDENT_PT * depth - LIST_BULLET_WIDTH_PT,
+                bulletFontName=self.fonts.regular,
+            )
+            self._list_styles[depth] = style
+        return style
+
+
+_context: Optional[PdfRenderContext] = None
+_context_lock = threading.Lock()
+
+
+def get_pdf_context() -> PdfRenderContext:
+    global _context
+    if _context is None:
+        with _context_lock:
+            if _context is None:
+                _context = PdfRenderContext(register_font_set())
+    return _context
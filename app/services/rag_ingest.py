@@ -0,0 +1,293 @@
+import hashlib
+import os
+import random
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import asdict, dataclass, field
+from itertools import islice
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Set, Tuple, TypeVar
+
+import openai
+from dotenv import load_dotenv
+from sqlalchemy import insert, update
+from sqlalchemy.orm import Session
+
+from ..models import RAGChunk
+from .embedding_codec import embedding_columns
+
+load_dotenv()
+
+EMBEDDING_MODEL = "text-embedding-3-small"
+
+RAG_EMBED_BATCH_SIZE = int(os.getenv("RAG_EMBED_BATCH_SIZE", "64"))
+RAG_EMBED_CONCURRENCY = int(os.getenv("RAG_EMBED_CONCURRENCY", "4"))
+RAG_EMBED_MAX_RETRIES = int(os.getenv("RAG_EMBED_MAX_RETRIES", "5"))
+RAG_EMBED_BACKOFF_SEC = float(os.getenv("RAG_EMBED_BACKOFF_SEC", "1.0"))
+
+T = TypeVar("T")
+Chunk = Tuple[str, str]
+
+
+def batched(items: Iterable[T], size: int) -> Iterator[List[T]]:
+    """Lusta kötegelés: egyszerre csak egy köteg van a memóriában."""
+    iterator = iter(items)
+    while True:
+        batch = list(islice(iterator, size))
+        if not batch:
+            return
+        yield batch
+
+
+# ---------------------------------------------------------
+#  EMBEDDING HÍVÁS ÚJRAPRÓBÁLKOZÁSSAL
+# ---------------------------------------------------------
+
+def _is_retryable(exc: Exception) -> bool:
+    # 4xx hibáknál (kivéve 429) az újrapróbálás nem segít
+    if isinstance(exc, openai.APIStatusError):
+        return exc.status_code == 429 or exc.status_code >= 500
+    return True
+
+
+def embed_batch_with_retry(
+    client,
+    texts: List[str],
+    model: str = EMBEDDING_MODEL,
+    max_retries: int = RAG_EMBED_MAX_RETRIES,
+    backoff_sec: float = RAG_EMBED_BACKOFF_SEC,
+    sleep: Callable[[float], None] = time.sleep,
+) -> Tuple[List[List[float]], int]:
+    """
+    Egy köteg embeddingje exponenciális visszalépéssel (jitterrel).
+    Visszatér: (embeddingek, újrapróbálások száma).
+    """
+    attempt = 0
+    while True:
+        try:
+            response = client.embeddings.create(model=model, input=texts)
+            return [item.embedding for item in response.data], attempt
+        except Exception as exc:
+            if attempt >= max_retries or not _is_retryable(exc):
+                raise
+            delay = backoff_sec * (2 ** attempt) * (0.5 + random.random())
+            print(f"Embedding hiba ({exc}), újrapróbálás {delay:.1f} mp múlva...")
+            sleep(delay)
+            attempt += 1
+
+
+# ---------------------------------------------------------
+#  TARTALOM-HASH ALAPÚ DIFF
+# ---------------------------------------------------------
+
+def chunk_hash(source: str, content: str) -> str:
+    """A részlet azonosító hash-e: forrás + szöveg (bármelyik változása új embeddinget kér)."""
+    return hashlib.sha256(f"{source}\n{content}".encode("utf-8")).hexdigest()
+
+
+@dataclass
+class IngestStats:
+    added: int = 0
+    updated: int = 0
+    deleted: int = 0
+    unchanged: int = 0
+    batches: int = 0
+    embedding_calls: int = 0
+    retries: int = 0
+    elapsed_sec: float = 0.0
+
+    @property
+    def embeddings_saved(self) -> int:
+        # ennyi részletet NEM kellett újra embeddelni
+        return self.unchanged
+
+    def as_dict(self) -> Dict[str, object]:
+        return {**asdict(self), "embeddings_saved": self.embeddings_saved}
+
+
+@dataclass
+class _Existing:
+    """A tábla jelenlegi állapota: hash → id-k, forrás → id-k (még nem párosított sorok)."""
+
+    by_hash: Dict[str, List[int]] = field(default_factory=dict)
+    by_source: Dict[str, List[int]] = field(default_factory=dict)
+    claimed: Set[int] = field(default_factory=set)
+
+    def claim_hash(self, h: str) -> Optional[int]:
+        ids = self.by_hash.get(h)
+        while ids:
+            row_id = ids.pop()
+            if row_id not in self.claimed:
+                self.claimed.add(row_id)
+                return row_id
+        return None
+
+    def claim_source(self, source: str) -> Optional[int]:
+        ids = self.by_source.get(source)
+        while ids:
+            row_id = ids.pop()
+            if row_id not in self.claimed:
+                self.claimed.add(row_id)
+                return row_id
+        return None
+
+    def unclaimed(self) -> List[int]:
+        all_ids = {row_id for ids in self.by_source.values() for row_id in ids}
+        all_ids.update(row_id for ids in self.by_hash.values() for row_id in ids)
+        return sorted(all_ids - self.claimed)
+
+
+def _load_existing(db: Session) -> _Existing:
+    """
+    Csak id / source / content_hash oszlopokat olvasunk (embeddinget nem).
+    A hash nélküli (régi) soroknál egyszer kiszámoljuk és visszaírjuk.
+    """
+    existing = _Existing()
+    backfill = []
+
+    for row_id, source, h in db.query(RAGChunk.id, RAGChunk.source, RAGChunk.content_hash):
+        if h is None:
+            backfill.append(row_id)
+            continue
+        existing.by_hash.setdefault(h, []).append(row_id)
+        existing.by_source.setdefault(source, []).append(row_id)
+
+    for start in range(0, len(backfill), 1000):
+        ids = backfill[start:start + 1000]
+        rows = (
+            db.query(RAGChunk.id, RAGChunk.source, RAGChunk.content)
+            .filter(RAGChunk.id.in_(ids))
+            .all()
+        )
+        updates = [
+            {"id": row_id, "content_hash": chunk_hash(source, content)}
+            for row_id, source, content in rows
+        ]
+        if updates:
+            db.execute(update(RAGChunk), updates)
+        for item, (_, source, _content) in zip(updates, rows):
+            existing.by_hash.setdefault(item["content_hash"], []).append(item["id"])
+            existing.by_source.setdefault(source, []).append(item["id"])
+
+    if backfill:
+        db.commit()
+        print(f"{len(backfill)} régi sor content_hash-e pótolva.")
+
+    return existing
+
+
+# ---------------------------------------------------------
+#  PIPELINE
+# ---------------------------------------------------------
+
+# embeddelendő tétel: (source, content, hash, lecserélendő régi sor id-je vagy None)
+_Work = Tuple[str, str, str, Optional[int]]
+
+
+def _apply_batch(db: Session, batch: List[_Work], embeddings: List[List[float]]) -> None:
+    """
+    Egy kész köteg mentése egy tranzakcióban: multi-row INSERT, a módosult
+    részletek régi sorát pedig töröljük. (Módosításnál új id-t kap a sor,
+    így a vektorindex id-alapú inkrementális frissítése is észleli.)
+    """
+    rows = [
+        {"source": source, "content": content, "content_hash": h, **embedding_columns(emb)}
+        for (source, content, h, _old_id), emb in zip(batch, embeddings)
+    ]
+    db.execute(insert(RAGChunk).values(rows))
+
+    replaced = [old_id for _, _, _, old_id in batch if old_id is not None]
+    if replaced:
+        db.query(RAGChunk).filter(RAGChunk.id.in_(replaced)).delete(synchronize_session=False)
+
+    db.commit()
+
+
+def ingest_chunks(
+    db: Session,
+    chunks: Iterable[Chunk],
+    embed_client,
+    batch_size: int = RAG_EMBED_BATCH_SIZE,
+    concurrency: int = RAG_EMBED_CONCURRENCY,
+    model: str = EMBEDDING_MODEL,
+    max_retries: int = RAG_EMBED_MAX_RETRIES,
+    backoff_sec: float = RAG_EMBED_BACKOFF_SEC,
+) -> IngestStats:
+    """
+    Inkrementális, kötegelt, párhuzamos betöltés tartalom-hash alapján.
+
+    - a chunks iterátort lustán fogyasztjuk; csak az új vagy módosult
+      részletek kerülnek embeddelendő kötegekbe, a változatlanok maradnak,
+    - az embedding hívások legfeljebb `concurrency` szálon futnak,
+      a függőben lévő kötegek száma korlátos,
+    - minden kész köteg egyetlen multi-row INSERT-tel, saját tranzakcióban kerül be,
+    - a korpuszból eltűnt részleteket a végén töröljük.
+
+    Mivel a már mentett kötegek hash-e az adatbázisban van, egy megszakadt
+    futás újraindítva ott folytatja, ahol abbahagyta.
+
+    Az embed_client bármi lehet, aminek van `embeddings.create(model=, input=)`
+    metódusa (teszteléshez stub is).
+    """
+    started = time.perf_counter()
+    stats = IngestStats()
+    existing = _load_existing(db)
+
+    def work_items() -> Iterator[_Work]:
+        for source, content in chunks:
+            h = chunk_hash(source, content)
+            if existing.claim_hash(h) is not None:
+                stats.unchanged += 1
+                continue
+
+            old_id = existing.claim_source(source)
+            if old_id is None:
+                stats.added += 1
+            else:
+                stats.updated += 1
+            yield source, content, h, old_id
+
+    max_pending = max(1, concurrency) * 2
+    pending: Dict[Future, List[_Work]] = {}
+
+    def drain(block_until: int) -> None:
+        while len(pending) > block_until:
+            done, _ = wait(list(pending), return_when=FIRST_COMPLETED)
+            for future in done:
+                batch = pending.pop(future)
+                embeddings, retries = future.result()
+                stats.embedding_calls += retries + 1
+                stats.retries += retries
+
+                _apply_batch(db, batch, embeddings)
+                stats.batches += 1
+
+    with ThreadPoolExecutor(max_workers=max(1, concurrency), thread_name_prefix="rag-embed") as pool:
+        try:
+            for batch in batched(work_items(), batch_size):
+                future = pool.submit(
+                    embed_batch_with_retry,
+                    embed_client,
+                    [content for _, content, _, _ in batch],
+                    model,
+                    max_retries,
+                    backoff_sec,
+                )
+                pending[future] = batch
+                drain(block_until=max_pending - 1)
+
+            drain(block_until=0)
+        except BaseException:
+            for future in pending:
+                future.cancel()
+            raise
+
+    # ami nem párosult egyetlen korpuszbeli részlettel sem, az kikerült a korpuszból
+    removed = existing.unclaimed()
+    for start in range(0, len(removed), 1000):
+        ids = removed[start:start + 1000]
+        db.query(RAGChunk).filter(RAGChunk.id.in_(ids)).delete(synchronize_session=False)
+    db.commit()
+    stats.deleted = len(removed)
+
+    stats.elapsed_sec = round(time.perf_counter() - started, 3)
+    return stats
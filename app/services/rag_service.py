@@ -1,47 +1,101 @@
-from typing import List, Tuple
+from typing import Dict, List, Sequence, Tuple
 import numpy as np
 from sqlalchemy.orm import Session
 
-from ..models import RAGChunk
-from openai import OpenAI
 import os
 from dotenv import load_dotenv
 
+from .bm25_index import is_citation_query, lexical_index
+from .embedding_cache import query_embedding_cache
+from .openai_client import get_openai_client
+from .vector_index import vector_index
+
 load_dotenv()
-client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
 
+EMBEDDING_MODEL = "text-embedding-3-small"
+
+# "hybrid" (BM25 + vektor, RRF fúzió), "vector" vagy "lexical"
+RAG_SEARCH_MODE = os.getenv("RAG_SEARCH_MODE", "hybrid")
+SEARCH_MODES = ("hybrid", "vector", "lexical")
+# reciprocal rank fusion konstans és a fúzióhoz listánként kért jelöltek száma
+RRF_K = int(os.getenv("RAG_RRF_K", "60"))
+RAG_HYBRID_CANDIDATES = int(os.getenv("RAG_HYBRID_CANDIDATES", "50"))
 
-def embed_query(text: str) -> List[float]:
-    response = client.embeddings.create(
-        model="text-embedding-3-small",
+
+def _embed_uncached(text: str) -> List[float]:
+    response = get_openai_client().embeddings.create(
+        model=EMBEDDING_MODEL,
         input=[text],
     )
     return response.data[0].embedding
 
 
+def embed_query(text: str) -> np.ndarray:
+    """
+    Query embedding cache-ből (normalizált szöveg + modell kulcson);
+    csak cache-miss esetén hívjuk az OpenAI API-t.
+    """
+    return query_embedding_cache.get_or_compute(text, EMBEDDING_MODEL, _embed_uncached)
+
+
 def cosine_similarity(a: np.ndarray, b: np.ndarray) -> float:
     return float(np.dot(a, b) / (np.linalg.norm(a) * np.linalg.norm(b)))
 
 
-def search_legal_context(db: Session, query: str, top_k: int = 5) -> List[Tuple[str, str]]:
+def reciprocal_rank_fusion(rankings: Sequence[Sequence[int]], k: int = RRF_K) -> List[int]:
+    """RRF: score(d) = sum(1 / (k + rang)); a pontszámok skálája így nem számít."""
+    fused: Dict[int, float] = {}
+    for ranking in rankings:
+        for rank, chunk_id in enumerate(ranking, start=1):
+            fused[chunk_id] = fused.get(chunk_id, 0.0) + 1.0 / (k + rank)
+    return sorted(fused, key=fused.__getitem__, reverse=True)
+
+
+def _resolve_chunks(chunk_ids: Sequence[int]) -> List[Tuple[str, str]]:
+    return [chunk for chunk in vector_index.get_chunks(chunk_ids) if chunk is not None]
+
+
+def search_legal_context(
+    db: Session,
+    query: str,
+    top_k: int = 5,
+    mode: str = RAG_SEARCH_MODE,
+) -> List[Tuple[str, str]]:
     """
-    Egyszerű RAG keresés:
-    - lekéri az összes RAGChunk-ot
-    - kiszámolja a cosine hasonlóságot
+    RAG keresés a processz-szintű indexekben:
+    - pontos paragrafus-hivatkozásra (pl. "Ptk. 6:130 §") a BM25 index
+      hivatkozás-szótára válaszol, embedding hívás nélkül,
+    - "hybrid": BM25 és vektoros top-lista reciprocal rank fusion-nel,
+    - "vector": csak cosine (egyetlen mátrix-vektor szorzás),
+    - "lexical": csak BM25,
     - visszaadja a top_k (source, content) párokat
     """
-    query_emb = np.array(embed_query(query))
+    if mode not in SEARCH_MODES:
+        raise ValueError(f"Ismeretlen keresési mód: {mode}")
+
+    vector_index.maybe_refresh(db)
+
+    bm25 = None
+    if mode != "vector":
+        bm25 = lexical_index.maybe_refresh(db)
 
-    chunks = db.query(RAGChunk).all()
+    if bm25 is not None:
+        if is_citation_query(query):
+            cited = bm25.lookup_citations(query)
+            if cited:
+                return _resolve_chunks(cited[:top_k])
+        if mode == "lexical":
+            return _resolve_chunks([chunk_id for _, chunk_id in bm25.search(query, top_k)])
 
-    scored: List[Tuple[float, str, str]] = []
+    query_emb = embed_query(query)
 
-    for ch in chunks:
-        emb = np.array(ch.embedding, dtype=float)
-        score = cosine_similarity(query_emb, emb)
-        scored.append((score, ch.source, ch.content))
+    if bm25 is None:
+        top = vector_index.search(query_emb, top_k=top_k)
+        return [(s, c) for _, s, c in top]
 
-    scored.sort(key=lambda x: x[0], reverse=True)
-    top = scored[:top_k]
+    candidates = max(top_k, RAG_HYBRID_CANDIDATES)
+    vector_ranking = [chunk_id for _, chunk_id in vector_index.search_ids(query_emb, top_k=candidates)]
+    lexical_ranking = [chunk_id for _, chunk_id in bm25.search(query, candidates)]
+    fused = reciprocal_rank_fusion([vector_ranking, lexical_ranking])
 
-    return [(s, c) for _, s, c in top]
+    return _resolve_chunks(fused[:top_k])
@@ -0,0 +1,256 @@
+import hashlib
+import json
+import os
+import threading
+from contextvars import ContextVar
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from dotenv import load_dotenv
+
+from ..utils.lru_cache import LRUCache
+from ..utils.sqlite_cache import SQLiteCache
+
+load_dotenv()
+
+LLM_CACHE_MAX_ENTRIES = int(os.getenv("LLM_CACHE_MAX_ENTRIES", "2000"))
+LLM_CACHE_MAX_BYTES = int(os.getenv("LLM_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+# opcionális perzisztens tár (SQLite fájl), workerek és újraindítás között
+LLM_CACHE_DB = os.getenv("LLM_CACHE_DB") or None
+LLM_CACHE_DB_MAX_ENTRIES = int(os.getenv("LLM_CACHE_DB_MAX_ENTRIES", "50000"))
+# csak az ennél nem nagyobb temperature-ű (gyakorlatilag determinisztikus) hívásokat cache-eljük;
+# a generálás / javítás (0.25–0.3) így továbbra is minden gombnyomásra új változatot ad
+LLM_CACHE_MAX_TEMPERATURE = float(os.getenv("LLM_CACHE_MAX_TEMPERATURE", "0.2"))
+LLM_CACHE_DEFAULT_TTL_SEC = float(os.getenv("LLM_CACHE_DEFAULT_TTL_SEC", str(24 * 3600)))
+
+# endpointonkénti élettartam (LLM_CACHE_TTL_<ENDPOINT>_SEC felülírja)
+_DEFAULT_ENDPOINT_TTL_SEC = {
+    "party_normalizer": 7 * 24 * 3600,
+    "review": 24 * 3600,
+    "call_openai": 24 * 3600,
+}
+ENDPOINT_TTL_SEC = {
+    endpoint: float(os.getenv(f"LLM_CACHE_TTL_{endpoint.upper()}_SEC", str(ttl)))
+    for endpoint, ttl in _DEFAULT_ENDPOINT_TTL_SEC.items()
+}
+
+# ---------------------------------------------------------
+#  BYPASS FEJLÉC ("friss vázlatot kérek")
+# ---------------------------------------------------------
+
+CACHE_BYPASS_HEADER = "x-cache-bypass"
+
+# kérésenként a middleware állítja; a threadpoolba is átöröklődik
+cache_bypass: ContextVar[bool] = ContextVar("cache_bypass", default=False)
+
+
+def _wants_bypass(headers: Dict[str, str]) -> bool:
+    if headers.get(CACHE_BYPASS_HEADER, "").lower() in ("1", "true", "yes"):
+        return True
+    return "no-cache" in headers.get("cache-control", "").lower()
+
+
+class CacheBypassMiddleware:
+    """
+    ASGI middleware: "X-Cache-Bypass: 1" vagy "Cache-Control: no-cache"
+    fejléc esetén a kérés idejére kikapcsolja a válasz-cache olvasását
+    (a friss választ viszont elmentjük).
+    """
+
+    def __init__(self, app) -> None:
+        self.app = app
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        headers = {k.decode("latin-1").lower(): v.decode("latin-1") for k, v in scope.get("headers", [])}
+        token = cache_bypass.set(_wants_bypass(headers))
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            cache_bypass.reset(token)
+
+
+# ---------------------------------------------------------
+#  TARTALOM-CÍMZETT VÁLASZ-CACHE
+# ---------------------------------------------------------
+
+def response_cache_key(
+    model: str,
+    messages: Any,
+    temperature: Optional[float],
+    max_tokens: Optional[int],
+    **extra: Any,
+) -> str:
+    """sha256(model, messages, temperature, max_tokens, egyéb paraméterek) – kanonikus JSON-ból."""
+    payload = json.dumps(
+        {
+            "model": model,
+            "messages": messages,
+            "temperature": temperature,
+            "max_tokens": max_tokens,
+            **extra,
+        },
+        sort_keys=True,
+        ensure_ascii=False,
+        separators=(",", ":"),
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+Validator = Callable[[str], Any]
+
+
+def _is_valid(value: str, validate: Optional[Validator]) -> bool:
+    if validate is None:
+        return True
+    try:
+        validate(value)
+    except Exception:
+        return False
+    return True
+
+
+class ResponseCache:
+    """
+    Két szintű cache a determinisztikus LLM válaszokhoz:
+    1. processzen belüli LRU (darab- és bájtkorláttal, TTL-lel),
+    2. opcionális SQLite tár (LLM_CACHE_DB).
+    Kulcs: model + messages + temperature + max_tokens (lásd response_cache_key).
+    """
+
+    def __init__(
+        self,
+        max_entries: int = LLM_CACHE_MAX_ENTRIES,
+        max_bytes: int = LLM_CACHE_MAX_BYTES,
+        db_path: Optional[str] = LLM_CACHE_DB,
+        max_temperature: float = LLM_CACHE_MAX_TEMPERATURE,
+    ) -> None:
+        self.max_temperature = max_temperature
+        self._memory: LRUCache[str] = LRUCache(
+            max_entries=max_entries,
+            ttl_sec=LLM_CACHE_DEFAULT_TTL_SEC,
+            max_bytes=max_bytes,
+            sizeof=lambda text: len(text.encode("utf-8")),
+        )
+        self._store = (
+            SQLiteCache(db_path, table="llm_responses", max_entries=LLM_CACHE_DB_MAX_ENTRIES)
+            if db_path
+            else None
+        )
+        self._lock = threading.Lock()
+        self.persistent_hits = 0
+        self.bypassed = 0
+        self.api_calls: Dict[str, int] = {}
+
+    def cacheable(self, temperature: Optional[float]) -> bool:
+        return temperature is None or temperature <= self.max_temperature
+
+    def ttl_for(self, endpoint: str) -> float:
+        return ENDPOINT_TTL_SEC.get(endpoint, LLM_CACHE_DEFAULT_TTL_SEC)
+
+    def get(self, key: str) -> Optional[str]:
+        if cache_bypass.get():
+            with self._lock:
+                self.bypassed += 1
+            return None
+
+        cached = self._memory.get(key)
+        if cached is not None:
+            return cached
+
+        if self._store is not None:
+            blob = self._store.get(key)
+            if blob is not None:
+                text = blob.decode("utf-8")
+                self._memory.set(key, text)
+                with self._lock:
+                    self.persistent_hits += 1
+                return text
+
+        return None
+
+    def set(self, key: str, value: str, endpoint: str) -> None:
+        ttl = self.ttl_for(endpoint)
+        self._memory.set(key, value, ttl_sec=ttl)
+        if self._store is not None:
+            self._store.set(key, value.encode("utf-8"), ttl_sec=ttl)
+
+    def invalidate(self, key: str) -> None:
+        self._memory.pop(key)
+        if self._store is not None:
+            self._store.delete(key)
+
+    def _count_call(self, endpoint: str) -> None:
+        with self._lock:
+            self.api_calls[endpoint] = self.api_calls.get(endpoint, 0) + 1
+
+    def _cached_valid(self, key: str, validate: Optional[Validator]) -> Optional[str]:
+        cached = self.get(key)
+        if cached is not None and not _is_valid(cached, validate):
+            # korábban (ellenőrzés nélkül) rögzített hibás válasz: eldobjuk, újrahívunk
+            self.invalidate(key)
+            return None
+        return cached
+
+    def _store_valid(self, key: str, value: str, endpoint: str, validate: Optional[Validator]) -> None:
+        # üres vagy a hívó által fel nem dolgozható (csonka, nem JSON) választ nem rögzítünk,
+        # különben a TTL végéig minden azonos kérés ugyanúgy hibázna
+        if value and _is_valid(value, validate):
+            self.set(key, value, endpoint)
+
+    def get_or_call(
+        self,
+        endpoint: str,
+        key: str,
+        call: Callable[[], str],
+        validate: Optional[Validator] = None,
+    ) -> str:
+        """
+        validate: a hívó feldolgozása (pl. json.loads + séma); csak akkor
+        cache-eljük a választ, ha ez kivétel nélkül lefut.
+        """
+        cached = self._cached_valid(key, validate)
+        if cached is not None:
+            return cached
+
+        value = call()
+        self._count_call(endpoint)
+        self._store_valid(key, value, endpoint, validate)
+        return value
+
+    async def aget_or_call(
+        self,
+        endpoint: str,
+        key: str,
+        call: Callable[[], Awaitable[str]],
+        validate: Optional[Validator] = None,
+    ) -> str:
+        cached = self._cached_valid(key, validate)
+        if cached is not None:
+            return cached
+
+        value = await call()
+        self._count_call(endpoint)
+        self._store_valid(key, value, endpoint, validate)
+        return value
+
+    def clear(self) -> None:
+        self._memory.clear()
+
+    def stats(self) -> Dict[str, object]:
+        memory = self._memory.stats()
+        return {
+            "memory": memory,
+            "persistent_enabled": self._store is not None,
+            "persistent_hits": self.persistent_hits,
+            "bypassed": self.bypassed,
+            "api_calls": dict(self.api_calls),
+            "api_calls_saved": memory["hits"] + self.persistent_hits,
+            "max_temperature": self.max_temperature,
+            "ttl_sec": dict(ENDPOINT_TTL_SEC),
+        }
+
+
+response_cache = ResponseCache()
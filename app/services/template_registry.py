@@ -0,0 +1,241 @@
+import os
+import re
+import threading
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from dotenv import load_dotenv
+from jinja2 import Environment, TemplateSyntaxError, meta
+
+from ..utils.template_loader import BASE_TEMPLATE_PATH, PLACEHOLDER_PATTERN, CompiledTemplate
+
+load_dotenv()
+
+# ilyen gyakran nézzük meg a sablonkönyvtárat (mtime); 0 → nincs hot-reload
+TEMPLATE_RELOAD_INTERVAL_SEC = float(os.getenv("TEMPLATE_RELOAD_INTERVAL_SEC", "2"))
+
+# a generáláshoz használt sablonok neve: <contract_type>_<mode>.html
+GENERATION_MODES = ("fast", "detailed")
+_GENERATION_NAME = re.compile(rf"^(?P<type>[a-z0-9_]+)_(?P<mode>{'|'.join(GENERATION_MODES)})$")
+
+# minden "{{...}}" előfordulás; ami nem illik a PLACEHOLDER_PATTERN-re, az elírt placeholder
+_ANY_BRACES = re.compile(r"\{\{(.*?)\}\}", re.S)
+
+# csak a Jinja szintaxis ellenőrzéséhez (export sablonok, pl. raw.html)
+_jinja = Environment()
+
+
+@dataclass
+class TemplateEntry:
+    """Egy betöltött és ellenőrzött sablonfájl."""
+
+    name: str                         # fájlnév kiterjesztés nélkül, pl. "megbizasi_fast"
+    contract_type: str
+    mode: Optional[str]               # "fast" | "detailed"; None → export (Jinja) sablon
+    path: Path
+    mtime_ns: int
+    source: str
+    placeholders: List[str]
+    compiled: Optional[CompiledTemplate] = None
+    errors: List[str] = field(default_factory=list)
+    warnings: List[str] = field(default_factory=list)
+
+    @property
+    def valid(self) -> bool:
+        return not self.errors
+
+    def describe(self) -> Dict[str, object]:
+        return {
+            "name": self.name,
+            "contract_type": self.contract_type,
+            "mode": self.mode,
+            "placeholders": self.placeholders,
+            "valid": self.valid,
+            "errors": self.errors,
+            "warnings": self.warnings,
+            "size": len(self.source),
+        }
+
+
+def _load_entry(path: Path, mtime_ns: int) -> TemplateEntry:
+    source = path.read_text(encoding="utf-8")
+    match = _GENERATION_NAME.match(path.stem)
+
+    if match is None:
+        # export sablon: Jinja szintaxis + változók
+        entry = TemplateEntry(path.stem, path.stem, None, path, mtime_ns, source, [])
+        try:
+            entry.placeholders = sorted(meta.find_undeclared_variables(_jinja.parse(source)))
+        except TemplateSyntaxError as e:
+            entry.errors.append(f"Jinja szintaxis hiba ({e.lineno}. sor): {e.message}")
+    else:
+        compiled = CompiledTemplate(source)
+        entry = TemplateEntry(
+            path.stem, match.group("type"), match.group("mode"), path, mtime_ns, source,
+            sorted(compiled.placeholders), compiled,
+        )
+        malformed = sorted({m.group(0) for m in _ANY_BRACES.finditer(source)
+                            if not PLACEHOLDER_PATTERN.fullmatch(m.group(0))})
+        if malformed:
+            entry.errors.append(f"Hibás placeholder(ek): {', '.join(malformed)}")
+        if entry.mode == "fast" and source.strip() and not compiled.placeholders:
+            entry.warnings.append("A gyors sablonban nincs egyetlen {{PLACEHOLDER}} sem.")
+
+    if not source.strip():
+        entry.errors.append("Üres sablonfájl.")
+    return entry
+
+
+def _cross_check(entries: Dict[str, TemplateEntry]) -> None:
+    """Ugyanazon szerződéstípus fast / detailed párjának összevetése (figyelmeztetések)."""
+    for entry in entries.values():
+        if entry.mode is None:
+            continue
+        entry.warnings = [w for w in entry.warnings if not w.startswith("Pár:")]
+        other_mode = "detailed" if entry.mode == "fast" else "fast"
+        other = entries.get(f"{entry.contract_type}_{other_mode}")
+        if other is None:
+            entry.warnings.append(f"Pár: hiányzik a {other_mode} sablon.")
+        elif entry.mode == "fast" and other.valid:
+            missing = sorted(set(entry.placeholders) - set(other.placeholders))
+            if missing:
+                entry.warnings.append(f"Pár: a detailed sablonból hiányzó placeholder(ek): {', '.join(missing)}")
+
+
+class TemplateRegistry:
+    """
+    Az app/templates/contracts sablonjainak memóriában tartott katalógusa:
+    - induláskor mindet betölti, előfordítja és ellenőrzi (üres fájl, elírt
+      placeholder, Jinja szintaxis), így a hibás sablon nem kérésidőben derül ki,
+    - háttérszálon mtime alapján figyeli a könyvtárat, és a változott fájlokat
+      újratölti; a kérések közben a régi állapotot látják (a katalógust egy
+      lépésben cseréljük, olvasáshoz nem kell zár).
+    """
+
+    def __init__(self, directory: Path = BASE_TEMPLATE_PATH, interval_sec: float = TEMPLATE_RELOAD_INTERVAL_SEC) -> None:
+        self.directory = directory
+        self.interval_sec = interval_sec
+        self._entries: Dict[str, TemplateEntry] = {}
+        self._loaded = False
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._watcher: Optional[threading.Thread] = None
+        self.reloads = 0
+
+    # -----------------------------------------------------
+    #  BETÖLTÉS / ÚJRATÖLTÉS
+    # -----------------------------------------------------
+    def _scan(self) -> Dict[str, Tuple[Path, int]]:
+        return {
+            path.stem: (path, path.stat().st_mtime_ns)
+            for path in sorted(self.directory.glob("*.html"))
+            if path.is_file()
+        }
+
+    def refresh(self) -> List[str]:
+        """
+        Új / módosult / törölt fájlok átvezetése. A változott sablonok
+        nevét adja vissza (üres lista, ha nem volt változás).
+        """
+        with self._lock:
+            current = self._entries
+            files = self._scan()
+
+            changed = [
+                name for name, (_path, mtime_ns) in files.items()
+                if name not in current or current[name].mtime_ns != mtime_ns
+            ]
+            removed = [name for name in current if name not in files]
+            if not changed and not removed and self._loaded:
+                return []
+
+            entries = {name: entry for name, entry in current.items() if name in files}
+            for name in changed:
+                path, mtime_ns = files[name]
+                entries[name] = _load_entry(path, mtime_ns)
+            _cross_check(entries)
+
+            self._entries = entries
+            if self._loaded:
+                self.reloads += 1
+            self._loaded = True
+
+        for name in changed + removed:
+            entry = entries.get(name)
+            if entry is None:
+                print(f"Sablon eltávolítva: {name}")
+            elif entry.errors:
+                print(f"⚠️ Hibás sablon: {name}: {'; '.join(entry.errors)}")
+            else:
+                print(f"Sablon betöltve: {name} ({len(entry.placeholders)} placeholder)")
+        return changed + removed
+
+    def load_all(self) -> None:
+        self.refresh()
+
+    def _ensure_loaded(self) -> None:
+        # indítás (lifespan) nélküli használat, pl. szkriptek / benchmark
+        if not self._loaded:
+            self.refresh()
+
+    # -----------------------------------------------------
+    #  LEKÉRDEZÉS
+    # -----------------------------------------------------
+    def get(self, contract_type: str, mode: str) -> TemplateEntry:
+        self._ensure_loaded()
+        name = f"{contract_type}_{mode}"
+        entry = self._entries.get(name)
+        if entry is None:
+            raise FileNotFoundError(f"Template nem található: {name}.html")
+        if not entry.valid:
+            raise ValueError(f"A(z) {name}.html sablon hibás: {'; '.join(entry.errors)}")
+        return entry
+
+    def catalogue(self) -> Dict[str, object]:
+        self._ensure_loaded()
+        entries = self._entries
+        types: Dict[str, Dict[str, object]] = {}
+        for entry in entries.values():
+            if entry.mode is None:
+                continue
+            info = types.setdefault(entry.contract_type, {"contract_type": entry.contract_type, "modes": {}})
+            info["modes"][entry.mode] = entry.describe()
+
+        return {
+            "contract_types": [
+                {**info, "available_modes": sorted(m for m, d in info["modes"].items() if d["valid"])}
+                for _, info in sorted(types.items())
+            ],
+            "export_templates": [e.describe() for e in entries.values() if e.mode is None],
+            "invalid": sorted(e.name for e in entries.values() if not e.valid),
+            "reloads": self.reloads,
+            "hot_reload_interval_sec": self.interval_sec if self._watcher is not None else None,
+        }
+
+    # -----------------------------------------------------
+    #  HOT-RELOAD (mtime polling háttérszálon)
+    # -----------------------------------------------------
+    def start_watcher(self) -> None:
+        if self.interval_sec <= 0 or self._watcher is not None:
+            return
+        self._stop.clear()
+        self._watcher = threading.Thread(target=self._watch, name="template-watcher", daemon=True)
+        self._watcher.start()
+
+    def stop_watcher(self) -> None:
+        watcher, self._watcher = self._watcher, None
+        if watcher is not None:
+            self._stop.set()
+            watcher.join(timeout=self.interval_sec + 1)
+
+    def _watch(self) -> None:
+        while not self._stop.wait(self.interval_sec):
+            try:
+                self.refresh()
+            except Exception as e:
+                # pl. épp íródó / törölt fájl: a következő körben újrapróbáljuk
+                print("Sablonok újratöltése sikertelen:", e)
+
+
+template_registry = TemplateRegistry()
@@ -0,0 +1,430 @@
+import os
+import threading
+import time
+from typing import Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+import numpy as np
+from dotenv import load_dotenv
+from sqlalchemy.orm import Session
+
+from ..models import RAGChunk
+from .vector_math import normalize_rows, top_k_indices
+from .ivf_index import RAG_ANN_BACKEND, RAG_IVF_NPROBE, IVFIndex, ann_enabled
+from .embedding_codec import chunk_embedding
+from .embedding_snapshot import (
+    RAG_SNAPSHOT_DIR,
+    EmbeddingSnapshot,
+    read_current_version,
+)
+
+load_dotenv()
+
+# ennyi másodpercenként nézzük meg, változott-e a rag_chunks tábla
+RAG_INDEX_REFRESH_SEC = float(os.getenv("RAG_INDEX_REFRESH_SEC", "30"))
+# snapshot módban ilyen gyakran nézzük a CURRENT mutatót (egy kis fájl olvasása)
+RAG_SNAPSHOT_CHECK_SEC = float(os.getenv("RAG_SNAPSHOT_CHECK_SEC", "2"))
+
+# ekkora csomagokban töltjük be az új sorokat (IN (...) lista mérete)
+_LOAD_BATCH = 1000
+
+
+class _IndexState(NamedTuple):
+    ids: np.ndarray            # int64, a RAGChunk.id-k
+    matrix: np.ndarray         # float32 (n, dim), soronként normálva (snapshotnál np.memmap)
+    sources: Sequence[str]
+    contents: Sequence[str]
+
+
+_EMPTY_STATE = _IndexState(
+    ids=np.empty(0, dtype=np.int64),
+    matrix=np.empty((0, 0), dtype=np.float32),
+    sources=[],
+    contents=[],
+)
+
+
+# ---------------------------------------------------------
+#  PROCESSZ-SZINTŰ VEKTORINDEX
+# ---------------------------------------------------------
+
+class VectorIndex:
+    """
+    A RAGChunk embeddingek memóriában tartott, előre normált float32 mátrixa.
+
+    - load(): teljes betöltés (induláskor),
+    - refresh(): inkrementális frissítés (csak az új sorokat tölti be,
+      a törölteket kidobja),
+    - search(): top-k egyetlen mátrix-vektor szorzással.
+
+    Ha a RAG_SNAPSHOT_DIR be van állítva és van benne snapshot, az adatbázis
+    helyett a snapshotot mmap-eljük: minden worker ugyanazt a page cache-t
+    használja, és a CURRENT mutató cseréjét észlelve atomian vált az új verzióra.
+
+    Nagy korpusznál (lásd ivf_index.ann_enabled) az állapotváltozás után
+    háttérszálon IVF index épül; amíg el nem készül, pontos keresés fut.
+
+    Az állapotot egyben cseréljük (_IndexState), így a keresésekhez
+    nem kell lock: mindig egy konzisztens pillanatképet látnak.
+    """
+
+    def __init__(
+        self,
+        snapshot_dir: Optional[str] = RAG_SNAPSHOT_DIR,
+        ann_backend: str = RAG_ANN_BACKEND,
+    ) -> None:
+        self._state: _IndexState = _EMPTY_STATE
+        self._lock = threading.Lock()
+        self._loaded = False
+        self._last_refresh = 0.0
+        self._last_snapshot_check = 0.0
+        self._snapshot_dir = snapshot_dir
+        self._snapshot_version: Optional[str] = None
+        self._ann_backend = ann_backend
+        # (állapot, IVF) pár: csak akkor használjuk, ha az állapot még az aktuális
+        self._ann: Optional[Tuple[_IndexState, IVFIndex]] = None
+        self._ann_building = False
+        # (állapot, id → sorindex) – get_chunks lustán tölti
+        self._row_of: Optional[Tuple[_IndexState, Dict[int, int]]] = None
+
+    def __len__(self) -> int:
+        return int(self._state.ids.shape[0])
+
+    @property
+    def loaded(self) -> bool:
+        return self._loaded
+
+    @property
+    def snapshot_version(self) -> Optional[str]:
+        return self._snapshot_version
+
+    # -----------------------------------------------------
+    #  BETÖLTÉS / FRISSÍTÉS
+    # -----------------------------------------------------
+    def load(self, db: Session) -> None:
+        """Teljes újratöltés (snapshotból, ha van; különben az adatbázisból)."""
+        with self._lock:
+            if self._load_snapshot_locked():
+                return
+            self._state = _EMPTY_STATE
+            self._snapshot_version = None
+            self._refresh_locked(db)
+            self._loaded = True
+
+    def refresh(self, db: Session) -> Tuple[int, int]:
+        """
+        Inkrementális frissítés: csak az id-listát kérdezzük le,
+        embeddinget csak az új sorokhoz töltünk.
+        Visszatér: (hozzáadott, törölt) sorok száma.
+        """
+        with self._lock:
+            if self._snapshot_version is not None:
+                before_version, before = self._snapshot_version, len(self)
+                self._load_snapshot_locked()
+                if self._snapshot_version == before_version:
+                    return 0, 0
+                return len(self), before
+
+            before = len(self)
+            if self._load_snapshot_locked():
+                return len(self), before
+
+            result = self._refresh_locked(db)
+            self._loaded = True
+            return result
+
+    def maybe_refresh(self, db: Session) -> None:
+        """
+        Keresés előtti olcsó ellenőrzés: első hívásra betölt,
+        utána legfeljebb RAG_INDEX_REFRESH_SEC-enként frissít.
+        """
+        if not self._loaded:
+            self.load(db)
+            return
+
+        elapsed = time.monotonic() - self._last_refresh
+
+        if self._snapshot_version is not None:
+            if elapsed >= RAG_SNAPSHOT_CHECK_SEC:
+                self._last_refresh = time.monotonic()
+                if read_current_version(self._snapshot_dir) != self._snapshot_version:
+                    with self._lock:
+                        self._load_snapshot_locked()
+            return
+
+        # induláskor még nem volt snapshot: ha közben megjelenik, átállunk rá
+        # (különben minden worker a saját heap-másolatát tartaná meg)
+        if self._snapshot_dir and time.monotonic() - self._last_snapshot_check >= RAG_SNAPSHOT_CHECK_SEC:
+            self._last_snapshot_check = time.monotonic()
+            if read_current_version(self._snapshot_dir) is not None:
+                with self._lock:
+                    if self._load_snapshot_locked():
+                        return
+
+        if elapsed >= RAG_INDEX_REFRESH_SEC:
+            self.refresh(db)
+
+    def _load_snapshot_locked(self) -> bool:
+        """
+        Az aktuális snapshot mmap-elése. Az új verziót teljesen megnyitjuk
+        (és ellenőrizzük), csak utána cseréljük az állapotot; hiba esetén a
+        régi verzió marad érvényben.
+        """
+        if not self._snapshot_dir:
+            return False
+
+        version = read_current_version(self._snapshot_dir)
+        if version is None:
+            return False
+        if version == self._snapshot_version:
+            return True
+
+        try:
+            snapshot = EmbeddingSnapshot.open(self._snapshot_dir, version)
+        except Exception as e:
+            print(f"RAG snapshot ({version}) megnyitása sikertelen:", e)
+            return self._snapshot_version is not None
+
+        self._state = _IndexState(
+            ids=snapshot.ids,
+            matrix=snapshot.vectors,
+            sources=snapshot.sources,
+            contents=snapshot.contents,
+        )
+        self._snapshot_version = version
+        self._loaded = True
+        self._last_refresh = time.monotonic()
+        self._schedule_ann_build_locked()
+        return True
+
+    def _refresh_locked(self, db: Session) -> Tuple[int, int]:
+        state = self._state
+        self._last_refresh = time.monotonic()
+
+        current_ids = np.fromiter(
+            (row[0] for row in db.query(RAGChunk.id).all()),
+            dtype=np.int64,
+        )
+
+        keep_mask = np.isin(state.ids, current_ids)
+        new_ids = np.setdiff1d(current_ids, state.ids)
+        removed = int((~keep_mask).sum())
+
+        if removed == 0 and new_ids.size == 0:
+            return 0, 0
+
+        new_rows: List[RAGChunk] = []
+        for start in range(0, new_ids.size, _LOAD_BATCH):
+            batch = new_ids[start:start + _LOAD_BATCH].tolist()
+            new_rows.extend(
+                db.query(RAGChunk)
+                .filter(RAGChunk.id.in_(batch))
+                .order_by(RAGChunk.id)
+                .all()
+            )
+
+        self._state = self._merge(state, keep_mask, new_rows)
+        self._schedule_ann_build_locked()
+        return len(new_rows), removed
+
+    @staticmethod
+    def _merge(
+        state: _IndexState,
+        keep_mask: np.ndarray,
+        new_rows: Sequence[RAGChunk],
+    ) -> _IndexState:
+        kept = np.flatnonzero(keep_mask)
+        ids = state.ids[kept]
+        sources = [state.sources[i] for i in kept]
+        contents = [state.contents[i] for i in kept]
+        matrix = state.matrix[kept] if kept.size else None
+
+        if new_rows:
+            new_matrix = normalize_rows(np.stack([chunk_embedding(r) for r in new_rows]))
+            matrix = new_matrix if matrix is None else np.vstack([matrix, new_matrix])
+            ids = np.concatenate([ids, np.array([r.id for r in new_rows], dtype=np.int64)])
+            sources.extend(r.source for r in new_rows)
+            contents.extend(r.content for r in new_rows)
+
+        if matrix is None:
+            return _EMPTY_STATE
+
+        return _IndexState(
+            ids=ids,
+            matrix=np.ascontiguousarray(matrix, dtype=np.float32),
+            sources=sources,
+            contents=contents,
+        )
+
+    def set_vectors(
+        self,
+        ids: Sequence[int],
+        vectors: np.ndarray,
+        sources: Sequence[str],
+        contents: Sequence[str],
+    ) -> None:
+        """Közvetlen feltöltés adatbázis nélkül (benchmark, offline build)."""
+        with self._lock:
+            self._state = _IndexState(
+                ids=np.asarray(ids, dtype=np.int64),
+                matrix=normalize_rows(vectors),
+                sources=list(sources),
+                contents=list(contents),
+            )
+            self._snapshot_version = None
+            self._loaded = True
+            self._last_refresh = time.monotonic()
+            self._schedule_ann_build_locked()
+
+    # -----------------------------------------------------
+    #  ANN (IVF) ÉPÍTÉS
+    # -----------------------------------------------------
+    def _schedule_ann_build_locked(self) -> None:
+        if not ann_enabled(len(self._state.ids), self._ann_backend):
+            self._ann = None
+            return
+        if self._ann_building:
+            # a futó építés a végén ellenőrzi, hogy közben változott-e az állapot
+            return
+
+        self._ann_building = True
+        threading.Thread(
+            target=self._build_ann_loop,
+            name="rag-ivf-build",
+            daemon=True,
+        ).start()
+
+    def _build_ann_loop(self) -> None:
+        while True:
+            state = self._state
+            ivf = None
+            try:
+                if ann_enabled(len(state.ids), self._ann_backend):
+                    ivf = IVFIndex.build(state.matrix)
+            except Exception as e:
+                print("IVF index építése sikertelen, pontos keresés marad:", e)
+
+            with self._lock:
+                self._ann = (state, ivf) if ivf is not None else None
+                if self._state is state:
+                    self._ann_building = False
+                    return
+
+    def build_ann(self, nlist: Optional[int] = None) -> Optional[IVFIndex]:
+        """IVF index szinkron építése az aktuális állapotra (offline build, benchmark)."""
+        state = self._state
+        if state.ids.size == 0:
+            return None
+        ivf = IVFIndex.build(state.matrix, nlist=nlist)
+        with self._lock:
+            if self._state is state:
+                self._ann = (state, ivf)
+        return ivf
+
+    @property
+    def ann_ready(self) -> bool:
+        ann = self._ann
+        return ann is not None and ann[0] is self._state
+
+    # -----------------------------------------------------
+    #  KERESÉS
+    # -----------------------------------------------------
+    def _search_rows(
+        self,
+        state: _IndexState,
+        query_emb: Sequence[float] | np.ndarray,
+        top_k: int,
+        exact: bool,
+        nprobe: int,
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        empty = (np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32))
+        if state.ids.size == 0:
+            return empty
+
+        query = np.asarray(query_emb, dtype=np.float32)
+        norm = float(np.linalg.norm(query))
+        if norm == 0.0:
+            return empty
+
+        query = query / norm
+        ann = self._ann
+
+        if not exact and ann is not None and ann[0] is state:
+            return ann[1].search(state.matrix, query, top_k, nprobe=nprobe)
+
+        scores = state.matrix @ query
+        idx = top_k_indices(scores, top_k)
+        return idx, scores[idx]
+
+    def search(
+        self,
+        query_emb: Sequence[float] | np.ndarray,
+        top_k: int = 5,
+        exact: bool = False,
+        nprobe: int = RAG_IVF_NPROBE,
+    ) -> List[Tuple[float, str, str]]:
+        """
+        Cosine top-k: a sorok normáltak, így a skaláris szorzat maga a cosine.
+        Ha van kész IVF index az aktuális állapothoz (és exact=False), azzal keresünk.
+        Visszatér: [(pontszám, source, content), ...] csökkenő sorrendben.
+        """
+        state = self._state
+        idx, top_scores = self._search_rows(state, query_emb, top_k, exact, nprobe)
+
+        return [
+            (float(score), state.sources[i], state.contents[i])
+            for i, score in zip(idx, top_scores)
+        ]
+
+    def search_ids(
+        self,
+        query_emb: Sequence[float] | np.ndarray,
+        top_k: int = 5,
+        exact: bool = False,
+        nprobe: int = RAG_IVF_NPROBE,
+    ) -> List[Tuple[float, int]]:
+        """Mint a search(), de (pontszám, RAGChunk.id) párokat ad (pl. hibrid fúzióhoz)."""
+        state = self._state
+        idx, top_scores = self._search_rows(state, query_emb, top_k, exact, nprobe)
+        return [(float(score), int(state.ids[i])) for i, score in zip(idx, top_scores)]
+
+    def get_chunks(self, chunk_ids: Sequence[int]) -> List[Optional[Tuple[str, str]]]:
+        """
+        (source, content) a megadott RAGChunk id-khez; None, ha az id nincs
+        (még / már) az indexben. Az id → sor leképezést állapotonként egyszer építjük.
+        """
+        state = self._state
+        row_of = self._row_of
+        if row_of is None or row_of[0] is not state:
+            row_of = (state, {int(chunk_id): row for row, chunk_id in enumerate(state.ids)})
+            self._row_of = row_of
+
+        result: List[Optional[Tuple[str, str]]] = []
+        for chunk_id in chunk_ids:
+            row = row_of[1].get(int(chunk_id))
+            result.append(None if row is None else (state.sources[row], state.contents[row]))
+        return result
+
+
+# processz-szintű példány (minden uvicorn worker saját indexet tart)
+vector_index = VectorIndex()
+
+
+def get_vector_index() -> VectorIndex:
+    return vector_index
+
+
+def reload_vector_index(db: Optional[Session] = None) -> Tuple[int, int]:
+    """
+    Inkrementális frissítés kívülről (pl. rag_init után).
+    Ha nincs megadva session, sajátot nyit.
+    """
+    if db is not None:
+        return vector_index.refresh(db)
+
+    from ..database import SessionLocal
+
+    session = SessionLocal()
+    try:
+        return vector_index.refresh(session)
+    finally:
+        session.close()
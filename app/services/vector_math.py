@@ -0,0 +1,36 @@
+import numpy as np
+
+
+# ---------------------------------------------------------
+#  KÖZÖS VEKTORMŰVELETEK (vektorindex, IVF)
+# ---------------------------------------------------------
+
+def normalize_rows(matrix: np.ndarray) -> np.ndarray:
+    """
+    Soronként egységnyi hosszúra normál float32 mátrix.
+    A nulla vektorok nullák maradnak (így a pontszámuk is 0).
+    """
+    matrix = np.asarray(matrix, dtype=np.float32)
+    if matrix.ndim == 1:
+        matrix = matrix.reshape(1, -1)
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return matrix / norms
+
+
+def top_k_indices(scores: np.ndarray, top_k: int) -> np.ndarray:
+    """
+    A top_k legnagyobb pontszám indexe csökkenő sorrendben.
+    Teljes rendezés helyett np.argpartition → O(n) + O(k log k).
+    """
+    n = scores.shape[0]
+    k = min(top_k, n)
+    if k <= 0:
+        return np.empty(0, dtype=np.int64)
+
+    if k < n:
+        idx = np.argpartition(-scores, k - 1)[:k]
+    else:
+        idx = np.arange(n)
+
+    return idx[np.argsort(-scores[idx], kind="stable")]
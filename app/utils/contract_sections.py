@@ -0,0 +1,205 @@
+import difflib
+import re
+import unicodedata
+from dataclasses import dataclass
+from typing import List, Optional, Tuple
+
+# szerződéspont-fejlécek a sor elején:
+#   "1. A szerződés tárgya", "4.2. Díjazás", "4.2 Díjazás", "IV. Felelősség",
+#   "3. § ...", "§ 3", "5. cikk"
+# (egyszintű számnál kötelező a pont, hogy pl. "100 000 Ft" ne legyen fejléc)
+_NUMBERED = re.compile(r"^\s*(\d{1,3}(?:\.\d{1,3})*\.|\d{1,3}(?:\.\d{1,3})+)\s+\S")
+_ROMAN = re.compile(r"^\s*([IVXLC]{1,6})\.\s+\S")
+_PARAGRAPH = re.compile(r"^\s*§\s*(\d{1,3})\b")
+
+_BLANK_LINES = re.compile(r"\n\s*\n")
+
+
+@dataclass
+class Section:
+    """A szerződés egy összefüggő része: első és utolsó pontszám + szöveg."""
+
+    first_number: Optional[str]
+    last_number: Optional[str]
+    text: str
+
+    @property
+    def label(self) -> str:
+        if self.first_number is None:
+            return "bevezető rész"
+        if self.last_number in (None, self.first_number):
+            return f"{self.first_number}. pont"
+        return f"{self.first_number}–{self.last_number}. pont"
+
+
+def _heading_number(line: str) -> Optional[str]:
+    for pattern in (_PARAGRAPH, _ROMAN, _NUMBERED):
+        match = pattern.match(line)
+        if match:
+            return match.group(1).rstrip(".")
+    return None
+
+
+def _depth(number: str) -> int:
+    return number.count(".") + 1
+
+
+def _split_oversized(text: str, max_chars: int) -> List[str]:
+    """Túl hosszú pont: bekezdéshatárokon, végső esetben karakterszámra vágjuk."""
+    parts: List[str] = []
+    current = ""
+    for paragraph in _BLANK_LINES.split(text):
+        candidate = f"{current}\n\n{paragraph}" if current else paragraph
+        if len(candidate) <= max_chars:
+            current = candidate
+            continue
+        if current:
+            parts.append(current)
+        while len(paragraph) > max_chars:
+            parts.append(paragraph[:max_chars])
+            paragraph = paragraph[max_chars:]
+        current = paragraph
+    if current:
+        parts.append(current)
+    return parts
+
+
+def split_sections(text: str, max_chars: int = 12000) -> List[Section]:
+    """
+    A szerződés felbontása a pontszámozása mentén, legfeljebb max_chars
+    hosszú részekre:
+    - a legfelső számozási szint fejlécein vágunk (pl. "1.", "2.", ... vagy "I.", "II."),
+    - a szomszédos pontokat összevonjuk, amíg beférnek a keretbe (kevesebb hívás),
+    - a keretnél hosszabb pontot bekezdésenként daraboljuk tovább.
+    Számozás nélküli szövegnél a bekezdéshatárok döntenek.
+    """
+    lines = text.splitlines(keepends=True)
+    headings = [(i, number) for i, line in enumerate(lines) if (number := _heading_number(line))]
+
+    raw: List[Section] = []
+    if headings:
+        top_depth = min(_depth(number) for _, number in headings)
+        cuts = [(i, number) for i, number in headings if _depth(number) == top_depth]
+
+        if cuts[0][0] > 0:
+            raw.append(Section(None, None, "".join(lines[:cuts[0][0]])))
+        for (start, number), (end, _next) in zip(cuts, cuts[1:] + [(len(lines), None)]):
+            raw.append(Section(number, number, "".join(lines[start:end])))
+    else:
+        raw.append(Section(None, None, text))
+
+    sections: List[Section] = []
+    for section in raw:
+        if not section.text.strip():
+            continue
+        if len(section.text) > max_chars:
+            for part in _split_oversized(section.text, max_chars):
+                sections.append(Section(section.first_number, section.last_number, part))
+            continue
+
+        last = sections[-1] if sections else None
+        if last is not None and len(last.text) + len(section.text) <= max_chars:
+            last.text += section.text
+            last.last_number = section.last_number or last.last_number
+            if last.first_number is None:
+                last.first_number = section.first_number
+        else:
+            sections.append(Section(section.first_number, section.last_number, section.text))
+
+    return sections
+
+
+# ---------------------------------------------------------
+#  PONTOK (CLAUSE-OK) KERESÉSE KIVONAT ALAPJÁN
+# ---------------------------------------------------------
+
+_TOKEN = re.compile(r"\w+")
+
+
+def _tokens(text: str) -> List[str]:
+    decomposed = unicodedata.normalize("NFKD", text.casefold())
+    folded = "".join(ch for ch in decomposed if not unicodedata.combining(ch))
+    return _TOKEN.findall(folded)
+
+
+def clause_spans(text: str) -> List[Tuple[int, int]]:
+    """
+    A szöveg pontjai (start, end) karakterpozíciókként: minden számozott
+    fejléc (bármely szinten) és minden üres sor új pontot kezd.
+    A végükről a whitespace-t levágjuk, így visszaillesztéskor a tagolás megmarad.
+    """
+    spans: List[Tuple[int, int]] = []
+    start: Optional[int] = None
+    offset = 0
+
+    def close(end: int) -> None:
+        if start is not None:
+            stripped_end = start + len(text[start:end].rstrip())
+            if stripped_end > start:
+                spans.append((start, stripped_end))
+
+    for line in text.splitlines(keepends=True):
+        if not line.strip():
+            close(offset)
+            start = None
+        elif start is None:
+            start = offset + (len(line) - len(line.lstrip()))
+        elif _heading_number(line):
+            close(offset)
+            start = offset + (len(line) - len(line.lstrip()))
+        offset += len(line)
+
+    close(offset)
+    return spans
+
+
+@dataclass
+class ClauseMatch:
+    start: int
+    end: int
+    score: float
+
+
+def find_clause(
+    text: str,
+    excerpt: str,
+    spans: Optional[List[Tuple[int, int]]] = None,
+    min_score: float = 0.6,
+) -> Optional[ClauseMatch]:
+    """
+    A kivonathoz (idézet vagy összefoglaló) legjobban illő pont.
+    Pontszám: a kivonat szavainak hány százaléka szerepel a pontban
+    (ékezet- és kisbetű-független), szó-sorrend egyezéssel súlyozva.
+    Ha a legjobb is min_score alatt marad, None.
+    """
+    wanted = _tokens(excerpt)
+    if not wanted:
+        return None
+
+    wanted_set = set(wanted)
+    wanted_joined = " ".join(wanted)
+    best: Optional[ClauseMatch] = None
+
+    for start, end in spans if spans is not None else clause_spans(text):
+        tokens = _tokens(text[start:end])
+        if not tokens:
+            continue
+        joined = " ".join(tokens)
+        if wanted_joined in joined:
+            score = 1.0
+        else:
+            overlap = len(wanted_set.intersection(tokens)) / len(wanted_set)
+            if best is not None and overlap <= best.score:
+                continue
+            order = difflib.SequenceMatcher(None, wanted, tokens, autojunk=False).find_longest_match(
+                0, len(wanted), 0, len(tokens)
+            ).size / len(wanted)
+            score = 0.8 * overlap + 0.2 * order
+        if best is None or score > best.score:
+            best = ClauseMatch(start, end, round(score, 4))
+            if score == 1.0:
+                break
+
+    if best is None or best.score < min_score:
+        return None
+    return best
@@ -0,0 +1,115 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Generic, Hashable, Optional, Tuple, TypeVar
+
+V = TypeVar("V")
+
+_MISSING = object()
+
+
+class LRUCache(Generic[V]):
+    """
+    Szálbiztos, processzen belüli LRU cache lejárati idővel (TTL).
+
+    - max_entries: legfeljebb ennyi elem,
+    - max_bytes: opcionális méretkorlát (a sizeof függvény szerint számolva),
+    - ttl_sec: alapértelmezett élettartam (None → nem jár le); elemenként felülírható.
+
+    A hit/miss/eviction számlálók a stats()-ból olvashatók.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 1024,
+        ttl_sec: Optional[float] = None,
+        max_bytes: Optional[int] = None,
+        sizeof: Optional[Callable[[V], int]] = None,
+    ) -> None:
+        self.max_entries = max_entries
+        self.ttl_sec = ttl_sec
+        self.max_bytes = max_bytes
+        self._sizeof = sizeof or (lambda _value: 0)
+
+        # kulcs → (érték, lejárat monotonic időben vagy None, méret)
+        self._data: "OrderedDict[Hashable, Tuple[V, Optional[float], int]]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def get(self, key: Hashable, default: Any = None) -> Optional[V]:
+        with self._lock:
+            entry = self._data.get(key, _MISSING)
+            if entry is _MISSING:
+                self.misses += 1
+                return default
+
+            value, expires_at, _size = entry
+            if expires_at is not None and expires_at <= time.monotonic():
+                self._remove_locked(key)
+                self.expirations += 1
+                self.misses += 1
+                return default
+
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key: Hashable, value: V, ttl_sec: Optional[float] = None) -> None:
+        ttl = self.ttl_sec if ttl_sec is None else ttl_sec
+        expires_at = time.monotonic() + ttl if ttl is not None else None
+        size = self._sizeof(value)
+
+        # egyetlen, a teljes keretnél nagyobb elemet nem tárolunk
+        if self.max_bytes is not None and size > self.max_bytes:
+            return
+
+        with self._lock:
+            if key in self._data:
+                self._remove_locked(key)
+
+            self._data[key] = (value, expires_at, size)
+            self._bytes += size
+            self._evict_locked()
+
+    def pop(self, key: Hashable) -> None:
+        with self._lock:
+            if key in self._data:
+                self._remove_locked(key)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+            self._bytes = 0
+
+    def _remove_locked(self, key: Hashable) -> None:
+        _value, _expires_at, size = self._data.pop(key)
+        self._bytes -= size
+
+    def _evict_locked(self) -> None:
+        while self._data and (
+            len(self._data) > self.max_entries
+            or (self.max_bytes is not None and self._bytes > self.max_bytes)
+        ):
+            key = next(iter(self._data))
+            self._remove_locked(key)
+            self.evictions += 1
+
+    def stats(self) -> Dict[str, Any]:
+        total = self.hits + self.misses
+        return {
+            "entries": len(self._data),
+            "bytes": self._bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / total, 4) if total else 0.0,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+        }
@@ -0,0 +1,114 @@
+import asyncio
+import threading
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, Tuple, TypeVar
+
+T = TypeVar("T")
+
+
+class _Call:
+    """Egy folyamatban lévő (szinkron) hívás: a várakozók az eseményre várnak."""
+
+    __slots__ = ("event", "result", "error", "waiters")
+
+    def __init__(self) -> None:
+        self.event = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+        self.waiters = 0
+
+
+class SingleFlight:
+    """
+    Kérés-összevonás ("single-flight"): az azonos kulcsú, egyszerre futó
+    hívások közül csak az első (leader) hívja meg a függvényt, a többiek
+    megvárják és megkapják ugyanazt az eredményt (vagy kivételt).
+
+    - do(): szinkron út (threadpool / worker szálak), threading.Event-tel,
+    - do_async(): async út (eseményhurok), közös asyncio.Task-kal.
+
+    A két út külön nyilvántartást vezet; egy hurkon belül az async, szálak
+    között a szinkron hívások vonódnak össze.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._calls: Dict[Hashable, _Call] = {}
+        self._tasks: Dict[Tuple[int, Hashable], asyncio.Task] = {}
+
+        self.leaders = 0
+        self.coalesced = 0
+        self.errors = 0
+
+    # -----------------------------------------------------
+    #  SZINKRON ÚT
+    # -----------------------------------------------------
+    def do(self, key: Hashable, fn: Callable[[], T]) -> T:
+        with self._lock:
+            call = self._calls.get(key)
+            if call is not None:
+                call.waiters += 1
+                self.coalesced += 1
+                leader = False
+            else:
+                call = _Call()
+                self._calls[key] = call
+                self.leaders += 1
+                leader = True
+
+        if not leader:
+            call.event.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn()
+            return call.result
+        except BaseException as exc:
+            call.error = exc
+            with self._lock:
+                self.errors += 1
+            raise
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+            call.event.set()
+
+    # -----------------------------------------------------
+    #  ASYNC ÚT
+    # -----------------------------------------------------
+    async def do_async(self, key: Hashable, fn: Callable[[], Awaitable[T]]) -> T:
+        """
+        A hívás külön taszkban fut, mindenki (a leader is) shield-elve várja:
+        ha egy kliens lekapcsolódik, a többiek közös hívása nem szakad meg.
+        """
+        loop = asyncio.get_running_loop()
+        task_key = (id(loop), key)
+
+        with self._lock:
+            task = self._tasks.get(task_key)
+            if task is not None and not task.done():
+                self.coalesced += 1
+            else:
+                task = loop.create_task(fn())
+                self._tasks[task_key] = task
+                self.leaders += 1
+                task.add_done_callback(lambda t: self._task_done(task_key, t))
+
+        return await asyncio.shield(task)
+
+    def _task_done(self, task_key: Tuple[int, Hashable], task: asyncio.Task) -> None:
+        with self._lock:
+            if self._tasks.get(task_key) is task:
+                del self._tasks[task_key]
+            if not task.cancelled() and task.exception() is not None:
+                self.errors += 1
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "upstream_calls": self.leaders,
+                "coalesced": self.coalesced,
+                "errors": self.errors,
+                "in_flight": len(self._calls) + len(self._tasks),
+            }
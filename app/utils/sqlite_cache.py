@@ -0,0 +1,103 @@
+import os
+import sqlite3
+import threading
+import time
+from typing import Optional
+
+
+class SQLiteCache:
+    """
+    Egyszerű, perzisztens kulcs → bájtsor tár SQLite fájlban.
+    Újraindítás után is megmarad, és WAL módban több uvicorn worker is
+    használhatja ugyanazt a fájlt.
+    """
+
+    def __init__(self, path: str, table: str = "cache", max_entries: Optional[int] = None) -> None:
+        if not table.isidentifier():
+            raise ValueError(f"Érvénytelen táblanév: {table}")
+
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+
+        self.path = path
+        self.table = table
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._writes = 0
+
+        self._conn = sqlite3.connect(path, timeout=5.0, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            f"CREATE TABLE IF NOT EXISTS {table} ("
+            " key TEXT PRIMARY KEY,"
+            " value BLOB NOT NULL,"
+            " expires_at REAL,"
+            " accessed_at REAL NOT NULL"
+            ")"
+        )
+        self._conn.execute(
+            f"CREATE INDEX IF NOT EXISTS ix_{table}_accessed ON {table} (accessed_at)"
+        )
+        self._conn.commit()
+
+    def get(self, key: str) -> Optional[bytes]:
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                f"SELECT value, expires_at FROM {self.table} WHERE key = ?",
+                (key,),
+            ).fetchone()
+            if row is None:
+                return None
+
+            value, expires_at = row
+            if expires_at is not None and expires_at <= now:
+                self._conn.execute(f"DELETE FROM {self.table} WHERE key = ?", (key,))
+                self._conn.commit()
+                return None
+
+            self._conn.execute(
+                f"UPDATE {self.table} SET accessed_at = ? WHERE key = ?",
+                (now, key),
+            )
+            self._conn.commit()
+            return bytes(value)
+
+    def set(self, key: str, value: bytes, ttl_sec: Optional[float] = None) -> None:
+        now = time.time()
+        expires_at = now + ttl_sec if ttl_sec is not None else None
+        with self._lock:
+            self._conn.execute(
+                f"INSERT OR REPLACE INTO {self.table} (key, value, expires_at, accessed_at)"
+                " VALUES (?, ?, ?, ?)",
+                (key, sqlite3.Binary(value), expires_at, now),
+            )
+            self._writes += 1
+            # a takarítást nem minden írásnál futtatjuk
+            if self._writes % 100 == 0:
+                self._prune_locked(now)
+            self._conn.commit()
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._conn.execute(f"DELETE FROM {self.table} WHERE key = ?", (key,))
+            self._conn.commit()
+
+    def _prune_locked(self, now: float) -> None:
+        self._conn.execute(
+            f"DELETE FROM {self.table} WHERE expires_at IS NOT NULL AND expires_at <= ?",
+            (now,),
+        )
+        if self.max_entries:
+            # a legrégebben használt elemek törlése a korlát fölött
+            self._conn.execute(
+                f"DELETE FROM {self.table} WHERE key IN ("
+                f" SELECT key FROM {self.table} ORDER BY accessed_at DESC"
+                " LIMIT -1 OFFSET ?)",
+                (self.max_entries,),
+            )
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute(f"SELECT COUNT(*) FROM {self.table}").fetchone()[0]
@@ -0,0 +1,101 @@
+import json
+import os
+import time
+from typing import AsyncIterator, Dict, Optional
+
+import anyio
+from fastapi import Request
+from fastapi.responses import StreamingResponse
+
+# ilyen gyakran nézzük meg, hogy a kliens még olvas-e (token-enkénti ellenőrzés helyett)
+SSE_DISCONNECT_CHECK_SEC = float(os.getenv("SSE_DISCONNECT_CHECK_SEC", "0.25"))
+
+SSE_HEADERS = {
+    "Cache-Control": "no-cache",
+    # nginx mögött se pufferelődjön a stream
+    "X-Accel-Buffering": "no",
+}
+
+
+def sse_event(data: Dict[str, object], event: Optional[str] = None) -> str:
+    """Egy Server-Sent Event üzenet (a data mindig egysoros JSON)."""
+    payload = json.dumps(data, ensure_ascii=False)
+    if event:
+        return f"event: {event}\ndata: {payload}\n\n"
+    return f"data: {payload}\n\n"
+
+
+async def sse_token_stream(
+    request: Request,
+    tokens: AsyncIterator[str],
+    telemetry: Dict[str, object],
+) -> AsyncIterator[str]:
+    """
+    Modell-tokenek továbbítása SSE-ként:
+    - "token" események a szövegdarabokkal,
+    - a végén "done" esemény a telemetriával (ttft_sec, total_sec, chunks),
+    - hiba esetén "error" esemény.
+    Ha a kliens lekapcsolódik, a token-iterátort lezárjuk, ami az
+    OpenAI streamet is bezárja (nem fizetünk a senki által nem olvasott tokenekért).
+    """
+    started = time.perf_counter()
+    first_token_at: Optional[float] = None
+    last_check = started
+    chunks = 0
+    status = "completed"
+
+    try:
+        async for token in tokens:
+            now = time.perf_counter()
+            if first_token_at is None:
+                first_token_at = now
+            chunks += 1
+            yield sse_event({"token": token}, event="token")
+
+            if now - last_check >= SSE_DISCONNECT_CHECK_SEC:
+                last_check = now
+                if await request.is_disconnected():
+                    status = "cancelled"
+                    break
+
+        if status == "completed":
+            telemetry = _stream_telemetry(telemetry, started, first_token_at, chunks, status)
+            yield sse_event({"telemetry": telemetry}, event="done")
+
+    except anyio.get_cancelled_exc_class():
+        status = "cancelled"
+        raise
+    except Exception as e:
+        status = "error"
+        yield sse_event({"detail": str(e)}, event="error")
+    finally:
+        # lekapcsolódáskor a taszk már cancel-ált lehet: a lezárást védjük
+        with anyio.CancelScope(shield=True):
+            await tokens.aclose()
+        if status != "completed":
+            telemetry = _stream_telemetry(telemetry, started, first_token_at, chunks, status)
+        print("SSE stream vége:", telemetry)
+
+
+def _stream_telemetry(
+    base: Dict[str, object],
+    started: float,
+    first_token_at: Optional[float],
+    chunks: int,
+    status: str,
+) -> Dict[str, object]:
+    return {
+        **base,
+        "status": status,
+        "ttft_sec": round(first_token_at - started, 3) if first_token_at is not None else None,
+        "total_sec": round(time.perf_counter() - started, 3),
+        "chunks": chunks,
+    }
+
+
+def sse_response(request: Request, tokens: AsyncIterator[str], telemetry: Dict[str, object]) -> StreamingResponse:
+    return StreamingResponse(
+        sse_token_stream(request, tokens, telemetry),
+        media_type="text/event-stream",
+        headers=SSE_HEADERS,
+    )
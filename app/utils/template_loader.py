@@ -1,20 +1,34 @@
+import os
 import re
 from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from .lru_cache import LRUCache
 
 BASE_TEMPLATE_PATH = Path(__file__).resolve().parent.parent / "templates" / "contracts"
 
-def load_contract_template(contract_type: str, mode: str) -> str:
-    """
-    contract_type: 'megbizasi', 'nda'
-    mode: 'fast' | 'detailed'
-    """
+# egy sablonhoz ennyi különböző form-kulcs készlet leképezését jegyezzük meg
+TEMPLATE_KEY_MAP_CACHE_SIZE = int(os.getenv("TEMPLATE_KEY_MAP_CACHE_SIZE", "256"))
+
+EMPTY_PLACEHOLDER_VALUE = "__________________________"
+
+
+def contract_template_path(contract_type: str, mode: str) -> Path:
     filename = f"{contract_type}_{mode}.html"
     template_path = BASE_TEMPLATE_PATH / filename
 
     if not template_path.exists():
         raise FileNotFoundError(f"Template nem található: {filename}")
 
-    return template_path.read_text(encoding="utf-8")
+    return template_path
+
+
+def load_contract_template(contract_type: str, mode: str) -> str:
+    """
+    contract_type: 'megbizasi', 'nda'
+    mode: 'fast' | 'detailed'
+    """
+    return contract_template_path(contract_type, mode).read_text(encoding="utf-8")
 
 def fill_template_with_placeholders(template_html: str, values: dict) -> str:
     """
@@ -28,7 +42,7 @@ def fill_template_with_placeholders(template_html: str, values: dict) -> str:
         value = values.get(key)
 
         if value is None or str(value).strip() == "":
-            value = "__________________________"
+            value = EMPTY_PLACEHOLDER_VALUE
 
         result = result.replace(placeholder, str(value))
 
@@ -43,3 +57,70 @@ def extract_placeholders(template_html: str) -> list[str]:
     return list(set(PLACEHOLDER_PATTERN.findall(template_html)))
 
 
+
+
+# ---------------------------------------------------------
+#  ELŐFORDÍTOTT SABLONOK (FAST MODE)
+# ---------------------------------------------------------
+
+class CompiledTemplate:
+    """
+    Egyszer feldolgozott sablon: literál szövegdarabok és placeholder nevek
+    váltakozó listája. A kitöltés egyetlen join (nem kulcsonkénti str.replace
+    a teljes szövegen), a placeholder → form kulcs leképezés pedig form-kulcs
+    készletenként memoizált.
+    """
+
+    def __init__(self, html: str) -> None:
+        self.source = html
+        parts = PLACEHOLDER_PATTERN.split(html)
+        # páros index: literál, páratlan: placeholder név
+        self.literals: List[str] = parts[0::2]
+        self.names: List[str] = parts[1::2]
+        self.placeholders: List[str] = list(dict.fromkeys(self.names))
+        self._lowered = [(name, name.lower()) for name in self.placeholders]
+        self._key_maps: LRUCache[Dict[str, Optional[str]]] = LRUCache(max_entries=TEMPLATE_KEY_MAP_CACHE_SIZE)
+
+    def form_key_map(self, form_keys: Tuple[str, ...]) -> Dict[str, Optional[str]]:
+        """
+        placeholder → az első form kulcs, amelynek nevében (kisbetűsítve)
+        a placeholder neve szerepel; ha nincs ilyen, None.
+        """
+        key_map = self._key_maps.get(form_keys)
+        if key_map is not None:
+            return key_map
+
+        lowered_keys = [(key, key.lower()) for key in form_keys]
+        key_map = {}
+        for name, lowered in self._lowered:
+            key_map[name] = next((key for key, key_l in lowered_keys if lowered in key_l), None)
+
+        self._key_maps.set(form_keys, key_map)
+        return key_map
+
+    def map_values(self, form_data: dict) -> Dict[str, object]:
+        key_map = self.form_key_map(tuple(form_data))
+        return {name: (form_data[key] if key is not None else "") for name, key in key_map.items()}
+
+    def render(self, values: dict) -> str:
+        """
+        Ugyanaz az eredmény, mint a fill_template_with_placeholders-nél:
+        üres érték → kitöltő vonal, a values-ban nem szereplő placeholder marad.
+        """
+        rendered: Dict[str, str] = {}
+        for name in self.placeholders:
+            if name not in values:
+                rendered[name] = f"{{{{{name}}}}}"
+                continue
+            value = values[name]
+            if value is None or str(value).strip() == "":
+                rendered[name] = EMPTY_PLACEHOLDER_VALUE
+            else:
+                rendered[name] = str(value)
+
+        out = [self.literals[0]]
+        for name, literal in zip(self.names, self.literals[1:]):
+            out.append(rendered[name])
+            out.append(literal)
+        return "".join(out)
+
@@ -0,0 +1,58 @@
+import hashlib
+import os
+import tempfile
+from dataclasses import dataclass
+
+from fastapi import UploadFile
+from fastapi.concurrency import run_in_threadpool
+
+# ekkora darabokban másoljuk a feltöltést (nem kell egyben a memóriában tartani)
+UPLOAD_CHUNK_BYTES = 1024 * 1024
+
+
+class UploadTooLargeError(Exception):
+    """A feltöltés nagyobb a megengedettnél (413)."""
+
+
+@dataclass
+class SpooledUpload:
+    path: str
+    sha256: str          # a tartalom hash-e (másolás közben számolva)
+    size: int
+
+    def remove(self) -> None:
+        try:
+            os.unlink(self.path)
+        except FileNotFoundError:
+            pass
+
+
+def _write_chunk(out, digest, chunk: bytes) -> None:
+    digest.update(chunk)
+    out.write(chunk)
+
+
+async def spool_upload(upload: UploadFile, max_bytes: int, suffix: str = "") -> SpooledUpload:
+    """
+    A feltöltött fájl átmásolása egy ideiglenes fájlba, darabonként, a
+    méretkorlát ellenőrzésével; közben a tartalom sha256 hash-ét is számoljuk
+    (így az ismételt feltöltések a cache-ből kiszolgálhatók). Az írás és a
+    hash-elés szálban fut, nem az eseményhurkon. A törlés a hívó dolga
+    (a process-pool workerei útvonal alapján, lustán olvasnak belőle).
+    """
+    fd, path = tempfile.mkstemp(prefix="upload-", suffix=suffix)
+    digest = hashlib.sha256()
+    size = 0
+    try:
+        with os.fdopen(fd, "wb") as out:
+            while chunk := await upload.read(UPLOAD_CHUNK_BYTES):
+                size += len(chunk)
+                if size > max_bytes:
+                    raise UploadTooLargeError(
+                        f"A fájl túl nagy (legfeljebb {max_bytes / (1024 * 1024):.1f} MB tölthető fel)."
+                    )
+                await run_in_threadpool(_write_chunk, out, digest, chunk)
+    except BaseException:
+        os.unlink(path)
+        raise
+    return SpooledUpload(path, digest.hexdigest(), size)
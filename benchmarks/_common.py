@@ -0,0 +1,46 @@
+"""
+Közös segédek a benchmark szkriptekhez.
+
+Futtatás a repó gyökeréből, pl.:
+    python -m benchmarks.bench_vector_index
+"""
+import os
+import statistics
+import time
+from typing import Callable, Dict, List
+
+# az app modulok import-időben adatbázist / API kulcsot várnak
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+os.environ.setdefault("OPENAI_API_KEY", "sk-benchmark")
+
+
+def measure(fn: Callable[[], object], repeat: int = 20, warmup: int = 2) -> Dict[str, float]:
+    """Lefuttatja fn-t repeat-szer, és ms-ben visszaadja a fő statisztikákat."""
+    for _ in range(warmup):
+        fn()
+
+    samples: List[float] = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - t0) * 1000.0)
+
+    samples.sort()
+    return {
+        "mean_ms": statistics.fmean(samples),
+        "p50_ms": samples[len(samples) // 2],
+        "p99_ms": samples[min(len(samples) - 1, int(len(samples) * 0.99))],
+    }
+
+
+def print_table(headers: List[str], rows: List[List[object]]) -> None:
+    widths = [max(len(str(h)), *(len(_fmt(r[i])) for r in rows)) for i, h in enumerate(headers)]
+    print("  ".join(str(h).rjust(w) for h, w in zip(headers, widths)))
+    for row in rows:
+        print("  ".join(_fmt(v).rjust(w) for v, w in zip(row, widths)))
+
+
+def _fmt(value: object) -> str:
+    if isinstance(value, float):
+        return f"{value:.3f}"
+    return str(value)
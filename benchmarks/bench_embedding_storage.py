@@ -0,0 +1,98 @@
+"""
+RAGChunk embedding tárolás: JSON float lista vs. bináris (float32 / float16 / int8).
+
+    python -m benchmarks.bench_embedding_storage [--rows 5000] [--dim 1536]
+
+Minden formátumot külön SQLite fájlba írunk, majd mérjük:
+- a tábla (adatbázisfájl) méretét,
+- a teljes betöltés idejét (query + dekódolás float32 mátrixszá),
+ahogy a vektorindex is csinálja.
+"""
+import argparse
+import os
+import tempfile
+import time
+
+import numpy as np
+
+from ._common import print_table
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.database import Base
+from app.models import RAGChunk
+from app.services.embedding_codec import chunk_embedding, embedding_columns
+
+
+def _fill(path, vectors, fmt):
+    engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(bind=engine, tables=[RAGChunk.__table__])
+    session = sessionmaker(bind=engine)()
+
+    rows = []
+    for i, vec in enumerate(vectors):
+        if fmt == "json":
+            values = {"embedding": vec.tolist()}
+        else:
+            values = embedding_columns(vec, fmt)
+        rows.append({"source": f"Ptk. 6:{i} §", "content": f"részlet {i}", **values})
+
+    session.bulk_insert_mappings(RAGChunk, rows)
+    session.commit()
+    session.close()
+    engine.dispose()
+
+
+def _load(path):
+    engine = create_engine(f"sqlite:///{path}")
+    session = sessionmaker(bind=engine)()
+
+    t0 = time.perf_counter()
+    chunks = session.query(RAGChunk).all()
+    matrix = np.stack([chunk_embedding(c) for c in chunks])
+    elapsed = time.perf_counter() - t0
+
+    session.close()
+    engine.dispose()
+    return elapsed, matrix
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=5000)
+    parser.add_argument("--dim", type=int, default=1536)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(7)
+    vectors = rng.uniform(-0.1, 0.1, (args.rows, args.dim)).astype(np.float32)
+
+    results = []
+    baseline = None
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for fmt in ("json", "float32", "float16", "int8"):
+            path = os.path.join(tmp, f"{fmt}.db")
+            _fill(path, vectors, fmt)
+            size_mb = os.path.getsize(path) / (1024 * 1024)
+            load_s, matrix = _load(path)
+            max_err = float(np.abs(matrix - vectors).max())
+
+            if baseline is None:
+                baseline = (size_mb, load_s)
+
+            results.append([
+                fmt,
+                size_mb,
+                f"{baseline[0] / size_mb:.1f}x",
+                load_s * 1000.0,
+                f"{baseline[1] / load_s:.1f}x",
+                f"{max_err:.1e}",
+            ])
+
+    print(f"rows={args.rows}, dim={args.dim}")
+    print_table(["format", "size_mb", "smaller", "load_ms", "faster", "max_abs_err"], results)
+
+
+if __name__ == "__main__":
+    main()
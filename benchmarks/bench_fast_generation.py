@@ -0,0 +1,101 @@
+"""
+FAST mode kitöltés áteresztőképessége (kérés/mp): a régi út (fájl beolvasás +
+regex + placeholder × form kulcs keresés + kulcsonkénti str.replace) vs. az
+előfordított sablon a template registryből.
+
+    python -m benchmarks.bench_fast_generation [--requests 5000]
+
+A "generate_contract" sor a teljes FAST mode utat méri (a debug printek
+kimenetét eldobva).
+"""
+import argparse
+import contextlib
+import io
+import time
+
+from ._common import print_table
+
+from app.services import contract_generator
+from app.services.template_registry import template_registry
+from app.utils.template_loader import (
+    extract_placeholders,
+    fill_template_with_placeholders,
+    load_contract_template,
+)
+
+FORM_DATA = {
+    "CLIENT_NAME": "Példa Kft.",
+    "CLIENT_ADDRESS": "1111 Budapest, Fő utca 1.",
+    "CLIENT_REGNO": "01-09-123456",
+    "CLIENT_TAXNO": "12345678-2-41",
+    "CLIENT_REP": "Kovács Anna ügyvezető",
+    "CONTRACTOR_NAME": "Szabó Béla",
+    "CONTRACTOR_ADDRESS": "6720 Szeged, Kárász utca 5.",
+    "SUBJECT": "webalkalmazás fejlesztése",
+    "FEE": "1 500 000 Ft + ÁFA",
+    "DATE": "2025. 03. 01.",
+    "PLACE": "Budapest",
+    "TERM_TYPE": "határozott idejű",
+    "PAYMENT_METHOD": "banki átutalás",
+    "PAYMENT_DUE_DAYS": "15",
+}
+
+
+def legacy_fill(contract_type: str, form_data: dict) -> str:
+    template_html = load_contract_template(contract_type, "fast")
+    mapped_values = {}
+    for placeholder in extract_placeholders(template_html):
+        key = placeholder.lower()
+        for form_key, value in form_data.items():
+            if key in form_key.lower():
+                mapped_values[placeholder] = value
+                break
+        else:
+            mapped_values[placeholder] = ""
+    return fill_template_with_placeholders(template_html, mapped_values)
+
+
+def compiled_fill(contract_type: str, form_data: dict) -> str:
+    template = template_registry.get(contract_type, "fast").compiled
+    return template.render(template.map_values(form_data))
+
+
+def full_fast_mode(contract_type: str, form_data: dict) -> str:
+    with contextlib.redirect_stdout(io.StringIO()):
+        result = contract_generator.generate_contract(contract_type, "fast", dict(form_data))
+    return result["contract_html"]
+
+
+def throughput(fn, requests: int) -> float:
+    fn()
+    t0 = time.perf_counter()
+    for _ in range(requests):
+        fn()
+    return requests / (time.perf_counter() - t0)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--contract-type", default="megbizasi")
+    parser.add_argument("--requests", type=int, default=5000)
+    args = parser.parse_args()
+
+    template_registry.load_all()
+    assert legacy_fill(args.contract_type, FORM_DATA) == compiled_fill(args.contract_type, FORM_DATA)
+
+    legacy = throughput(lambda: legacy_fill(args.contract_type, FORM_DATA), args.requests)
+    compiled = throughput(lambda: compiled_fill(args.contract_type, FORM_DATA), args.requests)
+    full = throughput(lambda: full_fast_mode(args.contract_type, FORM_DATA), args.requests)
+
+    print_table(
+        ["út", "kérés/mp", "µs/kérés", "gyorsulás"],
+        [
+            ["régi (read + regex + replace)", legacy, 1e6 / legacy, 1.0],
+            ["előfordított sablon", compiled, 1e6 / compiled, compiled / legacy],
+            ["generate_contract (fast)", full, 1e6 / full, full / legacy],
+        ],
+    )
+
+
+if __name__ == "__main__":
+    main()
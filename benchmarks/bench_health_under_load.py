@@ -0,0 +1,103 @@
+"""
+Eseményhurok-terhelés: a /health válaszidő (p50 / p99 / max) miközben
+párhuzamos PDF exportok futnak – szálas futtatás (a korábbi run_in_threadpool)
+vs. a dokumentum process-pool.
+
+    python -m benchmarks.bench_health_under_load [--exporters 4] [--duration 10] [--workers 2]
+
+Az app in-process fut (ASGI transport), így minden, ami az eseményhurkot vagy
+a GIL-t foglalja, közvetlenül látszik a /health késleltetésén.
+"""
+import argparse
+import asyncio
+import time
+
+import httpx
+
+from ._common import print_table
+from .bench_pdf_export import synthetic_html
+
+from app.api.routes import contracts as contracts_routes
+from app.main import app
+from app.services.document_pool import DocumentPool
+
+
+def _percentile(samples, q: float) -> float:
+    samples = sorted(samples)
+    return samples[min(len(samples) - 1, int(len(samples) * q))] if samples else 0.0
+
+
+async def run_load(exporters: int, duration: float, probe_interval: float, payload: dict):
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=120) as client:
+        deadline = time.perf_counter() + duration
+        latencies = []
+        counts = {"ok": 0, "429": 0, "other": 0}
+
+        async def exporter():
+            while time.perf_counter() < deadline:
+                r = await client.post("/contracts/export", json=payload)
+                key = "ok" if r.status_code == 200 else "429" if r.status_code == 429 else "other"
+                counts[key] += 1
+                if r.status_code == 429:
+                    await asyncio.sleep(0.05)
+
+        async def prober():
+            while time.perf_counter() < deadline:
+                t0 = time.perf_counter()
+                await client.get("/health")
+                latencies.append((time.perf_counter() - t0) * 1000)
+                await asyncio.sleep(probe_interval)
+
+        await asyncio.gather(prober(), *(exporter() for _ in range(exporters)))
+        return latencies, counts
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--exporters", type=int, default=4)
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--pages", type=int, default=20)
+    parser.add_argument("--workers", type=int, default=2)
+    parser.add_argument("--max-pending", type=int, default=8)
+    parser.add_argument("--probe-interval", type=float, default=0.02)
+    args = parser.parse_args()
+
+    # az export artefaktum cache az ismételt payloadot lemezről szolgálná ki:
+    # itt a renderelés offloadját mérjük, és nem írunk a data/export_cache-be
+    contracts_routes.EXPORT_CACHE_ENABLED = False
+
+    payload = {
+        "template_name": "raw",
+        "format": "pdf",
+        "template_vars": {"contract_text": synthetic_html(args.pages)},
+    }
+
+    scenarios = [
+        ("terhelés nélkül", 0, None),
+        ("szálak (régi)", args.exporters, DocumentPool(workers=0, max_pending=args.max_pending)),
+        (f"process-pool ({args.workers} worker)", args.exporters,
+         DocumentPool(workers=args.workers, max_pending=args.max_pending)),
+    ]
+
+    rows = []
+    for label, exporters, pool in scenarios:
+        if pool is not None:
+            pool.start()
+            contracts_routes.document_pool = pool
+            # a workerek indítása / felmelegítése ne a mérésbe essen
+            asyncio.run(run_load(1, 0.5, args.probe_interval, payload))
+        latencies, counts = asyncio.run(run_load(exporters, args.duration, args.probe_interval, payload))
+        if pool is not None:
+            pool.shutdown()
+        rows.append([
+            label, len(latencies), _percentile(latencies, 0.5), _percentile(latencies, 0.99),
+            max(latencies), counts["ok"] / args.duration, counts["429"],
+        ])
+
+    print(f"{args.exporters} párhuzamos exportáló, {args.pages} oldalas PDF, {args.duration:.0f} mp")
+    print_table(["futtatás", "health_n", "p50_ms", "p99_ms", "max_ms", "export/mp", "429"], rows)
+
+
+if __name__ == "__main__":
+    main()
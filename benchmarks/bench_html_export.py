@@ -0,0 +1,132 @@
+"""
+HTML → export konverzió ~20 oldalas szerződéseken: a régi BeautifulSoup
+út (HTML → sima szöveg, formázás nélkül, formátumonként újra feldolgozva)
+vs. az egymenetes HTMLParser blokklista, amelyből a PDF és a DOCX is készül.
+Két minta: csak <p> bekezdések (mindkét út ugyanazt a szöveget adja ki) és
+vegyes (címsorok, számozott lista, táblázat – ezeket a régi út elhagyta).
+
+    python -m benchmarks.bench_html_export [--pages 20] [--repeat 10]
+"""
+import argparse
+from io import BytesIO
+
+from bs4 import BeautifulSoup
+from docx import Document
+from reportlab.lib.pagesizes import A4
+from reportlab.lib.units import mm
+from reportlab.platypus import Paragraph, SimpleDocTemplate, Spacer
+
+from ._common import measure, print_table
+
+from app.services import export_service
+from app.services.html_blocks import parse_html_blocks
+from app.services.pdf_render_context import get_pdf_context
+
+# ~ egy A4 oldalnyi szöveg 11pt-vel
+CHARS_PER_PAGE = 3000
+
+
+def paragraphs_html(pages: int) -> str:
+    sentence = "A Felek rögzítik, hogy a jelen pontban foglalt kötelezettségeiket jóhiszeműen teljesítik. "
+    parts = []
+    section = 1
+    while sum(len(p) for p in parts) < pages * CHARS_PER_PAGE:
+        parts.append(f"<p>{section}. Általános rendelkezések</p>")
+        parts.append(f"<p>{sentence * 6}</p>")
+        section += 1
+    return "".join(parts)
+
+
+def synthetic_html(pages: int) -> str:
+    sentence = "A Felek rögzítik, hogy a jelen pontban foglalt kötelezettségeiket <b>jóhiszeműen</b> teljesítik. "
+    parts = ["<h1>MEGBÍZÁSI SZERZŐDÉS</h1>"]
+    section = 1
+    while sum(len(p) for p in parts) < pages * CHARS_PER_PAGE:
+        parts.append(f"<h2>{section}. Általános rendelkezések</h2>")
+        parts.append(f"<p>{sentence * 4}</p>")
+        parts.append("<ol>" + "".join(f"<li>{sentence}</li>" for _ in range(3)) + "</ol>")
+        if section % 3 == 0:
+            rows = "".join(f"<tr><td>{section}.{i}</td><td>{sentence}</td></tr>" for i in range(4))
+            parts.append(f"<table><tr><th>Pont</th><th>Tartalom</th></tr>{rows}</table>")
+        section += 1
+    return "".join(parts)
+
+
+def legacy_html_to_plain_text(html: str) -> str:
+    """A korábbi export_service._html_to_plain_text (BeautifulSoup)."""
+    soup = BeautifulSoup(html, "html.parser")
+    for br in soup.find_all("br"):
+        br.replace_with("\n")
+    text_blocks = [p.get_text(strip=True) for p in soup.find_all("p")]
+    if text_blocks:
+        return "\n\n".join(text_blocks)
+    return soup.get_text("\n", strip=True)
+
+
+def legacy_pdf(html: str) -> bytes:
+    text = legacy_html_to_plain_text(html)
+    buffer = BytesIO()
+    doc = SimpleDocTemplate(
+        buffer, pagesize=A4,
+        leftMargin=20 * mm, rightMargin=20 * mm, topMargin=20 * mm, bottomMargin=20 * mm,
+    )
+    style = get_pdf_context().body
+    doc.build([Paragraph(line, style) if line.strip() else Spacer(1, 6) for line in text.split("\n")])
+    return buffer.getvalue()
+
+
+def legacy_docx(html: str) -> bytes:
+    document = Document()
+    for line in legacy_html_to_plain_text(html).split("\n"):
+        document.add_paragraph(line)
+    buffer = BytesIO()
+    document.save(buffer)
+    return buffer.getvalue()
+
+
+def legacy_both(html: str) -> None:
+    legacy_pdf(html)
+    legacy_docx(html)
+
+
+def single_pass_both(html: str) -> None:
+    blocks = parse_html_blocks(html)
+    export_service.generate_pdf(blocks)
+    export_service.generate_docx(blocks)
+
+
+def kept_chars(html: str):
+    blocks = parse_html_blocks(html)
+    kept_new = sum(len(b.text) + sum(len(r.text) for row in b.rows for cell in row for r in cell) for b in blocks)
+    return len(legacy_html_to_plain_text(html)), kept_new
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--pages", type=int, default=20)
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args()
+
+    get_pdf_context()
+    samples = [("csak <p>", paragraphs_html(args.pages)), ("vegyes", synthetic_html(args.pages))]
+
+    rows = []
+    for sample, html in samples:
+        legacy_chars, new_chars = kept_chars(html)
+        print(f"{sample}: {len(html)} kar. HTML, megőrzött szöveg: bs4 {legacy_chars} kar., blokklista {new_chars} kar.")
+        cases = [
+            ("HTML feldolgozás", lambda: legacy_html_to_plain_text(html), lambda: parse_html_blocks(html)),
+            ("PDF export", lambda: legacy_pdf(html), lambda: export_service.generate_pdf_from_html(html)),
+            ("DOCX export", lambda: legacy_docx(html), lambda: export_service.generate_docx_from_html(html)),
+            ("PDF + DOCX", lambda: legacy_both(html), lambda: single_pass_both(html)),
+        ]
+        for label, legacy_fn, new_fn in cases:
+            legacy = measure(legacy_fn, repeat=args.repeat, warmup=1)
+            new = measure(new_fn, repeat=args.repeat, warmup=1)
+            rows.append([sample, label, legacy["p50_ms"], new["p50_ms"], legacy["p50_ms"] / new["p50_ms"]])
+
+    print_table(["minta", "művelet", "bs4_p50_ms", "egymenetes_p50_ms", "gyorsulás"], rows)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,151 @@
+"""
+Hosszú szerződés review: egylépéses (single-shot) vs. map-reduce, falióra-idő
+szintetikus szerződéseken, stub modellel (nincs valódi API hívás).
+
+    python -m benchmarks.bench_long_review [--pages 20 60 100] [--concurrency 1 4 8 16]
+
+A stub késleltetési modellje (--time-scale-lel arányosan kicsinyítve):
+    késleltetés = alap + bemeneti karakterek * prefill + kimeneti karakterek * decode
+A stub a szövegben elhelyezett "kockázatos" mondatokból ad vissza issue-kat,
+így a reduce lépés összefésülése / duplikátumszűrése is látszik.
+"""
+import argparse
+import asyncio
+import json
+import re
+import time
+from types import SimpleNamespace
+
+from ._common import print_table
+
+from app import schemas
+from app.services import openai_service
+from app.services.response_cache import cache_bypass
+
+CHARS_PER_PAGE = 2500
+
+RISKY_CLAUSES = [
+    "A Megbízott felelőssége korlátlan, minden közvetett kárért is helytáll.",
+    "A Megbízó a szerződést indoklás nélkül, azonnali hatállyal felmondhatja.",
+    "A késedelmi kötbér mértéke napi 5%, felső korlát nélkül.",
+    "A szellemi alkotások minden joga ellenérték nélkül a Megbízóra száll.",
+    "A titoktartási kötelezettség határozatlan ideig, kötbérrel terhelten fennáll.",
+]
+
+_MAX_ISSUES = re.compile(r"Legfeljebb (\d+) elemet")
+
+
+def synthetic_contract(pages: int) -> str:
+    filler = (
+        "A Felek rögzítik, hogy a jelen pontban foglalt rendelkezéseket jóhiszeműen, "
+        "az együttműködési kötelezettségüknek megfelelően teljesítik. "
+    )
+    parts = ["KERETSZERZŐDÉS\n\namely létrejött a Felek között az alábbi feltételekkel.\n\n"]
+    section = 1
+    while sum(len(p) for p in parts) < pages * CHARS_PER_PAGE:
+        body = filler * 12
+        if section % 4 == 0:
+            body += RISKY_CLAUSES[(section // 4) % len(RISKY_CLAUSES)]
+        parts.append(f"{section}. Általános rendelkezések {section}.\n{section}.1. {body}\n\n")
+        section += 1
+    return "".join(parts)
+
+
+class StubCompletions:
+    def __init__(self, base: float, prefill: float, decode: float, scale: float) -> None:
+        self.base, self.prefill, self.decode, self.scale = base, prefill, decode, scale
+        self.calls = 0
+
+    async def create(self, **kwargs):
+        self.calls += 1
+        prompt = "".join(m["content"] for m in kwargs["messages"])
+
+        if kwargs.get("response_format"):
+            match = _MAX_ISSUES.search(prompt)
+            limit = int(match.group(1)) if match else 5
+            found = [c for c in RISKY_CLAUSES if c in prompt][:limit]
+            content = json.dumps(
+                {
+                    "summary_hu": "A rész a felek együttműködését szabályozza. " * 3,
+                    "issues": [
+                        {
+                            "clause_excerpt": clause,
+                            "issue": f"Egyoldalú, kiegyensúlyozatlan kikötés: {clause[:40]}",
+                            "risk_level": "magas" if "korlát" in clause else "közepes",
+                            "disadvantaged_party": "megbízott",
+                            "suggestion": "Javasolt a kikötést arányos korláttal és kölcsönösen megfogalmazni. " * 2,
+                        }
+                        for clause in found
+                    ],
+                    "overall_risk": "magas" if found else "alacsony",
+                    "notes": "Ez nem minősül jogi tanácsadásnak.",
+                },
+                ensure_ascii=False,
+            )
+        else:
+            content = "A keretszerződés a felek hosszú távú együttműködését rögzíti. " * 10
+
+        latency = self.base + len(prompt) * self.prefill + len(content) * self.decode
+        await asyncio.sleep(latency * self.scale)
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=content))])
+
+
+def run(request, stub, long_mode: bool, concurrency: int):
+    async def review():
+        cache_bypass.set(True)  # minden futás valódi (stub) hívásokat mérjen
+        if long_mode:
+            return await openai_service.analyze_long_contract_async(request, concurrency=concurrency)
+        return await openai_service.analyze_contract_async(request)
+
+    stub.calls = 0
+    t0 = time.perf_counter()
+    result = asyncio.run(review())
+    return time.perf_counter() - t0, stub.calls, result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--pages", type=int, nargs="+", default=[20, 60, 100])
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 4, 8, 16])
+    parser.add_argument("--base-sec", type=float, default=0.4)
+    parser.add_argument("--prefill-sec-per-char", type=float, default=40e-6)
+    parser.add_argument("--decode-sec-per-char", type=float, default=4e-3)
+    parser.add_argument("--time-scale", type=float, default=0.02)
+    args = parser.parse_args()
+
+    stub = StubCompletions(args.base_sec, args.prefill_sec_per_char, args.decode_sec_per_char, args.time_scale)
+    openai_service.get_async_openai_client = lambda: SimpleNamespace(
+        chat=SimpleNamespace(completions=stub)
+    )
+    # az egylépéses utat hosszú szövegre is ki akarjuk mérni
+    openai_service.REVIEW_LONG_THRESHOLD_CHARS = 10**12
+
+    rows = []
+    for pages in args.pages:
+        text = synthetic_contract(pages)
+        request = schemas.ContractReviewRequest(contract_text=text, contract_type="keretszerződés")
+
+        elapsed, calls, result = run(request, stub, long_mode=False, concurrency=1)
+        single = elapsed
+        rows.append([pages, len(text), "single-shot", "-", calls, len(result.issues),
+                     result.overall_risk, elapsed / args.time_scale, 1.0])
+
+        for concurrency in args.concurrency:
+            elapsed, calls, result = run(request, stub, long_mode=True, concurrency=concurrency)
+            sections = calls - 1  # + 1 összegző hívás
+            rows.append([pages, len(text), f"map-reduce ({sections} rész)", concurrency, calls,
+                         len(result.issues), result.overall_risk, elapsed / args.time_scale,
+                         single / elapsed])
+
+    print(
+        f"stub: alap {args.base_sec}s + {args.prefill_sec_per_char * 1e6:.0f}µs/bemeneti kar. "
+        f"+ {args.decode_sec_per_char * 1e3:.1f}ms/kimeneti kar. (idők a skálázás előtti mp-ben)"
+    )
+    print_table(
+        ["oldal", "karakter", "mód", "párhuzam", "hívás", "issue", "kockázat", "falióra_s", "gyorsulás"],
+        rows,
+    )
+
+
+if __name__ == "__main__":
+    main()
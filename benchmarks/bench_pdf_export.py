@@ -0,0 +1,92 @@
+"""
+PDF export áteresztőképesség (PDF/mp) egy ~20 oldalas szerződésre: a régi út
+(TTF regisztrálás + getSampleStyleSheet minden exportnál) vs. a processzenként
+egyszer felépített PdfRenderContext.
+
+    python -m benchmarks.bench_pdf_export [--pages 20] [--exports 10]
+"""
+import argparse
+import os
+import time
+from io import BytesIO
+
+from reportlab.lib.pagesizes import A4
+from reportlab.lib.styles import ParagraphStyle, getSampleStyleSheet
+from reportlab.lib.units import mm
+from reportlab.pdfbase import pdfmetrics
+from reportlab.pdfbase.ttfonts import TTFont
+from reportlab.platypus import Paragraph, SimpleDocTemplate, Spacer
+
+from ._common import print_table
+from .bench_html_export import legacy_html_to_plain_text
+
+from app.services import export_service
+from app.services.pdf_render_context import PDF_FONT_DIR, PDF_FONT_FILES
+
+# ~ egy A4 oldalnyi szöveg 11pt-vel
+CHARS_PER_PAGE = 3000
+
+
+def synthetic_html(pages: int) -> str:
+    sentence = "A Felek rögzítik, hogy a jelen pontban foglalt kötelezettségeiket jóhiszeműen teljesítik. "
+    paragraphs = []
+    section = 1
+    while sum(len(p) for p in paragraphs) < pages * CHARS_PER_PAGE:
+        paragraphs.append(f"<p>{section}. Általános rendelkezések</p>")
+        paragraphs.append(f"<p>{sentence * 6}</p>")
+        section += 1
+    return "<h1>MEGBÍZÁSI SZERZŐDÉS</h1>" + "".join(paragraphs)
+
+
+def legacy_pdf(html: str) -> bytes:
+    """A korábbi generate_pdf_from_html: font és stílus minden hívásnál."""
+    text = legacy_html_to_plain_text(html)
+    buffer = BytesIO()
+    doc = SimpleDocTemplate(
+        buffer, pagesize=A4,
+        leftMargin=20 * mm, rightMargin=20 * mm, topMargin=20 * mm, bottomMargin=20 * mm,
+    )
+    font_path = os.path.join(PDF_FONT_DIR, PDF_FONT_FILES["regular"])
+    pdfmetrics.registerFont(TTFont("DejaVuSans", font_path))
+    styles = getSampleStyleSheet()
+    style = ParagraphStyle("Body", parent=styles["Normal"], fontName="DejaVuSans", fontSize=11, leading=14)
+
+    story = [Paragraph(line, style) if line.strip() else Spacer(1, 6) for line in text.split("\n")]
+    doc.build(story)
+    return buffer.getvalue()
+
+
+def throughput(fn, exports: int) -> float:
+    fn()
+    t0 = time.perf_counter()
+    for _ in range(exports):
+        fn()
+    return exports / (time.perf_counter() - t0)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--pages", type=int, default=20)
+    parser.add_argument("--exports", type=int, default=10)
+    args = parser.parse_args()
+
+    html = synthetic_html(args.pages)
+    t0 = time.perf_counter()
+    TTFont("bench", os.path.join(PDF_FONT_DIR, PDF_FONT_FILES["regular"]))
+    ttf_ms = (time.perf_counter() - t0) * 1000
+
+    legacy = throughput(lambda: legacy_pdf(html), args.exports)
+    cached = throughput(lambda: export_service.generate_pdf_from_html(html), args.exports)
+
+    print(f"{args.pages} oldalas minta ({len(html)} kar. HTML), TTF feldolgozás: {ttf_ms:.1f} ms")
+    print_table(
+        ["út", "PDF/mp", "ms/PDF", "gyorsulás"],
+        [
+            ["font + stíluslap exportonként", legacy, 1000 / legacy, 1.0],
+            ["PdfRenderContext", cached, 1000 / cached, cached / legacy],
+        ],
+    )
+
+
+if __name__ == "__main__":
+    main()
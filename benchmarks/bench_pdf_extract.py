@@ -0,0 +1,120 @@
+"""
+PDF szövegkinyerés nagy (szintetikus, ~200 oldalas) PDF-en: a régi egyben
+kinyerés vs. oldalankénti stream, illetve párhuzamos oldaltartományok a
+dokumentum process-poolban. Mérjük az első oldalig eltelt időt, a teljes
+időt és a szülő processz memóriacsúcsát (tracemalloc).
+
+    python -m benchmarks.bench_pdf_extract [--pages 200] [--workers 1 2 4] [--batch 16]
+"""
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+import tracemalloc
+
+from reportlab.lib.pagesizes import A4
+from reportlab.lib.units import mm
+from reportlab.platypus import PageBreak, Paragraph, SimpleDocTemplate
+
+from ._common import print_table
+
+from app.services.document_pool import DocumentPool
+from app.services.file_extract_service import (
+    extract_text_from_pdf,
+    iter_pdf_page_texts,
+    pdf_page_count,
+    stream_pdf_pages,
+)
+from app.services.pdf_render_context import get_pdf_context
+
+
+def write_synthetic_pdf(path: str, pages: int) -> None:
+    style = get_pdf_context().body
+    sentence = "A Felek rögzítik, hogy a jelen pontban foglalt kötelezettségeiket jóhiszeműen teljesítik. "
+    story = []
+    for page in range(1, pages + 1):
+        for paragraph in range(8):
+            story.append(Paragraph(f"{page}.{paragraph + 1}. {sentence * 4}", style))
+        story.append(PageBreak())
+    doc = SimpleDocTemplate(path, pagesize=A4, leftMargin=20 * mm, rightMargin=20 * mm)
+    doc.build(story)
+
+
+def measure_run(fn):
+    # időmérés tracemalloc nélkül (az a szülőben futó kinyerést többszörösére lassítja),
+    # a memóriacsúcs egy külön futásból
+    t0 = time.perf_counter()
+    first_at, chars = fn(t0)
+    total = time.perf_counter() - t0
+
+    tracemalloc.start()
+    fn(time.perf_counter())
+    _current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return first_at, total, peak / (1024 * 1024), chars
+
+
+def legacy(path: str):
+    def run(_t0):
+        with open(path, "rb") as f:
+            text = extract_text_from_pdf(f)
+        return None, len(text)
+    return run
+
+
+def sequential_stream(path: str):
+    def run(t0):
+        first_at, chars = None, 0
+        with open(path, "rb") as f:
+            for text in iter_pdf_page_texts(f):
+                first_at = first_at if first_at is not None else time.perf_counter() - t0
+                chars += len(text)
+        return first_at, chars
+    return run
+
+
+def parallel_stream(path: str, pool: DocumentPool, batch: int):
+    def run(t0):
+        async def consume():
+            first_at, chars = None, 0
+            page_count = await pool.run(pdf_page_count, path)
+            async for _index, text in stream_pdf_pages(path, page_count, batch, pool.workers, pool):
+                first_at = first_at if first_at is not None else time.perf_counter() - t0
+                chars += len(text)
+            return first_at, chars
+        return asyncio.run(consume())
+    return run
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--pages", type=int, default=200)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--batch", type=int, default=16)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "synthetic.pdf")
+        write_synthetic_pdf(path, args.pages)
+        size_mb = os.path.getsize(path) / (1024 * 1024)
+
+        rows = []
+        for label, fn in [("egyben (régi)", legacy(path)), ("oldalankénti stream", sequential_stream(path))]:
+            first_at, total, peak, chars = measure_run(fn)
+            rows.append([label, "-", first_at if first_at is not None else total, total, peak, chars])
+
+        for workers in args.workers:
+            pool = DocumentPool(workers=workers, max_pending=workers * 4)
+            pool.start()
+            asyncio.run(pool.run(pdf_page_count, path))  # workerek indítása a mérés előtt
+            first_at, total, peak, chars = measure_run(parallel_stream(path, pool, args.batch))
+            pool.shutdown()
+            rows.append([f"párhuzamos tartományok ({args.batch} oldal/job)", workers, first_at, total, peak, chars])
+
+    print(f"{args.pages} oldalas PDF ({size_mb:.1f} MB), {os.cpu_count()} CPU")
+    print_table(["mód", "worker", "első_oldal_s", "összes_s", "memória_csúcs_MB", "karakter"], rows)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""
+Export HTML renderelés: render/mp a régi úton (szerződés + teljes layout
+renderelése minden exportnál) vs. a brandingenként előrenderelt layouttal,
+valamint hidegindítás (sablonok első betöltése) bytecode cache-sel és nélküle.
+
+    python -m benchmarks.bench_render [--renders 5000] [--contract-chars 20000]
+"""
+import argparse
+import tempfile
+import time
+
+from jinja2 import Environment, FileSystemBytecodeCache, FileSystemLoader, select_autoescape
+
+from ._common import measure, print_table
+
+from app.services import document_renderer
+from app.services.document_renderer import DEFAULT_LAYOUT_VARS, LAYOUT_TEMPLATE, TEMPLATES_DIR, render_contract_html
+
+LAYOUT_VARS = {
+    "document_title": "Megbízási szerződés",
+    "document_date": "2025. 03. 01.",
+    "document_number": "MSZ-2025/042",
+    "brand_name": "Példa Ügyvédi Iroda",
+}
+
+
+def legacy_render(template_vars: dict) -> str:
+    env = document_renderer.env
+    contract_html = env.get_template("contracts/raw.html").render(**template_vars)
+    context = {name: LAYOUT_VARS.get(name, default) for name, default in DEFAULT_LAYOUT_VARS.items()}
+    return env.get_template(LAYOUT_TEMPLATE).render(**context, contract_html=contract_html)
+
+
+def cold_load(bytecode_dir) -> None:
+    env = Environment(
+        loader=FileSystemLoader(str(TEMPLATES_DIR)),
+        autoescape=select_autoescape(["html", "xml"]),
+        bytecode_cache=FileSystemBytecodeCache(bytecode_dir) if bytecode_dir else None,
+    )
+    env.get_template("contracts/raw.html")
+    env.get_template(LAYOUT_TEMPLATE)
+
+
+def throughput(fn, renders: int) -> float:
+    fn()
+    t0 = time.perf_counter()
+    for _ in range(renders):
+        fn()
+    return renders / (time.perf_counter() - t0)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--renders", type=int, default=5000)
+    parser.add_argument("--contract-chars", type=int, default=20000)
+    args = parser.parse_args()
+
+    paragraph = "A Felek rögzítik, hogy a jelen pontban foglaltakat jóhiszeműen teljesítik. "
+    template_vars = {"contract_text": paragraph * (args.contract_chars // len(paragraph) + 1)}
+
+    assert legacy_render(template_vars) == render_contract_html("raw", template_vars, LAYOUT_VARS)
+
+    legacy = throughput(lambda: legacy_render(template_vars), args.renders)
+    cached = throughput(lambda: render_contract_html("raw", template_vars, LAYOUT_VARS), args.renders)
+
+    print_table(
+        ["út", "render/mp", "µs/render", "gyorsulás"],
+        [
+            ["teljes layout renderelés", legacy, 1e6 / legacy, 1.0],
+            ["előrenderelt layout", cached, 1e6 / cached, cached / legacy],
+        ],
+    )
+
+    with tempfile.TemporaryDirectory() as bytecode_dir:
+        cold_load(bytecode_dir)  # bytecode kiírása
+        rows = [
+            ["fordítás forrásból", *measure(lambda: cold_load(None), repeat=50).values()],
+            ["bytecode cache-ből", *measure(lambda: cold_load(bytecode_dir), repeat=50).values()],
+        ]
+    print()
+    print_table(["hidegindítás (2 sablon)", "mean_ms", "p50_ms", "p99_ms"], rows)
+
+
+if __name__ == "__main__":
+    main()
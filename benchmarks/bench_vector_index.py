@@ -0,0 +1,77 @@
+"""
+search_legal_context pontozási útvonal: régi Python-ciklus vs. vektorindex.
+
+    python -m benchmarks.bench_vector_index [--sizes 1000 10000 100000] [--dim 1536]
+
+Az embedding API-t és az adatbázist kihagyjuk: csak a pontozás + top-k
+költségét mérjük szintetikus vektorokon. A régi útvonal a JSON-ból
+visszaolvasott float listákból minden kérésnél np.array-t épít.
+"""
+import argparse
+
+import numpy as np
+
+from ._common import measure, print_table
+
+from app.services.rag_service import cosine_similarity
+from app.services.vector_index import VectorIndex
+
+
+def legacy_search(rows, query, top_k):
+    query_emb = np.array(query)
+    scored = []
+    for source, content, emb_list in rows:
+        emb = np.array(emb_list, dtype=float)
+        scored.append((cosine_similarity(query_emb, emb), source, content))
+    scored.sort(key=lambda x: x[0], reverse=True)
+    return scored[:top_k]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--dim", type=int, default=1536)
+    parser.add_argument("--top-k", type=int, default=5)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument(
+        "--legacy-max",
+        type=int,
+        default=10000,
+        help="efölött a régi útvonalat kihagyjuk (percekig futna)",
+    )
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(42)
+    rows = []
+
+    for n in args.sizes:
+        vectors = rng.standard_normal((n, args.dim), dtype=np.float32)
+        sources = [f"Ptk. 6:{i} §" for i in range(n)]
+        contents = [f"részlet {i}" for i in range(n)]
+        query = rng.standard_normal(args.dim).tolist()
+
+        index = VectorIndex(snapshot_dir=None, ann_backend="off")
+        index.set_vectors(range(n), vectors, sources, contents)
+        new_stats = measure(lambda: index.search(query, args.top_k), repeat=args.repeat)
+
+        if n <= args.legacy_max:
+            legacy_rows = [(s, c, v.tolist()) for s, c, v in zip(sources, contents, vectors)]
+            old_stats = measure(
+                lambda: legacy_search(legacy_rows, query, args.top_k),
+                repeat=max(3, args.repeat // 5),
+                warmup=1,
+            )
+            old_ms = old_stats["mean_ms"]
+            speedup = f"{old_ms / new_stats['mean_ms']:.0f}x"
+        else:
+            old_ms, speedup = "-", "-"
+
+        rows.append([n, old_ms, new_stats["mean_ms"], new_stats["p99_ms"], speedup])
+        del vectors, index
+
+    print(f"dim={args.dim}, top_k={args.top_k}")
+    print_table(["chunks", "legacy_ms", "index_ms", "index_p99_ms", "speedup"], rows)
+
+
+if __name__ == "__main__":
+    main()